@@ -9,6 +9,7 @@ TestAndIssueCollector集成模块 - 实现对visual_test/plans的自动访问与
 """
 
 import os
+import re
 import sys
 import json
 import time
@@ -21,6 +22,12 @@ from typing import Dict, List, Any, Optional, Union, Tuple
 # 配置日志
 logger = logging.getLogger("TestAndIssueCollectorIntegration")
 
+# README中测试结果摘要部分的标题
+SUMMARY_SECTION_TITLE = "## 测试结果摘要"
+
+# 摘要各行的最后运行时间，比较README内容是否变化时忽略
+_UPDATED_AT_RE = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
 # 导入必要的模块
 try:
     from mcp_tool.test_issue_collector import TestAndIssueCollector
@@ -501,16 +508,20 @@ class EnhancedTestAndIssueCollector(TestAndIssueCollector):
         
         try:
             # 读取README
-            with open(self.readme_path, "r") as f:
-                readme_content = f.read()
+            readme_content = Path(self.readme_path).read_text(encoding="utf-8")
             
             # 获取所有测试计划
             plan_names = self.test_plan_manager.list_test_plans()
             
-            # 测试结果摘要
-            summary = "## 测试结果摘要\n\n"
-            summary += "| 测试计划 | 状态 | 通过率 | 最后运行时间 |\n"
-            summary += "| --- | --- | --- | --- |\n"
+            # 测试结果摘要，先收集各行再一次拼接
+            parts = [
+                f"{SUMMARY_SECTION_TITLE}\n\n"
+                "| 测试计划 | 状态 | 通过率 | 最后运行时间 |\n"
+                "| --- | --- | --- | --- |\n"
+            ]
+            
+            # 本次更新的时间，所有行共用
+            updated_at = time.strftime('%Y-%m-%d %H:%M:%S')
             
             for plan_name in plan_names:
                 # 获取最新的测试结果
@@ -521,32 +532,33 @@ class EnhancedTestAndIssueCollector(TestAndIssueCollector):
                 
                 # 计算通过率
                 pass_rate = 0
-                if result.get("total_tests", 0) > 0:
-                    pass_rate = result.get("successful_tests", 0) / result.get("total_tests", 0) * 100
+                total_tests = result.get("total_tests", 0)
+                if total_tests > 0:
+                    pass_rate = result.get("successful_tests", 0) / total_tests * 100
                 
                 # 状态图标
                 status_icon = "✅" if result.get("status") == "success" else "❌"
                 
                 # 添加到摘要
-                summary += f"| {result.get('name', plan_name)} | {status_icon} | {pass_rate:.2f}% | {time.strftime('%Y-%m-%d %H:%M:%S')} |\n"
-            
-            # 检查README是否已有测试结果摘要
-            if "## 测试结果摘要" in readme_content:
-                # 替换现有的测试结果摘要
-                import re
-                readme_content = re.sub(
-                    r"## 测试结果摘要\n\n.*?(?=\n##|\Z)",
-                    summary,
-                    readme_content,
-                    flags=re.DOTALL
-                )
-            else:
-                # 添加测试结果摘要
-                readme_content += "\n\n" + summary
+                parts.append(f"| {result.get('name', plan_name)} | {status_icon} | {pass_rate:.2f}% | {updated_at} |\n")
             
-            # 写入README
-            with open(self.readme_path, "w") as f:
-                f.write(readme_content)
+            summary = "".join(parts)
+            
+            # 检查README是否已有测试结果摘要（从标题到下一个二级标题或文件末尾）
+            start = readme_content.find(SUMMARY_SECTION_TITLE)
+            if start != -1:
+                end = readme_content.find("\n##", start + len(SUMMARY_SECTION_TITLE))
+                if end == -1:
+                    end = len(readme_content)
+                
+                # 替换现有的测试结果摘要，忽略运行时间后内容有变化时才写入README
+                existing_summary = readme_content[start:end]
+                if _UPDATED_AT_RE.sub("", existing_summary) != _UPDATED_AT_RE.sub("", summary):
+                    self._write_readme(readme_content[:start] + summary + readme_content[end:])
+            else:
+                # 只把测试结果摘要追加到README末尾，无需重写整个文件
+                with open(self.readme_path, "a", encoding="utf-8") as f:
+                    f.write("\n\n" + summary)
             
             logger.info("成功更新README")
             return True
@@ -10,14 +10,18 @@ Mac专用视觉校准与区域检测模块 - MacVisualCalibrator
 
 import os
 import sys
+import argparse
 import json
 import time
+import hashlib
 import logging
 import re
 import tempfile
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple, Union
+from urllib.parse import urlsplit
 from PIL import Image, ImageDraw, ImageFont
 
 # 导入统一配置管理
@@ -30,10 +34,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger("MacVisualCalibrator")
 
+# 校准缓存最多保留的条目数，超出时淘汰最早写入的条目
+MAX_CALIBRATION_CACHE_ENTRIES = 20
+
 class MacVisualCalibrator:
     """Mac专用视觉校准器类"""
     
-    def __init__(self, config_path=None, output_dir=None, simple_mode=False, manual_regions=False):
+    def __init__(self, config_path=None, output_dir=None, simple_mode=False, manual_regions=False, grid_regions=None):
         """
         初始化Mac视觉校准器
         
@@ -42,6 +49,8 @@ class MacVisualCalibrator:
             output_dir: 输出目录路径，可选，优先级高于配置文件
             simple_mode: 是否使用简化模式（不使用AppleScript），可选
             manual_regions: 是否使用手动区域标定模式，可选
+            grid_regions: 手动区域标定的网格坐标，格式为 {"work_list": (x1, y1, x2, y2), ...}，可选，
+                提供后不再提示用户输入
         """
         # 获取统一配置
         self.config_manager = get_config(config_path)
@@ -54,26 +63,104 @@ class MacVisualCalibrator:
             self.config["simple_mode"] = simple_mode
         if manual_regions:
             self.config["manual_regions"] = manual_regions
+        self.grid_regions = grid_regions or {}
             
         self.temp_dir = tempfile.mkdtemp(prefix="mac_visual_calibration_")
         
-        # 创建日志目录
-        os.makedirs(self.config.get("log_dir", os.path.expanduser("~/mcp_logs")), exist_ok=True)
+        # 解析并创建日志目录（只解析一次）
+        self._log_dir = os.path.abspath(os.path.expanduser(self.config.get("log_dir") or "~/mcp_logs"))
+        os.makedirs(self._log_dir, exist_ok=True)
+        
+        # 后台线程池：截图与AppleScript查询可并行执行，字体在后台预加载
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._font_futures = {
+            size: self._executor.submit(self._load_font, size)
+            for size in (12, 16)
+        }
         
         logger.info("Mac视觉校准器初始化完成")
         logger.info(f"临时文件目录: {self.temp_dir}")
-        logger.info(f"日志目录: {self.config.get('log_dir')}")
+        logger.info(f"日志目录: {self._log_dir}")
         logger.info(f"简化模式: {self.config.get('simple_mode')}")
         logger.info(f"手动区域标定模式: {self.config.get('manual_regions')}")
     
-    def _save_config(self) -> bool:
+    def close(self) -> None:
+        """
+        关闭后台线程池，校准器不再使用时调用
+        """
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def __enter__(self) -> "MacVisualCalibrator":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def __del__(self):
+        # 未显式关闭时随对象回收释放线程
+        self.close()
+    
+    @staticmethod
+    def _load_font(size: int):
+        """
+        加载字体，失败时使用默认字体
+        
+        Args:
+            size: 字体大小
+        
+        Returns:
+            字体对象
+        """
+        try:
+            return ImageFont.truetype("Arial.ttf", size)
+        except IOError:
+            return ImageFont.load_default()
+    
+    def _get_font(self, size: int):
+        """
+        获取预加载的字体
+        
+        Args:
+            size: 字体大小
+        
+        Returns:
+            字体对象
+        """
+        future = self._font_futures.get(size)
+        if future is None:
+            future = self._font_futures[size] = self._executor.submit(self._load_font, size)
+        return future.result()
+    
+    @staticmethod
+    def _get_image_size(image_path: str) -> Tuple[int, int]:
+        """
+        获取图像尺寸，PIL打开图像时只读取头部而不解码像素数据
+        
+        Args:
+            image_path: 图像文件路径
+        
+        Returns:
+            Tuple[int, int]: 图像宽度和高度
+        """
+        with Image.open(image_path) as img:
+            return img.size
+    
+    def _save_config(self, updates: Optional[Dict[str, Any]] = None) -> bool:
         """
         保存配置
         
+        Args:
+            updates: 保存前合并到统一配置的配置项，可选
+        
         Returns:
             bool: 是否成功保存
         """
         try:
+            if updates:
+                self.config_manager.update(updates)
             return self.config_manager.save()
         except Exception as e:
             logger.error(f"保存配置失败: {e}")
@@ -142,9 +229,9 @@ class MacVisualCalibrator:
             end tell
             """
             
-            # 执行AppleScript
-            cmd = ["osascript", "-e", script]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            # 执行AppleScript（通过标准输入传递脚本，不受命令行长度限制）
+            cmd = ["osascript", "-"]
+            result = subprocess.run(cmd, input=script, capture_output=True, text=True, check=True)
             
             # 解析结果
             output = result.stdout.strip()
@@ -178,10 +265,13 @@ class MacVisualCalibrator:
                 "size": {"width": 0, "height": 0}
             }
     
-    def get_browser_url(self) -> Optional[str]:
+    def get_browser_url(self, browser_info: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """
         获取浏览器当前URL
         
+        Args:
+            browser_info: 已获取的浏览器信息，可选，未提供时重新查询
+        
         Returns:
             Optional[str]: 当前URL，如果失败则返回None
         """
@@ -192,7 +282,8 @@ class MacVisualCalibrator:
         
         try:
             # 获取浏览器信息
-            browser_info = self.get_active_browser_info()
+            if browser_info is None:
+                browser_info = self.get_active_browser_info()
             browser_name = browser_info["name"].lower()
             
             # 根据不同浏览器使用不同的AppleScript
@@ -218,9 +309,9 @@ class MacVisualCalibrator:
                 logger.warning(f"不支持的浏览器: {browser_name}")
                 return None
             
-            # 执行AppleScript
-            cmd = ["osascript", "-e", script]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # 执行AppleScript（通过标准输入传递脚本，不受命令行长度限制）
+            cmd = ["osascript", "-"]
+            result = subprocess.run(cmd, input=script, capture_output=True, text=True)
             
             if result.returncode == 0:
                 url = result.stdout.strip()
@@ -234,12 +325,24 @@ class MacVisualCalibrator:
             logger.error(f"获取浏览器URL失败: {e}")
             return None
     
-    def detect_browser_window(self, screenshot_path: str) -> Optional[Tuple[int, int, int, int]]:
+    def _query_frontmost_and_url(self) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        查询前台浏览器信息及其当前URL
+        
+        Returns:
+            Tuple[Dict[str, Any], Optional[str]]: 浏览器信息和当前URL
+        """
+        browser_info = self.get_active_browser_info()
+        url = self.get_browser_url(browser_info)
+        return browser_info, url
+    
+    def detect_browser_window(self, screenshot_path: str, browser_info: Optional[Dict[str, Any]] = None) -> Optional[Tuple[int, int, int, int]]:
         """
         检测浏览器窗口位置
         
         Args:
             screenshot_path: 截图文件路径
+            browser_info: 已获取的浏览器信息，可选，未提供时重新查询
         
         Returns:
             Optional[Tuple[int, int, int, int]]: 浏览器窗口坐标 (x1, y1, x2, y2)，如果检测失败则返回None
@@ -248,8 +351,7 @@ class MacVisualCalibrator:
             # 如果使用简化模式，使用全屏作为浏览器窗口
             if self.config.get("simple_mode"):
                 # 获取屏幕尺寸
-                img = Image.open(screenshot_path)
-                width, height = img.size
+                width, height = self._get_image_size(screenshot_path)
                 
                 # 使用全屏作为浏览器窗口
                 browser_window = (0, 0, width, height)
@@ -258,7 +360,8 @@ class MacVisualCalibrator:
                 return browser_window
             
             # 获取浏览器信息
-            browser_info = self.get_active_browser_info()
+            if browser_info is None:
+                browser_info = self.get_active_browser_info()
             
             # 提取窗口位置和大小
             x = browser_info["position"]["x"]
@@ -278,8 +381,7 @@ class MacVisualCalibrator:
             # 如果无法获取浏览器窗口，使用图像处理方法估计
             try:
                 # 获取屏幕尺寸
-                img = Image.open(screenshot_path)
-                width, height = img.size
+                width, height = self._get_image_size(screenshot_path)
                 
                 # 假设浏览器窗口占据了大部分屏幕
                 margin = min(width, height) // 10
@@ -332,12 +434,7 @@ class MacVisualCalibrator:
                 draw.line([(x, y1), (x, y2)], fill="blue", width=1)
             
             # 标记坐标
-            try:
-                # 尝试加载字体
-                font = ImageFont.truetype("Arial.ttf", 12)
-            except IOError:
-                # 如果无法加载字体，使用默认字体
-                font = ImageFont.load_default()
+            font = self._get_font(12)
             
             # 标记网格坐标
             for i in range(grid_size + 1):
@@ -358,13 +455,14 @@ class MacVisualCalibrator:
             logger.error(f"创建校准网格失败: {e}")
             return screenshot_path
     
-    def detect_content_regions(self, screenshot_path: str, browser_window: Tuple[int, int, int, int]) -> Dict[str, Tuple[int, int, int, int]]:
+    def detect_content_regions(self, screenshot_path: str, browser_window: Tuple[int, int, int, int], url: Optional[str] = None) -> Dict[str, Tuple[int, int, int, int]]:
         """
         检测内容区域
         
         Args:
             screenshot_path: 截图文件路径
             browser_window: 浏览器窗口坐标 (x1, y1, x2, y2)
+            url: 已获取的浏览器URL，可选，未提供时重新查询
         
         Returns:
             Dict[str, Tuple[int, int, int, int]]: 检测到的区域，格式为 {"work_list": (x1, y1, x2, y2), "action_list": (x1, y1, x2, y2)}
@@ -378,10 +476,11 @@ class MacVisualCalibrator:
             # 如果使用手动区域标定模式，提示用户手动标定
             if self.config.get("manual_regions"):
                 logger.info("使用手动区域标定模式")
-                return self._manual_region_selection(screenshot_path, browser_window)
+                return self._manual_region_selection(screenshot_path, browser_window, url)
             
             # 获取当前URL
-            url = self.get_browser_url() if not self.config.get("simple_mode") else self.config.get("manus_url", "https://manus.im/")
+            if url is None:
+                url = self.get_browser_url() if not self.config.get("simple_mode") else self.config.get("manus_url", "https://manus.im/")
             
             # 检查是否为目标网站
             pattern = self.config.get("browser_window_title_pattern", r".*manus\.im.*")
@@ -443,24 +542,69 @@ class MacVisualCalibrator:
                 "action_list": (0, 0, 0, 0)
             }
     
-    def _manual_region_selection(self, screenshot_path: str, browser_window: Tuple[int, int, int, int]) -> Dict[str, Tuple[int, int, int, int]]:
+    def _calibration_cache_key(self, browser_window: Tuple[int, int, int, int], screen_size: Tuple[int, int], url: Optional[str]) -> str:
+        """
+        生成校准缓存键
+        
+        Args:
+            browser_window: 浏览器窗口坐标 (x1, y1, x2, y2)
+            screen_size: 屏幕尺寸 (width, height)
+            url: 浏览器当前URL，只使用协议和主机部分
+        
+        Returns:
+            str: 缓存键
+        """
+        # 同一站点不同页面的布局相同，去掉路径和查询参数，避免每个页面各占一条缓存
+        site = None
+        if url:
+            parts = urlsplit(url)
+            site = f"{parts.scheme}://{parts.netloc}" if parts.netloc else url
+        key_data = json.dumps([list(browser_window), list(screen_size), site])
+        return hashlib.sha1(key_data.encode("utf-8")).hexdigest()
+    
+    def _prompt_grid_region(self, label: str) -> Tuple[int, int, int, int]:
+        """
+        提示用户输入区域的网格坐标
+        
+        Args:
+            label: 区域名称
+        
+        Returns:
+            Tuple[int, int, int, int]: 网格坐标 (x1, y1, x2, y2)
+        """
+        print(f"\n请输入{label}区域的网格坐标:")
+        return (
+            int(input("左上角X坐标 (0-10): ")),
+            int(input("左上角Y坐标 (0-10): ")),
+            int(input("右下角X坐标 (0-10): ")),
+            int(input("右下角Y坐标 (0-10): "))
+        )
+    
+    def _manual_region_selection(self, screenshot_path: str, browser_window: Tuple[int, int, int, int], url: Optional[str] = None) -> Dict[str, Tuple[int, int, int, int]]:
         """
         手动区域选择
         
+        如果相同浏览器窗口、屏幕尺寸和站点已经校准过，直接复用缓存的区域；
+        如果通过命令行提供了网格坐标，则不再提示用户输入。
+        
         Args:
             screenshot_path: 截图文件路径
             browser_window: 浏览器窗口坐标 (x1, y1, x2, y2)
+            url: 浏览器当前URL，可选
         
         Returns:
             Dict[str, Tuple[int, int, int, int]]: 手动选择的区域
         """
         try:
-            # 创建带网格的截图
-            grid_path = self.create_calibration_grid(screenshot_path, browser_window)
+            # 检查校准缓存
+            screen_size = self._get_image_size(screenshot_path)
+            cache_key = self._calibration_cache_key(browser_window, screen_size, url)
+            calibration_cache = dict(self.config.get("calibration_cache") or {})
             
-            # 显示带网格的截图
-            print(f"\n请查看带网格的截图: {grid_path}")
-            print("根据网格坐标，请输入工作列表和操作列表的区域坐标。")
+            if cache_key in calibration_cache and not self.grid_regions:
+                regions = {name: tuple(region) for name, region in calibration_cache[cache_key].items()}
+                logger.info(f"复用已有校准结果: {regions}")
+                return regions
             
             # 获取浏览器窗口尺寸
             x1, y1, x2, y2 = browser_window
@@ -472,19 +616,19 @@ class MacVisualCalibrator:
             cell_width = width // grid_size
             cell_height = height // grid_size
             
-            # 提示用户输入工作列表区域
-            print("\n请输入工作列表区域的网格坐标:")
-            work_list_x1 = int(input("左上角X坐标 (0-10): "))
-            work_list_y1 = int(input("左上角Y坐标 (0-10): "))
-            work_list_x2 = int(input("右下角X坐标 (0-10): "))
-            work_list_y2 = int(input("右下角Y坐标 (0-10): "))
+            # 仅在需要用户输入时创建并显示带网格的截图
+            if not ("work_list" in self.grid_regions and "action_list" in self.grid_regions):
+                grid_path = self.create_calibration_grid(screenshot_path, browser_window)
+                print(f"\n请查看带网格的截图: {grid_path}")
+                print("根据网格坐标，请输入工作列表和操作列表的区域坐标。")
             
-            # 提示用户输入操作列表区域
-            print("\n请输入操作列表区域的网格坐标:")
-            action_list_x1 = int(input("左上角X坐标 (0-10): "))
-            action_list_y1 = int(input("左上角Y坐标 (0-10): "))
-            action_list_x2 = int(input("右下角X坐标 (0-10): "))
-            action_list_y2 = int(input("右下角Y坐标 (0-10): "))
+            # 工作列表和操作列表区域的网格坐标
+            work_list_x1, work_list_y1, work_list_x2, work_list_y2 = (
+                self.grid_regions.get("work_list") or self._prompt_grid_region("工作列表")
+            )
+            action_list_x1, action_list_y1, action_list_x2, action_list_y2 = (
+                self.grid_regions.get("action_list") or self._prompt_grid_region("操作列表")
+            )
             
             # 转换网格坐标为像素坐标
             work_list_region = (
@@ -516,17 +660,25 @@ class MacVisualCalibrator:
                 (action_list_y2 * cell_height) / height
             ]
             
-            # 保存配置
-            self.config_manager.update({
-                "default_work_list_region": self.config["default_work_list_region"],
-                "default_action_list_region": self.config["default_action_list_region"]
-            })
-            
             regions = {
                 "work_list": work_list_region,
                 "action_list": action_list_region
             }
             
+            # 记录校准缓存，重新写入的条目移到末尾，超出上限时淘汰最早的条目
+            calibration_cache.pop(cache_key, None)
+            calibration_cache[cache_key] = {name: list(region) for name, region in regions.items()}
+            while len(calibration_cache) > MAX_CALIBRATION_CACHE_ENTRIES:
+                del calibration_cache[next(iter(calibration_cache))]
+            self.config["calibration_cache"] = calibration_cache
+            
+            # 保存配置
+            self._save_config({
+                "default_work_list_region": self.config["default_work_list_region"],
+                "default_action_list_region": self.config["default_action_list_region"],
+                "calibration_cache": calibration_cache
+            })
+            
             logger.info(f"手动选择的区域: {regions}")
             return regions
         
@@ -568,11 +720,7 @@ class MacVisualCalibrator:
                 draw.rectangle(region, outline=color, width=2)
                 
                 # 添加标签
-                try:
-                    font = ImageFont.truetype("Arial.ttf", 16)
-                except IOError:
-                    font = ImageFont.load_default()
-                
+                font = self._get_font(16)
                 draw.text((x1 + 5, y1 + 5), name, fill=color, font=font)
             
             # 保存带标记的截图
@@ -603,6 +751,7 @@ class MacVisualCalibrator:
             
             # 提取区域内容
             region_images = {}
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
             for name, region in regions.items():
                 if region == (0, 0, 0, 0):
@@ -612,11 +761,7 @@ class MacVisualCalibrator:
                 region_img = img.crop(region)
                 
                 # 保存区域图像
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                region_path = os.path.join(
-                    self.config.get("log_dir", os.path.expanduser("~/mcp_logs")),
-                    f"{name}_{timestamp}.png"
-                )
+                region_path = os.path.join(self._log_dir, f"{name}_{timestamp}.png")
                 region_img.save(region_path)
                 
                 region_images[name] = region_path
@@ -676,18 +821,21 @@ class MacVisualCalibrator:
             Dict[str, Any]: 校准结果
         """
         try:
-            # 捕获屏幕截图
-            screenshot_path = self.capture_screenshot()
+            # 并行捕获屏幕截图和查询浏览器信息
+            screenshot_future = self._executor.submit(self.capture_screenshot)
+            browser_future = self._executor.submit(self._query_frontmost_and_url)
+            screenshot_path = screenshot_future.result()
+            browser_info, url = browser_future.result()
             if not screenshot_path:
                 return {"status": "error", "message": "捕获屏幕截图失败"}
             
             # 检测浏览器窗口
-            browser_window = self.detect_browser_window(screenshot_path)
+            browser_window = self.detect_browser_window(screenshot_path, browser_info)
             if not browser_window:
                 return {"status": "error", "message": "检测浏览器窗口失败"}
             
             # 检测内容区域
-            regions = self.detect_content_regions(screenshot_path, browser_window)
+            regions = self.detect_content_regions(screenshot_path, browser_window, url)
             
             # 可视化检测到的区域
             marked_path = self.visualize_detected_regions(screenshot_path, regions)
@@ -715,9 +863,33 @@ class MacVisualCalibrator:
             return {"status": "error", "message": str(e)}
 
 
+def grid_coords(value: str) -> Tuple[int, int, int, int]:
+    """
+    解析网格坐标命令行参数
+    
+    Args:
+        value: 网格坐标字符串，格式为 x1,y1,x2,y2（0-10，且左上角小于右下角）
+    
+    Returns:
+        Tuple[int, int, int, int]: 网格坐标 (x1, y1, x2, y2)
+    """
+    try:
+        coords = tuple(int(v) for v in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"网格坐标必须是整数: {value}")
+    
+    if len(coords) != 4:
+        raise argparse.ArgumentTypeError(f"网格坐标必须是4个整数 x1,y1,x2,y2: {value}")
+    
+    x1, y1, x2, y2 = coords
+    if not all(0 <= v <= 10 for v in coords) or x1 >= x2 or y1 >= y2:
+        raise argparse.ArgumentTypeError(f"网格坐标必须在0-10之间且左上角小于右下角: {value}")
+    
+    return coords
+
+
 def main():
     """主函数"""
-    import argparse
     
     # 解析命令行参数
     parser = argparse.ArgumentParser(description="Mac视觉校准工具")
@@ -725,19 +897,26 @@ def main():
     parser.add_argument("--output_dir", help="输出目录路径")
     parser.add_argument("--simple_mode", action="store_true", help="使用简化模式（不使用AppleScript）")
     parser.add_argument("--manual_regions", action="store_true", help="使用手动区域标定模式")
+    parser.add_argument("--work_list_grid", type=grid_coords, help="工作列表区域的网格坐标，格式: x1,y1,x2,y2")
+    parser.add_argument("--action_list_grid", type=grid_coords, help="操作列表区域的网格坐标，格式: x1,y1,x2,y2")
     
     args = parser.parse_args()
     
-    # 创建Mac视觉校准器
-    calibrator = MacVisualCalibrator(
+    # 网格坐标已由grid_coords校验
+    grid_regions = {}
+    for name, value in (("work_list", args.work_list_grid), ("action_list", args.action_list_grid)):
+        if value:
+            grid_regions[name] = value
+    
+    # 创建Mac视觉校准器并运行视觉校准
+    with MacVisualCalibrator(
         config_path=args.config,
         output_dir=args.output_dir,
         simple_mode=args.simple_mode,
-        manual_regions=args.manual_regions
-    )
-    
-    # 运行视觉校准
-    result = calibrator.run()
+        manual_regions=args.manual_regions,
+        grid_regions=grid_regions
+    ) as calibrator:
+        result = calibrator.run()
     
     # 输出结果
     if result["status"] == "success":
@@ -9,12 +9,17 @@
 """
 
 import os
+import io
 import time
+import random
 import logging
 import asyncio
 from typing import Dict, List, Any, Optional, Tuple, Union
 import threading
-from PIL import Image, ImageChops, ImageStat
+import shutil
+from collections import deque
+import numpy as np
+from PIL import Image
 import tempfile
 
 # 配置日志
@@ -24,6 +29,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ManusNavigator")
 
+# 页面状态探测脚本，一次evaluate调用同时取回标题和URL
+JS_PROBE = "() => ({title: document.title, url: location.href})"
+
+# 登录页面检测选择器，合并为一个选择器列表，在页面内一次求值
+LOGIN_SELECTOR = ":text('Login'), :text('Sign In'), input[type='password']"
+
+# dHash汉明距离不超过该值时认为与参考图像匹配（64位指纹）
+DHASH_MATCH_THRESHOLD = 6
+
+# 监控出错或导航失败时的最大重试间隔（秒）
+MAX_RETRY_BACKOFF = 600.0
+
+# NumPy 2.0+ 提供按元素popcount（对应CPU的POPCNT指令）
+HAS_BITWISE_COUNT = hasattr(np, "bitwise_count")
+
 class ManusNavigator:
     """
     Manus界面自动导航器，负责检测Manus界面，
@@ -34,7 +54,10 @@ class ManusNavigator:
                  manus_url: str = "https://manus.im/",
                  check_interval: float = 30.0,
                  auto_navigate: bool = True,
-                 screenshot_dir: Optional[str] = None):
+                 screenshot_dir: Optional[str] = None,
+                 save_screenshots: bool = False,
+                 max_saved_screenshots: int = 20,
+                 reference_image: Optional[Union[str, List[str]]] = None):
         """
         初始化Manus导航器
         
@@ -43,37 +66,75 @@ class ManusNavigator:
             check_interval: 检查间隔（秒）
             auto_navigate: 是否自动导航
             screenshot_dir: 截图保存目录，如果为None则使用临时目录
+            save_screenshots: 是否将检查用的截图保存到磁盘（调试用），默认只在内存中处理
+            max_saved_screenshots: 保存截图时最多保留的数量，超出后删除最早的截图
+            reference_image: Manus界面参考图像路径（或路径列表），用于视觉特征识别，如果为None则不进行视觉识别
         """
         self.manus_url = manus_url
         self.check_interval = check_interval
         self.auto_navigate = auto_navigate
+        self.save_screenshots = save_screenshots
         
-        # 截图保存目录
-        self.screenshot_dir = screenshot_dir or tempfile.mkdtemp()
-        os.makedirs(self.screenshot_dir, exist_ok=True)
+        # 截图保存目录（仅在保存截图时创建），自行创建的临时目录在关闭时删除
+        self.screenshot_dir = screenshot_dir
+        self._owns_tmpdir = False
+        if self.save_screenshots:
+            if not self.screenshot_dir:
+                self.screenshot_dir = tempfile.mkdtemp()
+                self._owns_tmpdir = True
+            os.makedirs(self.screenshot_dir, exist_ok=True)
         
-        # 浏览器和页面对象
+        # 已保存的截图路径，只保留最近的max_saved_screenshots张
+        self.max_saved_screenshots = max_saved_screenshots
+        self._saved_screenshots = deque()
+        
+        # Playwright驱动、浏览器和页面对象（均属于下面的事件循环）
+        self._async_playwright = None  # 由_init_playwright解析一次
+        self._playwright = None
         self.browser = None
         self.page = None
         
-        # 监控线程
-        self.monitor_thread = None
-        self.stop_event = threading.Event()
+        # Playwright事件循环，在专用线程中运行，所有Playwright调用都在该循环中执行
+        self._loop = None
+        self._loop_thread = None
+        
+        # 监控任务（运行在Playwright事件循环中，停止时直接取消）
+        self._monitor_task = None
+        
+        # 当前重试间隔，连续失败时指数增长，成功后重置
+        self._backoff = self.check_interval
         
         # 界面特征
         self.manus_features = {
             "logo": None,  # Manus logo图像特征
+            "logo_dhash": None,  # 参考图像的dHash指纹数组(uint64)
             "taskbar": None,  # 任务栏特征
             "title": "Manus"  # 页面标题特征
         }
         
+        # 预先计算参考图像指纹，每次检查只需计算截图指纹
+        if reference_image:
+            reference_images = [reference_image] if isinstance(reference_image, str) else list(reference_image)
+            ref_hashes = []
+            for path in reference_images:
+                try:
+                    with Image.open(path) as ref:
+                        ref_hashes.append(self._dhash(ref))
+                except Exception as e:
+                    logger.error(f"加载参考图像失败: {path}, {e}")
+            
+            if ref_hashes:
+                self.manus_features["logo"] = reference_images
+                self.manus_features["logo_dhash"] = np.array(ref_hashes, dtype=np.uint64)
+        
         # 初始化Playwright
         self._init_playwright()
     
     def _init_playwright(self):
-        """初始化Playwright"""
+        """初始化Playwright（只导入一次，保存入口函数供导航时使用）"""
         try:
-            from playwright.sync_api import sync_playwright
+            from playwright.async_api import async_playwright
+            self._async_playwright = async_playwright
             logger.info("Playwright已初始化")
             return True
         except ImportError:
@@ -81,74 +142,146 @@ class ManusNavigator:
             logger.error("安装后请运行: playwright install")
             return False
     
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        获取Playwright事件循环，首次调用时在专用线程中启动
+        
+        Returns:
+            asyncio.AbstractEventLoop: 事件循环
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever,
+                daemon=True
+            )
+            self._loop_thread.start()
+        
+        return self._loop
+    
+    def _run(self, coro):
+        """
+        在Playwright事件循环中执行协程并等待结果（供同步接口调用）
+        
+        Args:
+            coro: 要执行的协程
+        
+        Returns:
+            Any: 协程的返回值
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+    
+    def is_monitoring(self) -> bool:
+        """
+        检查监控任务是否正在运行
+        
+        Returns:
+            bool: 如果监控任务正在运行，返回True；否则返回False
+        """
+        return self._monitor_task is not None and not self._monitor_task.done()
+    
     def start_monitoring(self):
-        """启动监控线程"""
-        if self.monitor_thread and self.monitor_thread.is_alive():
-            logger.warning("监控线程已在运行")
+        """启动监控任务"""
+        if self.is_monitoring():
+            logger.warning("监控任务已在运行")
             return
         
-        # 重置停止事件
-        self.stop_event.clear()
-        
-        # 启动监控线程
-        self.monitor_thread = threading.Thread(
-            target=self._monitor_loop,
-            daemon=True
-        )
-        self.monitor_thread.start()
+        # 在Playwright事件循环中创建监控任务
+        self._monitor_task = self._run(self._create_monitor_task())
         
-        logger.info("Manus界面监控线程已启动")
+        logger.info("Manus界面监控任务已启动")
     
     def stop_monitoring(self):
-        """停止监控线程"""
-        if not self.monitor_thread or not self.monitor_thread.is_alive():
-            logger.warning("监控线程未运行")
+        """停止监控任务"""
+        if not self.is_monitoring():
+            logger.warning("监控任务未运行")
             return
         
-        # 设置停止事件
-        self.stop_event.set()
+        # 取消监控任务并等待其结束
+        self._run(self._cancel_monitor_task())
         
-        # 等待线程结束
-        self.monitor_thread.join(timeout=5.0)
+        logger.info("Manus界面监控任务已停止")
+    
+    async def _create_monitor_task(self) -> asyncio.Task:
+        """
+        创建监控任务（任务必须在事件循环线程中创建）
         
-        logger.info("Manus界面监控线程已停止")
+        Returns:
+            asyncio.Task: 监控任务
+        """
+        return asyncio.get_running_loop().create_task(self._monitor_loop_async())
     
-    def _monitor_loop(self):
-        """监控循环"""
-        while not self.stop_event.is_set():
+    async def _cancel_monitor_task(self):
+        """取消监控任务，最多等待5秒"""
+        self._monitor_task.cancel()
+        try:
+            await asyncio.wait_for(self._monitor_task, 5.0)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            pass
+    
+    async def _monitor_loop_async(self):
+        """监控循环，取消任务即停止"""
+        while True:
+            failed = False
             try:
                 # 检查Manus界面
-                if not self.is_manus_interface_open():
+                if not await self._is_manus_interface_open_async():
                     logger.info("未检测到Manus界面")
                     
                     if self.auto_navigate:
                         # 自动导航到Manus
-                        self.navigate_to_manus()
-                
-                # 等待下一次检查
-                time.sleep(self.check_interval)
+                        failed = not await self._navigate_to_manus_async()
             except Exception as e:
                 logger.error(f"监控循环异常: {e}")
-                time.sleep(self.check_interval * 2)  # 出错后等待更长时间
+                failed = True
+            
+            if failed:
+                # 指数退避并加入随机抖动，避免多个监控实例同步重试
+                delay = self._backoff + random.uniform(0, self._backoff * 0.25)
+                self._backoff = min(self._backoff * 2, MAX_RETRY_BACKOFF)
+                logger.info(f"将在{delay:.1f}秒后重试")
+            else:
+                self._backoff = self.check_interval
+                delay = self.check_interval
+            
+            # 等待下一次检查
+            await asyncio.sleep(delay)
     
     def is_manus_interface_open(self):
         """
         检查Manus界面是否已打开
         
+        Returns:
+            bool: 如果Manus界面已打开，返回True；否则返回False
+        """
+        return self._run(self._is_manus_interface_open_async())
+    
+    async def _is_manus_interface_open_async(self):
+        """
+        检查Manus界面是否已打开（协程版本）
+        
         Returns:
             bool: 如果Manus界面已打开，返回True；否则返回False
         """
         try:
-            # 方法1: 检查当前活跃的浏览器窗口标题
-            if self._check_browser_title():
-                return True
+            # 一次往返获取页面标题和URL
+            state = await self._probe_page()
             
-            # 方法2: 视觉特征识别
-            if self._check_visual_features():
-                return True
+            if state:
+                # 方法1: 检查页面标题
+                if self._check_browser_title(state):
+                    return True
+                
+                # 方法2: 检查URL
+                if self._check_browser_url(state):
+                    return True
+            
+            # 没有Playwright页面时，桌面截图与Manus界面无关，不做视觉识别
+            if not self.page or self.page.is_closed():
+                return False
             
-            # 方法3: 检查URL
-            if self._check_browser_url():
+            # 方法3: 视觉特征识别（仅在标题和URL都未命中时截图）
+            if await self._check_visual_features():
                 return True
             
             return False
@@ -156,79 +289,152 @@ class ManusNavigator:
             logger.error(f"检查Manus界面异常: {e}")
             return False
     
-    def _check_browser_title(self):
-        """检查浏览器标题"""
+    async def _probe_page(self):
+        """
+        通过一次evaluate调用获取当前页面状态
+        
+        Returns:
+            Dict[str, str]: 页面状态，包括title和url，如果没有可用页面则返回None
+        """
         try:
-            # 使用Playwright获取当前页面标题
             if self.page and not self.page.is_closed():
-                title = self.page.title()
-                if "Manus" in title:
-                    logger.info(f"通过标题检测到Manus界面: {title}")
-                    return True
+                return await self.page.evaluate(JS_PROBE)
             
-            return False
+            return None
         except Exception as e:
-            logger.error(f"检查浏览器标题异常: {e}")
-            return False
+            logger.error(f"获取页面状态异常: {e}")
+            return None
+    
+    def _check_browser_title(self, state: Dict[str, str]):
+        """
+        检查浏览器标题
+        
+        Args:
+            state: 页面状态
+        """
+        title = state.get("title") or ""
+        if "Manus" in title:
+            logger.info(f"通过标题检测到Manus界面: {title}")
+            return True
+        
+        return False
     
-    def _check_visual_features(self):
+    async def _check_visual_features(self):
         """检查视觉特征"""
         try:
+            # 没有参考图像时无法比较，不必截图
+            ref_hashes = self.manus_features["logo_dhash"]
+            if ref_hashes is None:
+                return False
+            
             # 截取屏幕
-            screenshot = self._take_screenshot()
+            screenshot = await self._take_screenshot()
             if screenshot is None:
                 return False
             
-            # TODO: 实现视觉特征识别
-            # 这里可以使用图像处理库比较截图与已知的Manus界面特征
-            # 例如，检测Manus logo或特定UI元素
+            # 一次性比较截图与所有参考图像的dHash指纹，取最小汉明距离
+            distance = int(self._hamming_distances(ref_hashes, self._dhash(screenshot)).min())
+            if distance <= DHASH_MATCH_THRESHOLD:
+                logger.info(f"通过视觉特征检测到Manus界面，指纹距离: {distance}")
+                return True
             
-            return False  # 暂时返回False，等待实现
+            return False
         except Exception as e:
             logger.error(f"检查视觉特征异常: {e}")
             return False
     
-    def _check_browser_url(self):
-        """检查浏览器URL"""
+    def _check_browser_url(self, state: Dict[str, str]):
+        """
+        检查浏览器URL
+        
+        Args:
+            state: 页面状态
+        """
+        url = state.get("url") or ""
+        if self.manus_url in url:
+            logger.info(f"通过URL检测到Manus界面: {url}")
+            return True
+        
+        return False
+    
+    @staticmethod
+    def _dhash(img: Image.Image) -> int:
+        """
+        计算图像的差值哈希(dHash)指纹，对缩放和抗锯齿不敏感
+        
+        Args:
+            img: 图像
+        
+        Returns:
+            int: 64位指纹
+        """
+        a = np.asarray(img.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.uint8)
+        
+        # 每行相邻像素比较得到64位，按行优先打包为整数
+        bits = (a[:, :-1] > a[:, 1:]).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+    
+    @staticmethod
+    def _hamming_distances(ref_hashes: np.ndarray, h: int) -> np.ndarray:
+        """
+        计算指纹与一组参考指纹之间的汉明距离
+        
+        Args:
+            ref_hashes: 参考指纹数组(uint64)
+            h: 待比较的64位指纹
+        
+        Returns:
+            np.ndarray: 与每个参考指纹的汉明距离
+        """
+        diff = np.bitwise_xor(ref_hashes, np.uint64(h))
+        if HAS_BITWISE_COUNT:
+            return np.bitwise_count(diff)
+        
+        # 旧版NumPy: 拆成字节后展开为位再求和（Python 3.9下也不能使用int.bit_count）
+        return np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+    
+    def _save_screenshot(self, buf: bytes):
+        """
+        保存截图到截图目录，超出保留数量时删除最早的截图
+        
+        Args:
+            buf: JPEG截图数据
+        """
         try:
-            # 使用Playwright获取当前页面URL
-            if self.page and not self.page.is_closed():
-                url = self.page.url
-                if self.manus_url in url:
-                    logger.info(f"通过URL检测到Manus界面: {url}")
-                    return True
+            screenshot_path = os.path.join(self.screenshot_dir, f"manus_check_{int(time.time() * 1000)}.jpg")
+            with open(screenshot_path, 'wb') as f:
+                f.write(buf)
+            self._saved_screenshots.append(screenshot_path)
             
-            return False
+            while len(self._saved_screenshots) > self.max_saved_screenshots:
+                try:
+                    os.unlink(self._saved_screenshots.popleft())
+                except FileNotFoundError:
+                    pass
         except Exception as e:
-            logger.error(f"检查浏览器URL异常: {e}")
-            return False
+            logger.error(f"保存截图异常: {e}")
     
-    def _take_screenshot(self):
+    async def _take_screenshot(self):
         """
-        截取屏幕
+        截取当前Playwright页面
         
         Returns:
-            PIL.Image: 截图对象，如果失败则返回None
+            PIL.Image: 截图对象，如果没有可用页面或失败则返回None
         """
         try:
-            # 使用Playwright截图
-            if self.page and not self.page.is_closed():
-                screenshot_path = os.path.join(self.screenshot_dir, f"manus_check_{int(time.time())}.png")
-                self.page.screenshot(path=screenshot_path)
-                
-                # 加载截图
-                from PIL import Image
-                screenshot = Image.open(screenshot_path)
-                return screenshot
-            
-            # 如果没有活跃的Playwright页面，使用系统截图
-            try:
-                from PIL import ImageGrab
-                screenshot = ImageGrab.grab()
-                return screenshot
-            except ImportError:
-                logger.error("无法使用PIL.ImageGrab进行截图")
+            if not self.page or self.page.is_closed():
                 return None
+            
+            # 使用Playwright截图，直接在内存中解码（JPEG编码比PNG快得多，视觉检查不需要无损）
+            buf = await self.page.screenshot(type="jpeg", quality=60)
+            
+            # 调试时保存截图
+            if self.save_screenshots:
+                self._save_screenshot(buf)
+            
+            # 加载截图
+            screenshot = Image.open(io.BytesIO(buf))
+            return screenshot
         except Exception as e:
             logger.error(f"截图异常: {e}")
             return None
@@ -237,6 +443,15 @@ class ManusNavigator:
         """
         导航到Manus网站
         
+        Returns:
+            bool: 如果导航成功，返回True；否则返回False
+        """
+        return self._run(self._navigate_to_manus_async())
+    
+    async def _navigate_to_manus_async(self):
+        """
+        导航到Manus网站（协程版本）
+        
         Returns:
             bool: 如果导航成功，返回True；否则返回False
         """
@@ -244,7 +459,7 @@ class ManusNavigator:
             logger.info(f"正在导航到Manus: {self.manus_url}")
             
             # 使用Playwright导航
-            if not self._navigate_with_playwright():
+            if not await self._navigate_with_playwright():
                 logger.error("使用Playwright导航失败")
                 return False
             
@@ -254,32 +469,40 @@ class ManusNavigator:
             logger.error(f"导航到Manus异常: {e}")
             return False
     
-    def _navigate_with_playwright(self):
+    async def _navigate_with_playwright(self):
         """使用Playwright导航"""
         try:
-            from playwright.sync_api import sync_playwright
-            
-            # 如果已有浏览器实例，先关闭
-            if self.browser:
-                try:
-                    self.browser.close()
-                except:
-                    pass
+            # Playwright驱动进程只启动一次，后续导航复用
+            if self._playwright is None:
+                if self._async_playwright is None:
+                    logger.error("Playwright未安装，无法导航")
+                    return False
+                self._playwright = await self._async_playwright().start()
             
-            # 启动新的浏览器实例
-            playwright = sync_playwright().start()
-            self.browser = playwright.chromium.launch(headless=False)
-            self.page = self.browser.new_page()
+            # 浏览器仍然连接时复用，只在首次导航或浏览器断开后重新启动
+            if self.browser and self.browser.is_connected():
+                if not self.page or self.page.is_closed():
+                    self.page = await self.browser.new_page()
+            else:
+                if self.browser:
+                    try:
+                        await self.browser.close()
+                    except:
+                        pass
+                
+                # 启动新的浏览器实例
+                self.browser = await self._playwright.chromium.launch(headless=False)
+                self.page = await self.browser.new_page()
             
             # 导航到Manus
-            self.page.goto(self.manus_url)
+            await self.page.goto(self.manus_url)
             
             # 等待页面加载
-            self.page.wait_for_load_state("networkidle")
+            await self.page.wait_for_load_state("networkidle")
             
             # 检查是否需要登录
-            if self._check_login_required():
-                if not self._handle_login():
+            if await self._check_login_required():
+                if not await self._handle_login():
                     logger.error("登录失败")
                     return False
             
@@ -289,20 +512,16 @@ class ManusNavigator:
             logger.error(f"使用Playwright导航异常: {e}")
             return False
     
-    def _check_login_required(self):
+    async def _check_login_required(self):
         """检查是否需要登录"""
         try:
-            # 检查是否存在登录表单或登录按钮
-            login_button = self.page.query_selector("text=Login") or \
-                          self.page.query_selector("text=Sign In") or \
-                          self.page.query_selector("input[type='password']")
-            
-            return login_button is not None
+            # 检查是否存在登录表单或登录按钮（一次往返，不等待元素出现）
+            return await self.page.locator(LOGIN_SELECTOR).count() > 0
         except Exception as e:
             logger.error(f"检查登录需求异常: {e}")
             return False
     
-    def _handle_login(self):
+    async def _handle_login(self):
         """处理登录"""
         try:
             logger.info("检测到登录页面，尝试登录")
@@ -322,7 +541,7 @@ class ManusNavigator:
         获取当前Playwright页面对象
         
         Returns:
-            playwright.sync_api.Page: 页面对象，如果未初始化则返回None
+            playwright.async_api.Page: 页面对象（属于导航器的事件循环），如果未初始化则返回None
         """
         return self.page
     
@@ -331,7 +550,7 @@ class ManusNavigator:
         获取当前Playwright浏览器对象
         
         Returns:
-            playwright.sync_api.Browser: 浏览器对象，如果未初始化则返回None
+            playwright.async_api.Browser: 浏览器对象（属于导航器的事件循环），如果未初始化则返回None
         """
         return self.browser
     
@@ -340,13 +559,42 @@ class ManusNavigator:
         # 停止监控
         self.stop_monitoring()
         
-        # 关闭浏览器
+        # 关闭浏览器和Playwright驱动，然后停止事件循环
+        if self._loop is not None and not self._loop.is_closed():
+            try:
+                self._run(self._close_async())
+            except Exception as e:
+                logger.error(f"关闭浏览器异常: {e}")
+            
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5.0)
+            if self._loop_thread.is_alive():
+                # 仍在运行的事件循环不能关闭，留给守护线程随进程退出
+                logger.warning("事件循环线程未能在5秒内停止，跳过关闭事件循环")
+            else:
+                self._loop.close()
+            self._loop = None
+        
+        # 删除自行创建的截图临时目录
+        if self._owns_tmpdir:
+            shutil.rmtree(self.screenshot_dir, ignore_errors=True)
+            self._owns_tmpdir = False
+        
+        logger.info("ManusNavigator已关闭")
+    
+    async def _close_async(self):
+        """关闭浏览器和Playwright驱动"""
         if self.browser:
             try:
-                self.browser.close()
+                await self.browser.close()
             except:
                 pass
             self.browser = None
             self.page = None
         
-        logger.info("ManusNavigator已关闭")
+        if self._playwright:
+            try:
+                await self._playwright.stop()
+            except:
+                pass
+            self._playwright = None
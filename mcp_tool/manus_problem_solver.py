@@ -14,18 +14,37 @@ Manus问题解决驱动器模块 - ManusProblemSolver
 
 import os
 import re
+import sys
 import json
+import queue
+import string
+import uuid
+import ctypes
+import mmap
+import hashlib
 import time
 import datetime
 import logging
-import requests
 import shutil
 import subprocess
 import threading
 import webbrowser
-from typing import Dict, List, Any, Optional, Union, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Dict, List, Any, Optional, Union, Tuple, Iterator, Iterable, Set
 from datetime import datetime
-from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 可选：安装orjson后使用其进行JSON编解码（比标准库json快数倍）
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # 导入思考与操作记录器
 from .thought_action_recorder import ThoughtActionRecorder
@@ -37,6 +56,359 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ManusProblemSolver")
 
+# Linux FICLONE ioctl请求码 _IOW(0x94, 9, int)，在btrfs/XFS/bcachefs上以写时复制方式克隆文件
+FICLONE = 0x40049409
+
+# 计算文件哈希时每次送入的块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 修改时间距今不足该值（纳秒）的文件不缓存哈希，避免同一时间戳内再次修改而误用旧哈希
+HASH_CACHE_MIN_AGE_NS = 2 * 1000 * 1000 * 1000
+
+# 并行复制文件的线程数（复制以I/O为主，线程数可以多于CPU核数）
+COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# 清单中引用git对象的前缀，如 "git:<blob sha1>"
+GIT_OBJECT_PREFIX = "git:"
+
+# 固定保存点基准提交的git引用前缀，防止清单引用的blob被gc清理
+SAVE_POINT_REF_PREFIX = "refs/save_points/"
+
+# 不纳入保存点的目录
+SAVE_POINT_EXCLUDED_DIRS = {".git", "__pycache__", ".save_points"}
+
+# 纳入保存点的文件扩展名（str.endswith直接接受元组）
+_COPY_EXTS = (".py",)
+
+# README问题列表中的问题条目（逐行匹配）
+_ISSUE_ITEM_RE = re.compile(r"- \[([ x])\] (.+)")
+
+# 测试日志中每条记录以日期开头的行开始，后续不带日期的行（如堆栈）属于同一条记录
+_LOG_RECORD_START_RE = re.compile(rb"\d{4}-\d{2}-\d{2}")
+
+# 日志记录中的错误信息（在单条记录内匹配）
+_LOG_ERROR_RE = re.compile(rb"(ERROR|CRITICAL|EXCEPTION|FAIL|FAILED).*?:(.+)", re.IGNORECASE | re.DOTALL)
+
+def _iter_py(root: str, skip: Set[str] = SAVE_POINT_EXCLUDED_DIRS) -> Iterator[Tuple[str, str]]:
+    """
+    遍历目录下所有需要纳入保存点的文件（扩展名见_COPY_EXTS），跳过的目录整棵子树不会进入
+    
+    Args:
+        root: 根目录
+        skip: 跳过的目录名
+        
+    Yields:
+        Tuple[str, str]: (文件路径, 相对根目录的路径)
+    """
+    prefix_len = len(os.path.join(root, ""))
+    stack = [root]
+    
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip:
+                        stack.append(entry.path)
+                elif entry.name.endswith(_COPY_EXTS) and entry.is_file():
+                    yield entry.path, entry.path[prefix_len:]
+
+def _make_parent_dirs(paths: Iterable[str]) -> None:
+    """
+    创建文件的父目录，每个目录只调用一次os.makedirs
+    
+    创建某个目录后其所有上级目录也必然存在，一并记为已创建。
+    
+    Args:
+        paths: 文件路径
+    """
+    made = set()
+    
+    for path in paths:
+        parent = os.path.dirname(path)
+        if parent in made:
+            continue
+        
+        os.makedirs(parent, exist_ok=True)
+        while parent and parent not in made:
+            made.add(parent)
+            parent = os.path.dirname(parent)
+
+def _iter_log_records(log_content: mmap.mmap) -> Iterator[bytes]:
+    """
+    逐行读取日志，按以日期开头的行切分为记录
+    
+    Args:
+        log_content: 内存映射的日志文件
+        
+    Yields:
+        bytes: 单条日志记录
+    """
+    record = []
+    
+    for line in iter(log_content.readline, b""):
+        if record and _LOG_RECORD_START_RE.match(line):
+            yield b"".join(record)
+            record = []
+        record.append(line)
+    
+    if record:
+        yield b"".join(record)
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    """
+    解析JSON，可用时使用orjson
+    
+    Args:
+        data: JSON文本
+        
+    Returns:
+        Any: 解析结果
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    将对象编码为UTF-8 JSON字节串，可用时使用orjson
+    
+    Args:
+        obj: 要编码的对象
+        indent: 是否以2个空格缩进
+        
+    Returns:
+        bytes: JSON字节串
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+# macOS libSystem句柄（clonefile），首次使用时加载
+_libsystem = None
+
+def _copy_file_range(fsrc, fdst) -> None:
+    """
+    在内核中复制文件内容（同一文件系统内零拷贝）
+    
+    Args:
+        fsrc: 源文件对象
+        fdst: 目标文件对象
+    """
+    if not hasattr(os, "copy_file_range"):
+        raise OSError("copy_file_range不可用")
+    
+    remaining = os.fstat(fsrc.fileno()).st_size
+    while remaining > 0:
+        copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+        if copied == 0:
+            break
+        remaining -= copied
+
+def _clonefile(src: str, dst: str) -> bool:
+    """
+    使用macOS APFS的clonefile()克隆文件，目标已存在时先克隆到临时文件再原子替换
+    
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径
+        
+    Returns:
+        bool: 是否克隆成功
+    """
+    global _libsystem
+    if _libsystem is None:
+        _libsystem = ctypes.CDLL("/usr/lib/libSystem.dylib", use_errno=True)
+    
+    tmp_path = f"{dst}.clone-{os.getpid()}"
+    if _libsystem.clonefile(os.fsencode(src), os.fsencode(tmp_path), 0) != 0:
+        return False
+    
+    os.replace(tmp_path, dst)
+    return True
+
+def _fast_copy(src: str, dst: str) -> None:
+    """
+    复制文件（含元数据），优先使用文件系统的写时复制(CoW)克隆，只复制元数据不复制数据块
+    
+    依次尝试: Linux FICLONE ioctl（不支持时使用os.copy_file_range）、macOS clonefile()、
+    Windows CopyFileW，均失败时回退到shutil.copy2。
+    
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径
+    """
+    try:
+        if sys.platform.startswith("linux") and fcntl is not None:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                try:
+                    fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                except OSError:
+                    # 文件系统不支持克隆（ext4等）或跨文件系统
+                    _copy_file_range(fsrc, fdst)
+            shutil.copystat(src, dst)
+            return
+        
+        if sys.platform == "darwin":
+            if _clonefile(src, dst):
+                return
+        
+        elif sys.platform == "win32":
+            if ctypes.windll.kernel32.CopyFileW(src, dst, False):
+                return
+    
+    except OSError as e:
+        logger.debug(f"快速复制失败，回退到shutil.copy2: {src}, {e}")
+    
+    shutil.copy2(src, dst)
+
+# 问题摘要中时间戳行的前缀，生成脚本缓存键时忽略该行
+_SUMMARY_TIMESTAMP_PREFIX = "- 时间戳: "
+
+# Manus.im问题提交自动化脚本模板（摘要、URL和路径以Python字面量代入）
+_SCRIPT_TEMPLATE = string.Template('''#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manus.im问题提交自动化脚本
+生成时间: $generated_at
+"""
+
+import os
+import sys
+import time
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename=$log_path,
+    filemode='w'
+)
+logger = logging.getLogger("ManusImSubmit")
+
+# 问题摘要，复用脚本时通过第一个命令行参数传入本次的摘要
+ISSUES_SUMMARY = sys.argv[1] if len(sys.argv) > 1 else $summary
+
+def main():
+    """主函数"""
+    logger.info("开始执行Manus.im问题提交自动化脚本")
+    
+    try:
+        # 初始化WebDriver
+        logger.info("初始化WebDriver")
+        driver = initialize_webdriver()
+        
+        # 打开Manus.im平台
+        logger.info("打开Manus.im平台")
+        driver.get($url)
+        
+        # 等待页面加载
+        logger.info("等待页面加载")
+        time.sleep(5)
+        
+        # 定位消息输入框
+        logger.info("定位消息输入框")
+        message_input = locate_message_input(driver)
+        
+        # 输入问题摘要
+        logger.info("输入问题摘要")
+        input_issues_summary(message_input, ISSUES_SUMMARY)
+        
+        # 发送消息
+        logger.info("发送消息")
+        send_message(message_input)
+        
+        # 等待响应
+        logger.info("等待响应")
+        time.sleep(10)
+        
+        # 记录结果
+        logger.info("记录结果")
+        result = {
+            "status": "success",
+            "message": "成功将问题提交给Manus.im平台",
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        # 保存结果
+        save_result(result)
+        
+        # 关闭WebDriver
+        logger.info("关闭WebDriver")
+        driver.quit()
+        
+        return result
+    
+    except Exception as e:
+        logger.error(f"执行过程中发生错误: {e}")
+        
+        result = {
+            "status": "error",
+            "message": f"执行过程中发生错误: {e}",
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        # 保存结果
+        save_result(result)
+        
+        return result
+
+def initialize_webdriver():
+    """初始化WebDriver"""
+    options = webdriver.ChromeOptions()
+    options.add_argument("--start-maximized")
+    options.add_argument("--disable-notifications")
+    
+    return webdriver.Chrome(options=options)
+
+def locate_message_input(driver):
+    """定位消息输入框"""
+    try:
+        # 等待消息输入框出现
+        message_input = WebDriverWait(driver, 30).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "[contenteditable='true']"))
+        )
+        return message_input
+    except TimeoutException:
+        logger.error("无法找到消息输入框")
+        raise
+
+def input_issues_summary(message_input, issues_summary):
+    """输入问题摘要"""
+    # 清空输入框
+    message_input.clear()
+    
+    # 输入问题摘要
+    message_input.send_keys(issues_summary)
+    
+    # 等待输入完成
+    time.sleep(2)
+
+def send_message(message_input):
+    """发送消息"""
+    # 按下Ctrl+Enter发送消息
+    message_input.send_keys(Keys.CONTROL + Keys.RETURN)
+
+def save_result(result):
+    """保存结果"""
+    result_path = Path($result_path)
+    
+    with open(result_path, "w") as f:
+        json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
+''')
+
 class ManusProblemSolver:
     """
     Manus问题解决驱动器，支持版本回滚功能，在持续出错时可回滚至保存点。
@@ -50,7 +422,8 @@ class ManusProblemSolver:
                  enhanced_recorder: Optional[Any] = None,
                  test_updater: Optional[Any] = None,
                  rules_checker: Optional[Any] = None,
-                 manus_im_url: Optional[str] = "https://manus.im/app/dOwSylYaP4AL5S41JU3qO0"):
+                 manus_im_url: Optional[str] = "https://manus.im/app/dOwSylYaP4AL5S41JU3qO0",
+                 manus_im_api_endpoint: Optional[str] = None):
         """
         初始化Manus问题解决驱动器
         
@@ -60,49 +433,199 @@ class ManusProblemSolver:
             test_updater: 测试更新器实例，如果为None则创建新实例
             rules_checker: 规则检查器实例，如果为None则创建新实例
             manus_im_url: Manus.im平台URL，默认为https://manus.im/app/dOwSylYaP4AL5S41JU3qO0
+            manus_im_api_endpoint: Manus.im消息提交HTTP接口，设置后优先直接POST问题摘要，失败时才使用浏览器自动化脚本
         """
         self.repo_path = repo_path or os.path.expanduser("~/powerassistant/powerautomation")
         
         # 确保目录存在
         os.makedirs(self.repo_path, exist_ok=True)
         
+        # 已创建的目录（各目录在首次使用时才创建）
+        self._ensured: Set[str] = set()
+        
         # 保存点目录
         self.save_points_dir = os.path.join(self.repo_path, ".save_points")
-        os.makedirs(self.save_points_dir, exist_ok=True)
+        
+        # 保存点对象存储：每个不同内容只保存一份，按SHA-256寻址
+        self.objects_dir = os.path.join(self.save_points_dir, "objects")
+        
+        # 已创建的对象分组目录
+        self._object_dirs: Set[str] = set()
+        
+        # 文件哈希缓存 {绝对路径: (mtime_ns, size, sha256)}，未修改的文件无需重新计算哈希
+        self._hash_cache: Dict[str, Tuple[int, int, str]] = {}
         
         # 解决方案输出目录
         self.solutions_dir = os.path.join(self.repo_path, "manus_solutions")
-        os.makedirs(self.solutions_dir, exist_ok=True)
         
-        # 组件实例
-        self.recorder = enhanced_recorder or ThoughtActionRecorder()
+        # 组件实例（未传入记录器时在首次使用时创建）
+        self._recorder_override = enhanced_recorder
         self.test_updater = test_updater
         self.rules_checker = rules_checker
         
-        # 保存点索引文件
+        # 保存点索引（加载一次后保存在内存中）：旧版index.json加上只追加的index.jsonl
         self.save_points_index_file = os.path.join(self.save_points_dir, "index.json")
-        if not os.path.exists(self.save_points_index_file):
-            with open(self.save_points_index_file, "w") as f:
-                json.dump({"save_points": []}, f)
+        self.save_points_log_file = os.path.join(self.save_points_dir, "index.jsonl")
+        self._index = self._load_json(self.save_points_index_file, {"save_points": []})
+        self._index["save_points"].extend(self._read_jsonl(self.save_points_log_file))
+        
+        # 保存点查找表：按ID、按名称（同名取最早的）
+        self._by_id: Dict[int, Dict] = {}
+        self._by_name: Dict[str, Dict] = {}
+        for save_point in self._index["save_points"]:
+            self._register_save_point(save_point)
         
         # 错误计数器
         self.error_counter_file = os.path.join(self.repo_path, ".error_counter.json")
-        if not os.path.exists(self.error_counter_file):
-            with open(self.error_counter_file, "w") as f:
-                json.dump({"error_count": 0, "last_error_time": None}, f)
+        self._error_counter = self._load_json(self.error_counter_file, {"error_count": 0, "last_error_time": None})
         
         # Manus.im平台URL
         self.manus_im_url = manus_im_url
         
+        # Manus.im HTTP接口（复用连接，会话在首次请求时创建）
+        self.manus_im_api_endpoint = manus_im_api_endpoint
+        
         # 自动化工具目录
         self.automation_tools_dir = os.path.join(self.repo_path, "automation_tools")
-        os.makedirs(self.automation_tools_dir, exist_ok=True)
         
-        # 问题提交历史
+        # 问题提交历史：旧版.submission_history.json加上只追加的.submission_history.jsonl
         self.submission_history_file = os.path.join(self.repo_path, ".submission_history.json")
-        if not os.path.exists(self.submission_history_file):
-            with open(self.submission_history_file, "w") as f:
-                json.dump({"submissions": []}, f)
+        self.submission_log_file = os.path.join(self.repo_path, ".submission_history.jsonl")
+        
+        # 自动化脚本在后台执行，由监控线程等待结束并更新提交历史
+        self._state_lock = threading.Lock()
+        self._script_queue: "queue.Queue[Tuple[subprocess.Popen, str, str, Dict]]" = queue.Queue()
+        self._script_monitor: Optional[threading.Thread] = None
+    
+    @cached_property
+    def recorder(self) -> Any:
+        """
+        思考与操作记录器，未传入时在首次使用时创建
+        
+        Returns:
+            Any: 记录器实例
+        """
+        return self._recorder_override or ThoughtActionRecorder()
+    
+    @cached_property
+    def _session(self) -> Any:
+        """
+        复用连接的HTTP会话，首次使用时才导入requests
+        
+        Returns:
+            Any: requests.Session实例
+        """
+        import requests
+        
+        return requests.Session()
+    
+    def _ensure_dir(self, path: str) -> str:
+        """
+        确保目录存在，每个目录只创建一次
+        
+        Args:
+            path: 目录路径
+            
+        Returns:
+            str: 目录路径
+        """
+        if path not in self._ensured:
+            os.makedirs(path, exist_ok=True)
+            self._ensured.add(path)
+        return path
+    
+    @staticmethod
+    def _write_json(path: str, data: Dict) -> None:
+        """
+        原子写入JSON文件（先写临时文件再替换），中断时不会留下损坏的文件
+        
+        Args:
+            path: 文件路径
+            data: 要写入的数据
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_json_dumps(data, indent=True))
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _load_json(path: str, default: Dict) -> Dict:
+        """
+        加载JSON文件，文件不存在时返回默认内容（首次修改时才写入文件）
+        
+        Args:
+            path: 文件路径
+            default: 默认内容
+            
+        Returns:
+            Dict: 文件内容
+        """
+        try:
+            with open(path, "rb") as f:
+                return _json_loads(f.read())
+        except FileNotFoundError:
+            return default
+    
+    @staticmethod
+    def _append_jsonl(path: str, record: Dict) -> None:
+        """
+        向JSONL文件追加一条记录
+        
+        Args:
+            path: 文件路径
+            record: 记录
+        """
+        with open(path, "ab") as f:
+            f.write(_json_dumps(record) + b"\n")
+    
+    @staticmethod
+    def _read_jsonl(path: str) -> List[Dict]:
+        """
+        读取JSONL文件中的所有记录，跳过写入中断留下的不完整行
+        
+        Args:
+            path: 文件路径
+            
+        Returns:
+            List[Dict]: 记录列表，文件不存在时为空列表
+        """
+        records = []
+        
+        try:
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(_json_loads(line))
+                    except ValueError:
+                        logger.warning(f"跳过无法解析的记录: {path}")
+        except FileNotFoundError:
+            pass
+        
+        return records
+    
+    def _materialize_submission_history(self) -> Dict:
+        """
+        汇总问题提交历史
+        
+        提交记录只追加写入，脚本结束后会以相同ID再追加一条只含最终结果的记录，汇总时按ID合并。
+        
+        Returns:
+            Dict: {"submissions": [...]}，按首次提交的顺序排列
+        """
+        try:
+            with open(self.submission_history_file, "rb") as f:
+                submissions = _json_loads(f.read())["submissions"]
+        except FileNotFoundError:
+            submissions = []
+        
+        latest = {}
+        for record in self._read_jsonl(self.submission_log_file):
+            latest.setdefault(record["id"], {}).update(record)
+        
+        submissions.extend(latest.values())
+        return {"submissions": submissions}
     
     def analyze_issues_and_generate_solutions(self, issues: Optional[List[Dict]] = None) -> Dict:
         """
@@ -151,33 +674,43 @@ class ManusProblemSolver:
         Returns:
             Dict: 保存点信息
         """
-        # 生成保存点ID和名称
+        # 生成保存点ID和名称（同一秒内的多个保存点顺延ID，避免互相覆盖）
         save_point_id = int(time.time())
+        while os.path.exists(os.path.join(self.save_points_dir, str(save_point_id))):
+            save_point_id += 1
         if name is None:
             name = f"save_point_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        # 创建保存点目录
+        # 先在临时目录中生成保存点，完成后原子重命名，中断时不会留下不完整的保存点
         save_point_dir = os.path.join(self.save_points_dir, str(save_point_id))
-        os.makedirs(save_point_dir, exist_ok=True)
-        
-        # 复制当前代码到保存点目录
-        self._copy_code_to_save_point(save_point_dir)
+        tmp_dir = os.path.join(self.save_points_dir, f".tmp-{save_point_id}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        
+        # 将当前代码存入对象存储并写入保存点清单
+        base_commit = self._copy_code_to_save_point(tmp_dir)
+        if base_commit is not None:
+            self._pin_base_commit(save_point_id, base_commit)
+        try:
+            os.rename(tmp_dir, save_point_dir)
+        except OSError:
+            if base_commit is not None:
+                self._git("update-ref", "-d", f"{SAVE_POINT_REF_PREFIX}{save_point_id}")
+            raise
         
         # 更新保存点索引
         save_point_info = {
             "id": save_point_id,
             "name": name,
             "timestamp": datetime.now().isoformat(),
-            "directory": save_point_dir
+            "directory": save_point_dir,
+            "manifest": os.path.join(save_point_dir, "manifest.json"),
+            "base_commit": base_commit
         }
         
-        with open(self.save_points_index_file, "r") as f:
-            index = json.load(f)
-        
-        index["save_points"].append(save_point_info)
-        
-        with open(self.save_points_index_file, "w") as f:
-            json.dump(index, f, indent=2)
+        self._index["save_points"].append(save_point_info)
+        self._register_save_point(save_point_info)
+        self._append_jsonl(self.save_points_log_file, save_point_info)
         
         self.recorder.record_action(
             "create_save_point", 
@@ -187,6 +720,27 @@ class ManusProblemSolver:
         
         return save_point_info
     
+    def _pin_base_commit(self, save_point_id: int, base_commit: str) -> None:
+        """
+        为保存点的基准提交创建git引用，保证清单中的git:对象不会因reset/rebase后的gc而丢失
+        
+        Args:
+            save_point_id: 保存点ID
+            base_commit: 基准提交
+        """
+        if self._git("update-ref", f"{SAVE_POINT_REF_PREFIX}{save_point_id}", base_commit) is None:
+            logger.warning(f"无法为保存点 {save_point_id} 固定基准提交 {base_commit}")
+    
+    def _register_save_point(self, save_point: Dict) -> None:
+        """
+        将保存点加入查找表
+        
+        Args:
+            save_point: 保存点信息
+        """
+        self._by_id[save_point["id"]] = save_point
+        self._by_name.setdefault(save_point["name"], save_point)
+    
     def list_save_points(self) -> List[Dict]:
         """
         列出所有保存点
@@ -194,10 +748,7 @@ class ManusProblemSolver:
         Returns:
             List[Dict]: 保存点列表
         """
-        with open(self.save_points_index_file, "r") as f:
-            index = json.load(f)
-        
-        return index["save_points"]
+        return list(self._index["save_points"])
     
     def rollback_to_save_point(self, save_point_id: Union[int, str]) -> Dict:
         """
@@ -224,18 +775,28 @@ class ManusProblemSolver:
         backup_info = self.create_save_point(f"auto_backup_before_rollback_to_{save_point['name']}")
         
         # 从保存点复制代码到当前目录
-        self._copy_code_from_save_point(save_point["directory"])
-        
-        # 重置错误计数器
-        self._reset_error_counter()
+        unrestored = self._copy_code_from_save_point(save_point["directory"])
         
-        result = {
-            "status": "success",
-            "message": f"成功回滚到保存点: {save_point['name']}",
-            "save_point": save_point,
-            "backup": backup_info,
-            "timestamp": datetime.now().isoformat()
-        }
+        if unrestored:
+            result = {
+                "status": "error",
+                "message": f"回滚到保存点 {save_point['name']} 时有 {len(unrestored)} 个文件无法从git恢复",
+                "unrestored_files": unrestored,
+                "save_point": save_point,
+                "backup": backup_info,
+                "timestamp": datetime.now().isoformat()
+            }
+        else:
+            # 重置错误计数器
+            self._reset_error_counter()
+            
+            result = {
+                "status": "success",
+                "message": f"成功回滚到保存点: {save_point['name']}",
+                "save_point": save_point,
+                "backup": backup_info,
+                "timestamp": datetime.now().isoformat()
+            }
         
         self.recorder.record_action(
             "rollback_to_save_point", 
@@ -252,8 +813,8 @@ class ManusProblemSolver:
         Returns:
             Dict: 回滚结果
         """
-        # 获取所有保存点
-        save_points = self.list_save_points()
+        # 保存点只通过create_save_point按时间顺序追加，索引顺序即时间顺序
+        save_points = self._index["save_points"]
         
         if not save_points:
             error_msg = "没有可用的保存点"
@@ -264,15 +825,9 @@ class ManusProblemSolver:
             )
             return {"status": "error", "message": error_msg}
         
-        # 按时间戳排序
-        save_points.sort(key=lambda x: x["timestamp"], reverse=True)
-        
-        # 如果只有一个保存点，则回滚到该保存点
-        if len(save_points) == 1:
-            return self.rollback_to_save_point(save_points[0]["id"])
-        
-        # 否则回滚到前一个保存点
-        return self.rollback_to_save_point(save_points[1]["id"])
+        # 如果只有一个保存点，则回滚到该保存点，否则回滚到前一个保存点
+        target = save_points[-2 if len(save_points) >= 2 else -1]
+        return self.rollback_to_save_point(target["id"])
     
     def record_test_error(self) -> Dict:
         """
@@ -281,17 +836,13 @@ class ManusProblemSolver:
         Returns:
             Dict: 记录结果，包括是否触发自动回滚
         """
-        # 读取当前错误计数
-        with open(self.error_counter_file, "r") as f:
-            counter_data = json.load(f)
-        
         # 更新错误计数
+        counter_data = self._error_counter
         counter_data["error_count"] += 1
         counter_data["last_error_time"] = datetime.now().isoformat()
         
         # 保存更新后的错误计数
-        with open(self.error_counter_file, "w") as f:
-            json.dump(counter_data, f, indent=2)
+        self._write_json(self.error_counter_file, counter_data)
         
         result = {
             "status": "recorded",
@@ -331,8 +882,8 @@ class ManusProblemSolver:
         """
         重置错误计数器
         """
-        with open(self.error_counter_file, "w") as f:
-            json.dump({"error_count": 0, "last_error_time": None}, f)
+        self._error_counter = {"error_count": 0, "last_error_time": None}
+        self._write_json(self.error_counter_file, self._error_counter)
     
     def submit_issues_to_manus_im(self, issues: List[Dict]) -> Dict:
         """
@@ -349,27 +900,27 @@ class ManusProblemSolver:
         # 准备问题摘要
         issues_summary = self._prepare_issues_summary(issues)
         
-        # 生成自动化脚本
-        script_path = self._generate_automation_script(issues_summary)
-        
-        # 执行自动化脚本
-        result = self._execute_automation_script(script_path)
-        
-        # 记录提交历史
+        # 记录提交历史，脚本结束后由监控线程更新结果
         submission_record = {
+            "id": uuid.uuid4().hex,
             "timestamp": datetime.now().isoformat(),
             "issues_count": len(issues),
             "issues_summary": issues_summary,
-            "result": result
+            "result": None
         }
         
-        with open(self.submission_history_file, "r") as f:
-            history = json.load(f)
+        # 优先通过HTTP接口直接提交
+        result = self._submit_via_http(issues_summary) if self.manus_im_api_endpoint else None
         
-        history["submissions"].append(submission_record)
+        if result is None:
+            # 生成并启动自动化脚本（不等待其结束）
+            script_path = self._generate_automation_script(issues_summary)
+            result = self._execute_automation_script(script_path, issues_summary, submission_record)
         
-        with open(self.submission_history_file, "w") as f:
-            json.dump(history, f, indent=2)
+        with self._state_lock:
+            if submission_record["result"] is None:
+                submission_record["result"] = result
+            self._append_jsonl(self.submission_log_file, submission_record)
         
         self.recorder.record_action(
             "submit_issues_to_manus_im", 
@@ -379,6 +930,35 @@ class ManusProblemSolver:
         
         return result
     
+    def _submit_via_http(self, issues_summary: str) -> Optional[Dict]:
+        """
+        通过HTTP接口直接提交问题摘要
+        
+        Args:
+            issues_summary: 问题摘要
+            
+        Returns:
+            Optional[Dict]: 提交结果，请求失败或返回非2xx状态码时返回None
+        """
+        import requests
+        
+        try:
+            response = self._session.post(self.manus_im_api_endpoint, json={"text": issues_summary}, timeout=10)
+        except requests.RequestException as e:
+            self.recorder.record_thought(f"通过HTTP接口提交问题失败: {e}")
+            return None
+        
+        if not response.ok:
+            self.recorder.record_thought(f"通过HTTP接口提交问题失败: HTTP {response.status_code}")
+            return None
+        
+        return {
+            "status": "success",
+            "message": "已通过HTTP接口将问题提交给Manus.im平台",
+            "status_code": response.status_code,
+            "timestamp": datetime.now().isoformat()
+        }
+    
     def _prepare_issues_summary(self, issues: List[Dict]) -> str:
         """
         准备问题摘要
@@ -389,201 +969,67 @@ class ManusProblemSolver:
         Returns:
             str: 问题摘要
         """
-        summary = "PowerAutomation MCP测试中发现以下问题：\n\n"
+        parts = ["PowerAutomation MCP测试中发现以下问题：\n\n"]
         
         for i, issue in enumerate(issues, 1):
-            summary += f"{i}. {issue['description']}\n"
+            parts.append(f"{i}. {issue['description']}\n")
             
             # 添加问题来源
             if "source" in issue:
-                summary += f"   来源: {issue['source']}\n"
+                parts.append(f"   来源: {issue['source']}\n")
             
             # 添加问题状态
             if "status" in issue:
-                summary += f"   状态: {issue['status']}\n"
-            
-            summary += "\n"
-        
-        # 添加环境信息
-        summary += "环境信息：\n"
-        summary += f"- 仓库路径: {self.repo_path}\n"
-        summary += f"- 时间戳: {datetime.now().isoformat()}\n"
-        summary += f"- 错误计数: {self._get_error_count()}\n"
-        
-        return summary
-    
-    def _get_error_count(self) -> int:
-        """
-        获取当前错误计数
-        
-        Returns:
-            int: 错误计数
-        """
-        with open(self.error_counter_file, "r") as f:
-            counter_data = json.load(f)
-        
-        return counter_data["error_count"]
-    
-    def _generate_automation_script(self, issues_summary: str) -> str:
-        """
-        生成自动化脚本
-        
-        Args:
-            issues_summary: 问题摘要
-            
-        Returns:
-            str: 脚本路径
-        """
-        # 生成脚本文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        script_filename = f"manus_im_submit_{timestamp}.py"
-        script_path = os.path.join(self.automation_tools_dir, script_filename)
-        
-        # 生成脚本内容
-        script_content = f"""#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-\"\"\"
-Manus.im问题提交自动化脚本
-生成时间: {datetime.now().isoformat()}
-\"\"\"
-
-import os
-import time
-import json
-import logging
-from datetime import datetime
-from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    filename='{os.path.join(self.automation_tools_dir, f"manus_im_submit_{timestamp}.log")}',
-    filemode='w'
-)
-logger = logging.getLogger("ManusImSubmit")
-
-# 问题摘要
-ISSUES_SUMMARY = \"\"\"
-{issues_summary}
-\"\"\"
-
-def main():
-    \"\"\"主函数\"\"\"
-    logger.info("开始执行Manus.im问题提交自动化脚本")
-    
-    try:
-        # 初始化WebDriver
-        logger.info("初始化WebDriver")
-        driver = initialize_webdriver()
-        
-        # 打开Manus.im平台
-        logger.info("打开Manus.im平台")
-        driver.get("{self.manus_im_url}")
-        
-        # 等待页面加载
-        logger.info("等待页面加载")
-        time.sleep(5)
-        
-        # 定位消息输入框
-        logger.info("定位消息输入框")
-        message_input = locate_message_input(driver)
-        
-        # 输入问题摘要
-        logger.info("输入问题摘要")
-        input_issues_summary(message_input, ISSUES_SUMMARY)
-        
-        # 发送消息
-        logger.info("发送消息")
-        send_message(message_input)
-        
-        # 等待响应
-        logger.info("等待响应")
-        time.sleep(10)
-        
-        # 记录结果
-        logger.info("记录结果")
-        result = {{
-            "status": "success",
-            "message": "成功将问题提交给Manus.im平台",
-            "timestamp": datetime.now().isoformat()
-        }}
-        
-        # 保存结果
-        save_result(result)
-        
-        # 关闭WebDriver
-        logger.info("关闭WebDriver")
-        driver.quit()
-        
-        return result
-    
-    except Exception as e:
-        logger.error(f"执行过程中发生错误: {{e}}")
-        
-        result = {{
-            "status": "error",
-            "message": f"执行过程中发生错误: {{e}}",
-            "timestamp": datetime.now().isoformat()
-        }}
-        
-        # 保存结果
-        save_result(result)
-        
-        return result
-
-def initialize_webdriver():
-    \"\"\"初始化WebDriver\"\"\"
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-notifications")
-    
-    return webdriver.Chrome(options=options)
-
-def locate_message_input(driver):
-    \"\"\"定位消息输入框\"\"\"
-    try:
-        # 等待消息输入框出现
-        message_input = WebDriverWait(driver, 30).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "[contenteditable='true']"))
-        )
-        return message_input
-    except TimeoutException:
-        logger.error("无法找到消息输入框")
-        raise
-
-def input_issues_summary(message_input, issues_summary):
-    \"\"\"输入问题摘要\"\"\"
-    # 清空输入框
-    message_input.clear()
-    
-    # 输入问题摘要
-    message_input.send_keys(issues_summary)
+                parts.append(f"   状态: {issue['status']}\n")
+            
+            parts.append("\n")
+        
+        # 添加环境信息
+        parts.append("环境信息：\n")
+        parts.append(f"- 仓库路径: {self.repo_path}\n")
+        parts.append(f"{_SUMMARY_TIMESTAMP_PREFIX}{datetime.now().isoformat()}\n")
+        parts.append(f"- 错误计数: {self._get_error_count()}\n")
+        
+        return "".join(parts)
     
-    # 等待输入完成
-    time.sleep(2)
-
-def send_message(message_input):
-    \"\"\"发送消息\"\"\"
-    # 按下Ctrl+Enter发送消息
-    message_input.send_keys(Keys.CONTROL + Keys.RETURN)
-
-def save_result(result):
-    \"\"\"保存结果\"\"\"
-    result_path = Path('{os.path.join(self.automation_tools_dir, f"manus_im_submit_{timestamp}_result.json")}')
+    def _get_error_count(self) -> int:
+        """
+        获取当前错误计数
+        
+        Returns:
+            int: 错误计数
+        """
+        return self._error_counter["error_count"]
     
-    with open(result_path, "w") as f:
-        json.dump(result, f, indent=2)
-
-if __name__ == "__main__":
-    main()
-"""
+    def _generate_automation_script(self, issues_summary: str) -> str:
+        """
+        生成自动化脚本
+        
+        Args:
+            issues_summary: 问题摘要
+            
+        Returns:
+            str: 脚本路径
+        """
+        # 相同摘要（不含时间戳行）和URL的脚本只生成一次，执行时再传入本次的完整摘要
+        stable_summary = "".join(
+            line for line in issues_summary.splitlines(keepends=True)
+            if not line.startswith(_SUMMARY_TIMESTAMP_PREFIX)
+        )
+        key = hashlib.sha1((stable_summary + self.manus_im_url).encode("utf-8")).hexdigest()[:12]
+        script_base = os.path.join(self._ensure_dir(self.automation_tools_dir), f"manus_im_submit_{key}")
+        script_path = script_base + ".py"
+        if os.path.exists(script_path):
+            return script_path
+        
+        # 生成脚本内容
+        script_content = _SCRIPT_TEMPLATE.substitute(
+            generated_at=datetime.now().isoformat(),
+            log_path=repr(script_base + ".log"),
+            summary=repr(issues_summary),
+            url=repr(self.manus_im_url),
+            result_path=repr(script_base + "_result.json")
+        )
         
         # 保存脚本
         with open(script_path, "w") as f:
@@ -594,15 +1040,19 @@ if __name__ == "__main__":
         
         return script_path
     
-    def _execute_automation_script(self, script_path: str) -> Dict:
+    def _execute_automation_script(self, script_path: str, issues_summary: str, submission_record: Dict) -> Dict:
         """
-        执行自动化脚本
+        在后台启动自动化脚本，立即返回
+        
+        脚本需要启动浏览器并等待页面响应，耗时较长；由监控线程等待其结束并将结果写入提交记录。
         
         Args:
             script_path: 脚本路径
+            issues_summary: 问题摘要，脚本失败时交给备用方法
+            submission_record: 提交记录，脚本结束后更新其中的结果
             
         Returns:
-            Dict: 执行结果
+            Dict: 提交状态，无法启动脚本时为备用方法的执行结果
         """
         self.recorder.record_thought(f"执行自动化脚本: {script_path}")
         
@@ -610,15 +1060,92 @@ if __name__ == "__main__":
             # 检查是否已安装所需依赖
             self._ensure_dependencies()
             
+            # 清除复用脚本上次执行留下的结果文件
+            result_path = script_path.replace(".py", "_result.json")
+            if os.path.exists(result_path):
+                os.remove(result_path)
+            
             # 执行脚本
             process = subprocess.Popen(
-                ["python3", script_path],
-                stdout=subprocess.PIPE,
+                ["python3", script_path, issues_summary],
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE
             )
+        
+        except Exception as e:
+            self.recorder.record_thought(f"执行自动化脚本时发生错误: {e}")
+            
+            # 尝试使用备用方法
+            return self._fallback_submit_to_manus_im(issues_summary)
+        
+        # 交给监控线程等待脚本结束
+        self._script_queue.put((process, script_path, issues_summary, submission_record))
+        self._ensure_script_monitor()
+        
+        return {
+            "status": "submitted",
+            "message": "自动化脚本已在后台启动",
+            "pid": process.pid,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _ensure_script_monitor(self) -> None:
+        """
+        确保自动化脚本监控线程正在运行
+        """
+        with self._state_lock:
+            if self._script_monitor is None or not self._script_monitor.is_alive():
+                self._script_monitor = threading.Thread(target=self._monitor_automation_scripts, daemon=True)
+                self._script_monitor.start()
+    
+    def _monitor_automation_scripts(self) -> None:
+        """
+        监控线程：依次等待后台自动化脚本结束，并将结果写入提交历史
+        """
+        while True:
+            process, script_path, issues_summary, submission_record = self._script_queue.get()
+            
+            try:
+                result = self._collect_script_result(process, script_path, issues_summary)
+                
+                # 只追加ID和最终结果，问题摘要已在提交时写入
+                with self._state_lock:
+                    submission_record["result"] = result
+                    self._append_jsonl(self.submission_log_file, {"id": submission_record["id"], "result": result})
+                
+                self.recorder.record_action(
+                    "automation_script_finished", 
+                    {"script_path": script_path, "pid": process.pid},
+                    result
+                )
+            
+            except Exception as e:
+                logger.error(f"处理自动化脚本结果时发生错误: {e}")
             
+            finally:
+                self._script_queue.task_done()
+    
+    def wait_for_submissions(self) -> None:
+        """
+        等待所有后台自动化脚本结束并记录结果
+        """
+        self._script_queue.join()
+    
+    def _collect_script_result(self, process: subprocess.Popen, script_path: str, issues_summary: str) -> Dict:
+        """
+        等待自动化脚本结束并读取其结果
+        
+        Args:
+            process: 脚本进程
+            script_path: 脚本路径
+            issues_summary: 问题摘要，脚本失败时交给备用方法
+            
+        Returns:
+            Dict: 执行结果
+        """
+        try:
             # 等待脚本执行完成
-            stdout, stderr = process.communicate()
+            _, stderr = process.communicate()
             
             # 检查执行结果
             if process.returncode != 0:
@@ -626,13 +1153,13 @@ if __name__ == "__main__":
                 self.recorder.record_thought(f"脚本执行失败: {error_msg}")
                 
                 # 尝试使用备用方法
-                return self._fallback_submit_to_manus_im(script_path)
+                return self._fallback_submit_to_manus_im(issues_summary)
             
             # 读取结果文件
             result_path = script_path.replace(".py", "_result.json")
             if os.path.exists(result_path):
-                with open(result_path, "r") as f:
-                    result = json.load(f)
+                with open(result_path, "rb") as f:
+                    result = _json_loads(f.read())
             else:
                 result = {
                     "status": "success",
@@ -646,7 +1173,7 @@ if __name__ == "__main__":
             self.recorder.record_thought(f"执行自动化脚本时发生错误: {e}")
             
             # 尝试使用备用方法
-            return self._fallback_submit_to_manus_im(script_path)
+            return self._fallback_submit_to_manus_im(issues_summary)
     
     def _ensure_dependencies(self) -> None:
         """
@@ -667,12 +1194,12 @@ if __name__ == "__main__":
         except Exception as e:
             self.recorder.record_thought(f"安装依赖时发生错误: {e}")
     
-    def _fallback_submit_to_manus_im(self, script_path: str) -> Dict:
+    def _fallback_submit_to_manus_im(self, issues_summary: str) -> Dict:
         """
         备用方法：使用浏览器直接打开Manus.im平台
         
         Args:
-            script_path: 脚本路径
+            issues_summary: 问题摘要
             
         Returns:
             Dict: 执行结果
@@ -680,18 +1207,10 @@ if __name__ == "__main__":
         self.recorder.record_thought("使用备用方法提交问题到Manus.im平台")
         
         try:
-            # 读取问题摘要
-            with open(script_path, "r") as f:
-                script_content = f.read()
-            
-            issues_summary_match = re.search(r'ISSUES_SUMMARY = """(.*?)"""', script_content, re.DOTALL)
-            if issues_summary_match:
-                issues_summary = issues_summary_match.group(1).strip()
-            else:
-                issues_summary = "PowerAutomation MCP测试中发现问题，请协助解决。"
+            issues_summary = issues_summary.strip() or "PowerAutomation MCP测试中发现问题，请协助解决。"
             
             # 将问题摘要保存到临时文件
-            temp_file = os.path.join(self.automation_tools_dir, "temp_issues_summary.txt")
+            temp_file = os.path.join(self._ensure_dir(self.automation_tools_dir), "temp_issues_summary.txt")
             with open(temp_file, "w") as f:
                 f.write(issues_summary)
             
@@ -714,6 +1233,19 @@ if __name__ == "__main__":
                 "timestamp": datetime.now().isoformat()
             }
     
+    @staticmethod
+    def _issue_key(message: bytes) -> bytes:
+        """
+        计算问题描述的去重键
+        
+        Args:
+            message: UTF-8编码的问题描述
+            
+        Returns:
+            bytes: 去掉首尾空白后的BLAKE2b摘要
+        """
+        return hashlib.blake2b(message.strip(), digest_size=16).digest()
+    
     def _extract_issues_from_readme_and_logs(self) -> List[Dict]:
         """
         从README和测试日志中提取问题
@@ -725,61 +1257,77 @@ if __name__ == "__main__":
         
         # 从README中提取问题
         readme_path = os.path.join(self.repo_path, "README.md")
-        if os.path.exists(readme_path):
+        try:
             with open(readme_path, "r") as f:
-                readme_content = f.read()
-            
-            # 查找问题部分
-            issues_section_pattern = r"## 问题列表\s+(.+?)(?=##|\Z)"
-            issues_match = re.search(issues_section_pattern, readme_content, re.DOTALL)
-            
-            if issues_match:
-                issues_section = issues_match.group(1)
+                in_issues_section = False
                 
-                # 提取每个问题
-                issue_pattern = r"- \[([ x])\] (.+?)(?=\n- \[|$)"
-                for issue_match in re.finditer(issue_pattern, issues_section, re.DOTALL):
-                    status = issue_match.group(1)
-                    description = issue_match.group(2).strip()
+                for line in f:
+                    # 问题部分从"## 问题列表"开始，到下一个二级标题结束
+                    if line.startswith("## 问题列表"):
+                        in_issues_section = True
+                        continue
+                    if line.startswith("##"):
+                        in_issues_section = False
+                        continue
+                    if not in_issues_section:
+                        continue
+                    
+                    # 提取每个问题
+                    issue_match = _ISSUE_ITEM_RE.match(line)
                     
                     # 只关注未解决的问题
-                    if status != "x":
+                    if issue_match and issue_match.group(1) != "x":
                         issues.append({
                             "source": "readme",
-                            "description": description,
+                            "description": issue_match.group(2).strip(),
                             "status": "open"
                         })
+        except FileNotFoundError:
+            pass
+        
+        # 已收集问题的摘要，用于去重
+        seen = {self._issue_key(issue["description"].encode("utf-8")) for issue in issues}
         
         # 从测试日志中提取问题
         logs_dir = os.path.join(self.repo_path, "logs")
-        if os.path.exists(logs_dir):
-            log_files = [f for f in os.listdir(logs_dir) if f.endswith(".log")]
+        try:
+            with os.scandir(logs_dir) as entries:
+                log_files = [entry for entry in entries if entry.name.endswith(".log") and entry.is_file()]
+        except FileNotFoundError:
+            log_files = []
+        
+        # 只检查最新的5个日志文件
+        for log_entry in sorted(log_files, key=lambda entry: entry.name, reverse=True)[:5]:
+            log_file = log_entry.name
             
-            for log_file in sorted(log_files, reverse=True)[:5]:  # 只检查最新的5个日志文件
-                log_path = os.path.join(logs_dir, log_file)
-                
-                with open(log_path, "r") as f:
-                    log_content = f.read()
-                
-                # 查找错误和警告
-                error_pattern = r"(ERROR|CRITICAL|EXCEPTION|FAIL|FAILED).*?:(.+?)(?=\n\d{4}-\d{2}-\d{2}|\Z)"
-                for error_match in re.finditer(error_pattern, log_content, re.IGNORECASE | re.DOTALL):
-                    error_type = error_match.group(1)
-                    error_message = error_match.group(2).strip()
+            # 空文件无法映射
+            if log_entry.stat().st_size == 0:
+                continue
+            
+            # 内存映射日志文件，逐条记录匹配，只解码匹配到的部分
+            with open(log_entry.path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log_content:
+                # 逐条记录查找错误和警告
+                for record in _iter_log_records(log_content):
+                    error_match = _LOG_ERROR_RE.search(record)
+                    if error_match is None:
+                        continue
                     
-                    # 检查是否已存在相同问题
-                    duplicate = False
-                    for issue in issues:
-                        if error_message in issue["description"]:
-                            duplicate = True
-                            break
+                    raw_message = error_match.group(2).strip()
                     
-                    if not duplicate:
-                        issues.append({
-                            "source": f"log_{log_file}",
-                            "description": f"{error_type}: {error_message}",
-                            "status": "open"
-                        })
+                    # 检查是否已存在相同问题（重复的问题无需解码）
+                    key = self._issue_key(raw_message)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    
+                    error_type = error_match.group(1).decode("utf-8", "replace")
+                    error_message = raw_message.decode("utf-8", "replace")
+                    issues.append({
+                        "source": f"log_{log_file}",
+                        "description": f"{error_type}: {error_message}",
+                        "status": "open"
+                    })
         
         return issues
     
@@ -872,64 +1420,409 @@ if __name__ == "__main__":
         Returns:
             Optional[Dict]: 保存点信息，如果未找到则返回None
         """
-        save_points = self.list_save_points()
-        
         # 按ID查找
         if isinstance(save_point_id, int) or save_point_id.isdigit():
-            save_point_id = int(save_point_id)
-            for save_point in save_points:
-                if save_point["id"] == save_point_id:
-                    return save_point
+            return self._by_id.get(int(save_point_id))
         
         # 按名称查找
+        return self._by_name.get(save_point_id)
+    
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        """
+        计算文件内容的SHA-256哈希
+        
+        Args:
+            path: 文件路径
+            
+        Returns:
+            str: 十六进制哈希值
+        """
+        sha256 = hashlib.sha256()
+        
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # 空文件无法映射
+            if size == 0:
+                return sha256.hexdigest()
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    for offset in range(0, size, HASH_CHUNK_SIZE):
+                        sha256.update(view[offset:offset + HASH_CHUNK_SIZE])
+                finally:
+                    view.release()
+        
+        return sha256.hexdigest()
+    
+    def _cached_hash(self, path: str) -> str:
+        """
+        获取文件哈希，修改时间和大小未变化时直接使用缓存
+        
+        Args:
+            path: 文件路径
+            
+        Returns:
+            str: 十六进制哈希值
+        """
+        st = os.stat(path)
+        cached = self._hash_cache.get(path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        
+        file_hash = self._hash_file(path)
+        if time.time_ns() - st.st_mtime_ns >= HASH_CACHE_MIN_AGE_NS:
+            self._hash_cache[path] = (st.st_mtime_ns, st.st_size, file_hash)
+        return file_hash
+    
+    def _object_path(self, file_hash: str) -> str:
+        """
+        获取对象在对象存储中的路径（objects/<前两位>/<其余部分>）
+        
+        Args:
+            file_hash: 文件哈希
+            
+        Returns:
+            str: 对象路径
+        """
+        return os.path.join(self.objects_dir, file_hash[:2], file_hash[2:])
+    
+    def _store_object(self, src_path: str, file_hash: str) -> None:
+        """
+        将文件存入对象存储，相同内容已存在时不做任何I/O
+        
+        对象通过写时复制克隆而不是硬链接存入，避免仓库中文件被原地修改时连带修改对象。
+        
+        Args:
+            src_path: 源文件路径
+            file_hash: 文件哈希
+        """
+        object_path = self._object_path(file_hash)
+        if os.path.exists(object_path):
+            return
+        
+        # 对象分组目录（objects/<前两位>）只创建一次
+        object_dir = os.path.dirname(object_path)
+        if object_dir not in self._object_dirs:
+            os.makedirs(object_dir, exist_ok=True)
+            self._object_dirs.add(object_dir)
+        
+        # 先写临时文件再原子重命名，中断时不会留下不完整的对象
+        tmp_path = f"{object_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        _fast_copy(src_path, tmp_path)
+        os.replace(tmp_path, object_path)
+    
+    def _git(self, *args: str) -> Optional[bytes]:
+        """
+        在仓库目录中执行git命令
+        
+        Args:
+            *args: git参数
+            
+        Returns:
+            Optional[bytes]: 标准输出，命令不可用或失败时返回None
+        """
+        try:
+            result = subprocess.run(
+                ["git", "-C", self.repo_path, *args],
+                capture_output=True
+            )
+        except OSError:
+            return None
+        
+        if result.returncode != 0:
+            return None
+        
+        return result.stdout
+    
+    @staticmethod
+    def _git_blob_hash(path: str) -> str:
+        """
+        计算文件的git blob哈希（与git hash-object一致）
+        
+        Args:
+            path: 文件路径
+            
+        Returns:
+            str: 十六进制SHA-1哈希
+        """
+        with open(path, "rb") as f:
+            content = f.read()
+        
+        return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+    
+    @staticmethod
+    def _is_save_point_file(rel_path: str) -> bool:
+        """
+        检查相对路径是否应纳入保存点
+        
+        Args:
+            rel_path: 相对仓库根目录的路径
+            
+        Returns:
+            bool: 是否纳入保存点
+        """
+        if not rel_path.endswith(_COPY_EXTS):
+            return False
+        
+        parts = rel_path.replace("\\", "/").split("/")
+        return not SAVE_POINT_EXCLUDED_DIRS.intersection(parts[:-1])
+    
+    def _git_snapshot(self) -> Optional[Tuple[Dict[str, str], str]]:
+        """
+        通过git增量生成保存点清单
+        
+        与HEAD一致的已跟踪文件直接引用HEAD中的blob，只有修改过或未跟踪的文件才计算哈希并存入对象存储。
+        未跟踪文件包括被.gitignore忽略的文件，与遍历整个仓库的结果一致。
+        
+        Returns:
+            Optional[Tuple[Dict[str, str], str]]: (清单, HEAD提交)，仓库不是git仓库根目录或git不可用时返回None
+        """
+        if not os.path.exists(os.path.join(self.repo_path, ".git")):
+            return None
+        
+        toplevel = self._git("rev-parse", "--show-toplevel")
+        head = self._git("rev-parse", "HEAD")
+        if toplevel is None or head is None:
+            return None
+        
+        if os.path.realpath(os.fsdecode(toplevel.strip())) != os.path.realpath(self.repo_path):
+            return None
+        
+        tree = self._git("ls-tree", "-r", "-z", "HEAD")
+        pathspecs = [f"*{ext}" for ext in _COPY_EXTS]
+        modified = self._git("diff", "--name-only", "-z", "HEAD", "--", *pathspecs)
+        untracked = self._git("ls-files", "-o", "--exclude=/.save_points/", "-z", "--", *pathspecs)
+        if tree is None or modified is None or untracked is None:
+            return None
+        
+        changed = {os.fsdecode(path) for path in (modified + untracked).split(b"\0") if path}
+        manifest = {}
+        
+        # 未修改的已跟踪文件：引用HEAD中的blob
+        for entry in tree.split(b"\0"):
+            if not entry:
+                continue
+            
+            info, path = entry.split(b"\t", 1)
+            _, object_type, sha = info.split()
+            rel_path = os.fsdecode(path)
+            
+            if object_type == b"blob" and rel_path not in changed and self._is_save_point_file(rel_path):
+                manifest[os.path.normpath(rel_path)] = GIT_OBJECT_PREFIX + sha.decode()
+        
+        # 修改过或未跟踪的文件：存入对象存储（已删除的文件跳过）
+        files = {}
+        for rel_path in changed:
+            src_path = os.path.join(self.repo_path, rel_path)
+            if self._is_save_point_file(rel_path) and os.path.isfile(src_path):
+                files[os.path.normpath(rel_path)] = src_path
+        
+        manifest.update(self._store_files(files))
+        
+        return manifest, head.strip().decode()
+    
+    def _copy_code_to_save_point(self, save_point_dir: str) -> Optional[str]:
+        """
+        将当前代码存入对象存储，并在保存点目录写入清单文件manifest.json
+        
+        git仓库只处理相对HEAD有变化的文件，否则遍历整个仓库。
+        
+        Args:
+            save_point_dir: 保存点目录
+            
+        Returns:
+            Optional[str]: 基准提交，非git仓库时为None
+        """
+        snapshot = self._git_snapshot()
+        
+        if snapshot is not None:
+            manifest, base_commit = snapshot
         else:
-            for save_point in save_points:
-                if save_point["name"] == save_point_id:
-                    return save_point
+            manifest, base_commit = self._walk_snapshot(), None
+        
+        with open(os.path.join(save_point_dir, "manifest.json"), "wb") as f:
+            f.write(_json_dumps(manifest, indent=True))
+        
+        return base_commit
+    
+    def _walk_snapshot(self) -> Dict[str, str]:
+        """
+        遍历整个仓库生成保存点清单
+        
+        Returns:
+            Dict[str, str]: 清单 {相对路径: 哈希}
+        """
+        # 收集所有Python文件
+        py_files = {rel_path: src_path for src_path, rel_path in _iter_py(self.repo_path)}
+        
+        return self._store_files(py_files)
+    
+    def _store_file(self, src_path: str) -> str:
+        """
+        计算文件哈希并存入对象存储
+        
+        Args:
+            src_path: 源文件路径
+            
+        Returns:
+            str: 文件哈希
+        """
+        file_hash = self._cached_hash(src_path)
+        self._store_object(src_path, file_hash)
+        return file_hash
+    
+    def _store_files(self, files: Dict[str, str]) -> Dict[str, str]:
+        """
+        并行将文件存入对象存储
+        
+        Args:
+            files: {相对路径: 源文件路径}
+            
+        Returns:
+            Dict[str, str]: 清单 {相对路径: 哈希}
+        """
+        with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+            hashes = executor.map(self._store_file, files.values())
+            return dict(zip(files, hashes))
+    
+    @staticmethod
+    def _copy_files(pairs: List[Tuple[str, str]]) -> None:
+        """
+        并行复制文件，每个目标目录只创建一次
+        
+        Args:
+            pairs: [(源文件路径, 目标文件路径)]
+        """
+        _make_parent_dirs(dst_path for _, dst_path in pairs)
         
-        return None
+        with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+            # 消费结果以便抛出复制中的异常
+            list(executor.map(lambda pair: _fast_copy(*pair), pairs))
     
-    def _copy_code_to_save_point(self, save_point_dir: str) -> None:
+    def _copy_code_from_save_point(self, save_point_dir: str) -> List[str]:
         """
-        复制当前代码到保存点目录
+        按保存点清单从对象存储恢复代码到当前目录
         
         Args:
             save_point_dir: 保存点目录
+            
+        Returns:
+            List[str]: 无法从git恢复的文件路径
         """
-        # 复制所有Python文件
-        for root, _, files in os.walk(self.repo_path):
-            if ".git" in root or "__pycache__" in root or ".save_points" in root:
+        manifest_path = os.path.join(save_point_dir, "manifest.json")
+        try:
+            with open(manifest_path, "rb") as f:
+                manifest = _json_loads(f.read())
+        except FileNotFoundError:
+            # 旧版保存点直接保存了文件副本
+            self._copy_legacy_save_point(save_point_dir)
+            return []
+        
+        git_objects = {}
+        pairs = []
+        
+        for rel_path, file_hash in manifest.items():
+            dst_path = os.path.join(self.repo_path, rel_path)
+            
+            if file_hash.startswith(GIT_OBJECT_PREFIX):
+                git_objects[dst_path] = file_hash[len(GIT_OBJECT_PREFIX):]
+            else:
+                pairs.append((self._object_path(file_hash), dst_path))
+        
+        self._copy_files(pairs)
+        
+        if git_objects:
+            return self._restore_git_objects(git_objects)
+        return []
+    
+    def _restore_git_objects(self, git_objects: Dict[str, str]) -> List[str]:
+        """
+        从git对象库恢复文件，内容未变化的文件不重写
+        
+        Args:
+            git_objects: {目标路径: blob sha1}
+            
+        Returns:
+            List[str]: 无法恢复的文件路径
+        """
+        pending = {}
+        for dst_path, sha in git_objects.items():
+            if os.path.isfile(dst_path) and self._git_blob_hash(dst_path) == sha:
                 continue
-                
-            for file in files:
-                if file.endswith(".py"):
-                    src_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(src_path, self.repo_path)
-                    dst_path = os.path.join(save_point_dir, rel_path)
-                    
-                    # 确保目标目录存在
-                    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-                    
-                    # 复制文件
-                    shutil.copy2(src_path, dst_path)
+            pending.setdefault(sha, []).append(dst_path)
+        
+        if not pending:
+            return []
+        
+        # 一次git cat-file --batch读取所有需要的blob
+        shas = list(pending)
+        output = self._git_batch_cat(shas)
+        if output is None:
+            logger.error(f"无法从git读取 {len(shas)} 个对象，相关文件未恢复")
+            return [dst_path for paths in pending.values() for dst_path in paths]
+        
+        unrestored = []
+        
+        _make_parent_dirs(dst_path for paths in pending.values() for dst_path in paths)
+        
+        offset = 0
+        for sha in shas:
+            header_end = output.index(b"\n", offset)
+            header = output[offset:header_end].split()
+            offset = header_end + 1
+            
+            if header[1] == b"missing":
+                logger.error(f"git对象不存在: {sha}")
+                unrestored.extend(pending[sha])
+                continue
+            
+            size = int(header[2])
+            content = output[offset:offset + size]
+            offset += size + 1
+            
+            for dst_path in pending[sha]:
+                with open(dst_path, "wb") as f:
+                    f.write(content)
+        
+        return unrestored
+    
+    def _git_batch_cat(self, shas: List[str]) -> Optional[bytes]:
+        """
+        使用git cat-file --batch批量读取对象
+        
+        Args:
+            shas: 对象sha列表
+            
+        Returns:
+            Optional[bytes]: 批量输出，失败时返回None
+        """
+        try:
+            result = subprocess.run(
+                ["git", "-C", self.repo_path, "cat-file", "--batch"],
+                input="\n".join(shas).encode() + b"\n",
+                capture_output=True
+            )
+        except OSError:
+            return None
+        
+        if result.returncode != 0:
+            return None
+        
+        return result.stdout
     
-    def _copy_code_from_save_point(self, save_point_dir: str) -> None:
+    def _copy_legacy_save_point(self, save_point_dir: str) -> None:
         """
-        从保存点目录复制代码到当前目录
+        从旧版（完整文件副本）保存点目录复制代码到当前目录
         
         Args:
             save_point_dir: 保存点目录
         """
         # 复制所有Python文件
-        for root, _, files in os.walk(save_point_dir):
-            for file in files:
-                if file.endswith(".py"):
-                    src_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(src_path, save_point_dir)
-                    dst_path = os.path.join(self.repo_path, rel_path)
-                    
-                    # 确保目标目录存在
-                    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-                    
-                    # 复制文件
-                    shutil.copy2(src_path, dst_path)
+        pairs = [
+            (src_path, os.path.join(self.repo_path, rel_path))
+            for src_path, rel_path in _iter_py(save_point_dir, skip=set())
+        ]
+        
+        self._copy_files(pairs)
@@ -144,6 +144,9 @@ class ReleaseRulesChecker:
             "console_logs": [],
             "test_results": []
         }
+        
+        # 会话记录的小写文本缓存 {字段名: (记录列表, 记录数, 小写文本)}
+        self._lowered_cache = {}
     
     def check_forbidden_rules(self):
         """
@@ -451,6 +454,28 @@ class ReleaseRulesChecker:
             "timestamp": datetime.now().isoformat()
         })
     
+    def _lowered_text(self, key):
+        """
+        获取会话中某类记录拼接后的小写文本，同一批记录只转换一次
+        
+        记录只通过add_*方法追加，列表对象和记录数不变时直接复用缓存。
+        
+        Args:
+            key: 会话字段名（screenshots、console_logs或test_results，测试结果取其名称）
+            
+        Returns:
+            str: 以换行分隔的小写文本，检查用的关键词不含换行，不会跨记录匹配
+        """
+        items = self.current_session[key]
+        cached = self._lowered_cache.get(key)
+        if cached is not None and cached[0] is items and cached[1] == len(items):
+            return cached[2]
+        
+        texts = [t["name"] for t in items] if key == "test_results" else items
+        lowered = "\n".join(texts).lower()
+        self._lowered_cache[key] = (items, len(items), lowered)
+        return lowered
+    
     def _check_real_environment_verification(self):
         """
         检查是否在真实环境中验证修复效果
@@ -458,13 +483,8 @@ class ReleaseRulesChecker:
         Returns:
             bool: 如果在真实环境中验证，返回True；否则返回False
         """
-        # 检查是否有真实环境的截图
-        real_env_screenshots = [s for s in self.current_session["screenshots"] if "real_env" in s.lower()]
-        
-        # 检查测试结果中是否有真实环境的标记
-        real_env_tests = [t for t in self.current_session["test_results"] if "real_env" in t["name"].lower()]
-        
-        return len(real_env_screenshots) > 0 or len(real_env_tests) > 0
+        # 检查是否有真实环境的截图，或测试结果中是否有真实环境的标记
+        return "real_env" in self._lowered_text("screenshots") or "real_env" in self._lowered_text("test_results")
     
     def _check_actual_run_results(self):
         """
@@ -499,11 +519,11 @@ class ReleaseRulesChecker:
             return False
         
         # 检查是否覆盖了所有主要功能
-        test_names = [t["name"].lower() for t in self.current_session["test_results"]]
+        test_names = self._lowered_text("test_results")
         
         # 检查是否包含核心功能测试
         core_features = ["navigation", "recording", "analysis", "taskbar", "mindmap"]
-        covered_features = [f for f in core_features if any(f in name for name in test_names)]
+        covered_features = [f for f in core_features if f in test_names]
         
         return len(covered_features) >= 3  # 至少覆盖3个核心功能
     
@@ -514,13 +534,8 @@ class ReleaseRulesChecker:
         Returns:
             bool: 如果在沙盒环境启动，返回True；否则返回False
         """
-        # 检查是否有沙盒环境的标记
-        sandbox_logs = [log for log in self.current_session["console_logs"] if "sandbox" in log.lower()]
-        
-        # 检查是否有应用启动的截图
-        startup_screenshots = [s for s in self.current_session["screenshots"] if "startup" in s.lower()]
-        
-        return len(sandbox_logs) > 0 or len(startup_screenshots) > 0
+        # 检查是否有沙盒环境的标记，或是否有应用启动的截图
+        return "sandbox" in self._lowered_text("console_logs") or "startup" in self._lowered_text("screenshots")
     
     def _check_complete_workflow(self):
         """
@@ -545,13 +560,8 @@ class ReleaseRulesChecker:
         Returns:
             bool: 如果验证思维导图渲染，返回True；否则返回False
         """
-        # 检查是否有思维导图相关的截图
-        mindmap_screenshots = [s for s in self.current_session["screenshots"] if "mindmap" in s.lower()]
-        
-        # 检查测试结果中是否有思维导图相关的测试
-        mindmap_tests = [t for t in self.current_session["test_results"] if "mindmap" in t["name"].lower()]
-        
-        return len(mindmap_screenshots) > 0 or len(mindmap_tests) > 0
+        # 检查是否有思维导图相关的截图，或测试结果中是否有思维导图相关的测试
+        return "mindmap" in self._lowered_text("screenshots") or "mindmap" in self._lowered_text("test_results")
     
     def _check_console_logs(self):
         """
@@ -17,11 +17,15 @@ import os
 import re
 import glob
 import json
+import mmap
 import time
-import datetime
 import subprocess
 import logging
 import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 
 # 导入思考与操作记录器
@@ -34,6 +38,77 @@ logging.basicConfig(
 )
 logger = logging.getLogger("TestAndIssueCollector")
 
+# 日志问题的匹配模式，模块加载时编译一次
+_ISSUE_RE = re.compile(rb"(?P<error>error|exception|fail|traceback)|(?P<warning>warning)", re.IGNORECASE)
+_CONTEXT_RADIUS = {"error": 200, "warning": 150}
+
+# UTF-8字符的最大字节数，按字符截取上下文时据此确定需要解码的字节范围
+_UTF8_MAX_CHAR_BYTES = 4
+
+# README中问题部分的标题
+ISSUES_SECTION_TITLE = "## 测试发现的问题"
+
+# 问题部分末尾的测试时间戳行，比较README内容是否变化时忽略
+_ISSUES_TIMESTAMP_RE = re.compile(r"\s*\*测试时间: [^\n]*\*")
+
+# 测试日志文件的写缓冲区大小
+LOG_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# 日志总大小超过该值且有多个日志文件时，使用多进程并行扫描
+PARALLEL_SCAN_MIN_BYTES = 8 * 1024 * 1024
+
+def _scan_log_file(log_file: str) -> List[Dict[str, Any]]:
+    """
+    扫描单个日志文件中的错误和警告（模块级函数，可在子进程中执行）
+    
+    Args:
+        log_file: 日志文件路径
+        
+    Returns:
+        问题列表，同一文件中错误在前、警告在后
+    """
+    try:
+        # 空文件无法映射
+        if os.path.getsize(log_file) == 0:
+            return []
+        
+        # 一次扫描同时提取错误和警告，按类型分组以保持错误在前的顺序
+        file_name = os.path.basename(log_file)
+        found = {"error": [], "warning": []}
+        
+        # 内存映射日志文件，直接匹配字节，只解码问题上下文
+        with open(log_file, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log_content:
+            # 已换算为字符位置的字节偏移及对应的字符数
+            counted_bytes = 0
+            counted_chars = 0
+            
+            for match in _ISSUE_RE.finditer(log_content):
+                # 获取上下文（错误前后各200个字符，警告前后各150个字符）
+                # 匹配项都是ASCII，边界落在字符边界上；前后各多取足够的字节解码后再按字符截取
+                issue_type = match.lastgroup
+                radius = _CONTEXT_RADIUS[issue_type]
+                window = (radius + 1) * _UTF8_MAX_CHAR_BYTES
+                before = log_content[max(0, match.start() - window):match.start()].decode("utf-8", "ignore")
+                after = log_content[match.end():match.end() + window].decode("utf-8", "ignore")
+                context = before[-radius:] + match.group().decode("ascii") + after[:radius]
+                
+                # 位置按字符计算，只需解码上一个问题到当前问题之间的内容
+                counted_chars += len(log_content[counted_bytes:match.start()].decode("utf-8", "replace"))
+                counted_bytes = match.start()
+                
+                found[issue_type].append({
+                    "type": issue_type,
+                    "file": file_name,
+                    "context": context,
+                    "position": counted_chars
+                })
+        
+        return found["error"] + found["warning"]
+    except Exception as e:
+        logger.error(f"Error processing log file {log_file}: {e}")
+        return []
+
 class TestAndIssueCollector:
     """
     测试与问题收集器类，用于执行自动化测试、收集问题并更新README文件
@@ -57,23 +132,62 @@ class TestAndIssueCollector:
         self.test_script = test_script
         self.readme_path = os.path.join(repo_path, readme_path)
         
-        # 初始化记录器
-        self.recorder = recorder or ThoughtActionRecorder(
-            log_dir=os.path.join(repo_path, "logs")
-        )
+        # 记录器（未传入时在首次使用时创建）
+        self._recorder_override = recorder
         
-        # 创建输出目录
+        # 输出目录（在首次写入时创建）
         self.output_dir = os.path.join(repo_path, "output")
         self.logs_dir = os.path.join(repo_path, "logs")
         self.screenshots_dir = os.path.join(self.output_dir, "screenshots")
+        self._ensured = set()
         
-        os.makedirs(self.output_dir, exist_ok=True)
-        os.makedirs(self.logs_dir, exist_ok=True)
-        os.makedirs(self.screenshots_dir, exist_ok=True)
+        logger.info("TestAndIssueCollector initialized with repo path: %s", repo_path)
+        logger.info("Test script: %s", test_script)
+        logger.info("README path: %s", self.readme_path)
+    
+    @cached_property
+    def recorder(self) -> ThoughtActionRecorder:
+        """
+        思考与操作记录器，未传入时在首次使用时创建
+        
+        Returns:
+            记录器实例
+        """
+        return self._recorder_override or ThoughtActionRecorder(
+            log_dir=os.path.join(self.repo_path, "logs")
+        )
+    
+    def _ensure_dir(self, path: str) -> str:
+        """
+        确保目录存在，每个目录只创建一次
         
-        logger.info(f"TestAndIssueCollector initialized with repo path: {repo_path}")
-        logger.info(f"Test script: {test_script}")
-        logger.info(f"README path: {self.readme_path}")
+        Args:
+            path: 目录路径
+            
+        Returns:
+            目录路径
+        """
+        if path not in self._ensured:
+            os.makedirs(path, exist_ok=True)
+            self._ensured.add(path)
+        return path
+    
+    def _record_failure(self, action_type: str, action_params: Dict[str, Any], error_msg: str) -> Dict[str, Any]:
+        """
+        记录失败的操作并生成失败结果
+        
+        Args:
+            action_type: 操作类型
+            action_params: 操作参数
+            error_msg: 错误信息
+            
+        Returns:
+            失败结果
+        """
+        logger.error(error_msg)
+        result = {"success": False, "error": error_msg}
+        self.recorder.record_action(action_type, action_params, result)
+        return result
     
     def run_tests(self) -> Dict[str, Any]:
         """
@@ -89,29 +203,24 @@ class TestAndIssueCollector:
         
         if not os.path.exists(test_script_path):
             error_msg = f"Test script {test_script_path} does not exist"
-            logger.error(error_msg)
-            
-            self.recorder.record_action(
-                "run_tests", 
-                {"test_script": self.test_script},
-                {"success": False, "error": error_msg}
-            )
-            
-            return {"success": False, "error": error_msg}
+            return self._record_failure("run_tests", {"test_script": self.test_script}, error_msg)
         
         try:
             # 确保测试脚本有执行权限
             os.chmod(test_script_path, 0o755)
-            logger.info(f"Set execute permission for {test_script_path}")
+            logger.info("Set execute permission for %s", test_script_path)
         except Exception as e:
             logger.warning(f"Failed to set execute permission for {test_script_path}: {e}")
         
         # 创建测试日志文件
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        test_log_file = os.path.join(self.logs_dir, f"test_{timestamp}.log")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        test_log_file = os.path.join(self._ensure_dir(self.logs_dir), f"test_{timestamp}.log")
+        
+        # 测试脚本会把截图写入output/screenshots，运行前确保目录存在
+        self._ensure_dir(self.screenshots_dir)
         
         # 运行测试脚本
-        logger.info(f"Running test script: {self.test_script}")
+        logger.info("Running test script: %s", self.test_script)
         self.recorder.record_action("run_test_script", {"script": self.test_script})
         
         try:
@@ -128,24 +237,24 @@ class TestAndIssueCollector:
             stdout_lines = []
             stderr_lines = []
             
-            # 非阻塞读取输出
-            for stdout_line in iter(process.stdout.readline, b""):
-                line = stdout_line.decode("utf-8").strip()
-                stdout_lines.append(line)
-                logger.info(f"[TEST] {line}")
-                
-                # 将输出写入日志文件
-                with open(test_log_file, "a", encoding="utf-8") as f:
-                    f.write(f"[OUT] {line}\n")
-            
-            for stderr_line in iter(process.stderr.readline, b""):
-                line = stderr_line.decode("utf-8").strip()
-                stderr_lines.append(line)
-                logger.error(f"[TEST ERROR] {line}")
+            # 日志文件在整个测试期间只打开一次，输出经缓冲后批量写入
+            with open(test_log_file, "a", encoding="utf-8", buffering=LOG_WRITE_BUFFER_SIZE) as log_f:
+                # 非阻塞读取输出
+                for stdout_line in iter(process.stdout.readline, b""):
+                    line = stdout_line.decode("utf-8").strip()
+                    stdout_lines.append(line)
+                    logger.info("[TEST] %s", line)
+                    
+                    # 将输出写入日志文件
+                    log_f.write(f"[OUT] {line}\n")
                 
-                # 将错误输出写入日志文件
-                with open(test_log_file, "a", encoding="utf-8") as f:
-                    f.write(f"[ERR] {line}\n")
+                for stderr_line in iter(process.stderr.readline, b""):
+                    line = stderr_line.decode("utf-8").strip()
+                    stderr_lines.append(line)
+                    logger.error(f"[TEST ERROR] {line}")
+                    
+                    # 将错误输出写入日志文件
+                    log_f.write(f"[ERR] {line}\n")
             
             # 等待进程完成
             process.wait()
@@ -161,7 +270,7 @@ class TestAndIssueCollector:
                 "timestamp": timestamp
             }
             
-            logger.info(f"Test completed with return code {process.returncode}")
+            logger.info("Test completed with return code %s", process.returncode)
             
             self.recorder.record_action(
                 "test_completed", 
@@ -173,15 +282,7 @@ class TestAndIssueCollector:
             
         except Exception as e:
             error_msg = f"Error running test script: {str(e)}"
-            logger.error(error_msg)
-            
-            self.recorder.record_action(
-                "run_tests", 
-                {"test_script": self.test_script},
-                {"success": False, "error": error_msg}
-            )
-            
-            return {"success": False, "error": error_msg}
+            return self._record_failure("run_tests", {"test_script": self.test_script}, error_msg)
     
     def collect_issues(self) -> List[Dict[str, Any]]:
         """
@@ -197,46 +298,10 @@ class TestAndIssueCollector:
         # 收集日志文件
         log_files = glob.glob(os.path.join(self.logs_dir, "*.log"))
         
-        logger.info(f"Found {len(log_files)} log files")
+        logger.info("Found %d log files", len(log_files))
         
-        for log_file in log_files:
-            try:
-                with open(log_file, "r", encoding="utf-8") as f:
-                    log_content = f.read()
-                
-                # 查找错误和警告
-                error_pattern = re.compile(r"(error|exception|fail|traceback)", re.IGNORECASE)
-                warning_pattern = re.compile(r"warning", re.IGNORECASE)
-                
-                # 提取错误
-                for match in error_pattern.finditer(log_content):
-                    # 获取错误上下文（前后各200个字符）
-                    start = max(0, match.start() - 200)
-                    end = min(len(log_content), match.end() + 200)
-                    context = log_content[start:end]
-                    
-                    issues.append({
-                        "type": "error",
-                        "file": os.path.basename(log_file),
-                        "context": context,
-                        "position": match.start()
-                    })
-                
-                # 提取警告
-                for match in warning_pattern.finditer(log_content):
-                    # 获取警告上下文（前后各150个字符）
-                    start = max(0, match.start() - 150)
-                    end = min(len(log_content), match.end() + 150)
-                    context = log_content[start:end]
-                    
-                    issues.append({
-                        "type": "warning",
-                        "file": os.path.basename(log_file),
-                        "context": context,
-                        "position": match.start()
-                    })
-            except Exception as e:
-                logger.error(f"Error processing log file {log_file}: {e}")
+        for found in self._scan_log_files(log_files):
+            issues.extend(found)
         
         # 检查是否生成了PPT文件
         ppt_files = glob.glob(os.path.join(self.repo_path, "final_release/static/ppt/*.pptx"))
@@ -248,7 +313,7 @@ class TestAndIssueCollector:
                 "position": 0
             })
         
-        logger.info(f"Collected {len(issues)} issues")
+        logger.info("Collected %d issues", len(issues))
         
         self.recorder.record_action(
             "collect_issues", 
@@ -258,6 +323,55 @@ class TestAndIssueCollector:
         
         return issues
     
+    def _scan_log_files(self, log_files: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        扫描所有日志文件，日志较大时在多个进程中并行扫描
+        
+        Args:
+            log_files: 日志文件路径列表
+            
+        Returns:
+            与log_files顺序一致的每个文件的问题列表
+        """
+        total_size = 0
+        for log_file in log_files:
+            try:
+                total_size += os.path.getsize(log_file)
+            except OSError:
+                pass
+        
+        if len(log_files) > 1 and total_size >= PARALLEL_SCAN_MIN_BYTES:
+            try:
+                # 正则匹配受GIL限制，使用进程池才能真正并行
+                with ProcessPoolExecutor(max_workers=min(len(log_files), os.cpu_count() or 1)) as executor:
+                    return list(executor.map(_scan_log_file, log_files))
+            except Exception as e:
+                logger.warning(f"Parallel log scan failed, falling back to serial scan: {e}")
+        
+        return [_scan_log_file(log_file) for log_file in log_files]
+    
+    def _write_readme(self, content: str) -> None:
+        """
+        原子写入README（先写临时文件再替换），中断时不会留下被截断的README
+        
+        Args:
+            content: README的完整内容
+        """
+        tmp_path = self.readme_path + ".tmp"
+        try:
+            # 一次编码后以二进制写入
+            with open(tmp_path, "wb") as f:
+                f.write(content.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            shutil.copymode(self.readme_path, tmp_path)
+            os.replace(tmp_path, self.readme_path)
+        except Exception:
+            # 失败时清理临时文件，原README保持不变
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
     def update_readme(self, issues: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         更新README文件，添加发现的问题
@@ -272,50 +386,59 @@ class TestAndIssueCollector:
         
         if not os.path.exists(self.readme_path):
             error_msg = f"README file {self.readme_path} does not exist"
-            logger.error(error_msg)
-            
-            self.recorder.record_action(
-                "update_readme", 
-                {"readme_path": self.readme_path},
-                {"success": False, "error": error_msg}
-            )
-            
-            return {"success": False, "error": error_msg}
+            return self._record_failure("update_readme", {"readme_path": self.readme_path}, error_msg)
         
         try:
             # 读取当前README内容
-            with open(self.readme_path, "r", encoding="utf-8") as f:
-                readme_content = f.read()
-            
-            # 生成问题报告
-            issues_report = "\n\n## 测试发现的问题\n\n"
+            readme_content = Path(self.readme_path).read_text(encoding="utf-8")
+            
+            # 没有问题且README中没有旧的问题部分时无需改动README
+            start = readme_content.find(ISSUES_SECTION_TITLE)
+            if not issues and start == -1:
+                logger.info("No issues found and no issues section in README, skipping update")
+                self.recorder.record_action(
+                    "update_readme",
+                    {"readme_path": self.readme_path},
+                    {"success": True, "issues_count": 0, "skipped": True}
+                )
+                return {"success": True, "issues_count": 0, "skipped": True}
+            
+            # 生成问题报告，先收集片段再一次拼接
+            parts = [f"\n\n{ISSUES_SECTION_TITLE}\n\n"]
             
             if not issues:
-                issues_report += "测试未发现任何问题，所有功能正常工作。\n"
+                parts.append("测试未发现任何问题，所有功能正常工作。\n")
             else:
-                issues_report += "测试发现以下问题：\n\n"
+                parts.append("测试发现以下问题：\n\n")
                 
-                for i, issue in enumerate(issues, 1):
-                    issues_report += f"{i}. **{issue['type'].upper()}**: {issue['file']}\n"
-                    issues_report += f"   ```\n   {issue['context']}\n   ```\n\n"
+                # 每个问题生成一个片段
+                parts.extend(
+                    f"{i}. **{issue['type'].upper()}**: {issue['file']}\n"
+                    f"   ```\n   {issue['context']}\n   ```\n\n"
+                    for i, issue in enumerate(issues, 1)
+                )
             
             # 添加测试时间戳
-            issues_report += f"\n*测试时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n"
-            
-            # 检查README是否已包含问题部分
-            if "## 测试发现的问题" in readme_content:
-                # 替换现有问题部分
-                pattern = r"## 测试发现的问题.*?(?=\n## |$)"
-                readme_content = re.sub(pattern, issues_report.strip(), readme_content, flags=re.DOTALL)
+            issues_body = "".join(parts)
+            issues_report = issues_body + f"\n*测试时间: {datetime.now().isoformat(sep=' ', timespec='seconds')}*\n"
+            
+            # README已包含问题部分时替换从标题到下一个二级标题或文件末尾的内容
+            if start != -1:
+                end = readme_content.find("\n## ", start + len(ISSUES_SECTION_TITLE))
+                if end == -1:
+                    # 问题部分位于末尾时保留文件最后的换行
+                    end = len(readme_content) - 1 if readme_content.endswith("\n") else len(readme_content)
+                
+                # 替换现有问题部分，忽略测试时间戳后内容有变化时才写回README文件
+                existing_body = _ISSUES_TIMESTAMP_RE.sub("", readme_content[start:end])
+                if existing_body.strip() != issues_body.strip():
+                    self._write_readme(readme_content[:start] + issues_report.strip() + readme_content[end:])
             else:
-                # 添加问题部分到README末尾
-                readme_content += issues_report
+                # 只把问题部分追加到README末尾，无需重写整个文件
+                with open(self.readme_path, "a", encoding="utf-8") as f:
+                    f.write(issues_report)
             
-            # 写回README文件
-            with open(self.readme_path, "w", encoding="utf-8") as f:
-                f.write(readme_content)
-            
-            logger.info(f"Updated README with {len(issues)} issues")
+            logger.info("Updated README with %d issues", len(issues))
             
             self.recorder.record_action(
                 "update_readme", 
@@ -327,15 +450,7 @@ class TestAndIssueCollector:
             
         except Exception as e:
             error_msg = f"Error updating README: {str(e)}"
-            logger.error(error_msg)
-            
-            self.recorder.record_action(
-                "update_readme", 
-                {"readme_path": self.readme_path},
-                {"success": False, "error": error_msg}
-            )
-            
-            return {"success": False, "error": error_msg}
+            return self._record_failure("update_readme", {"readme_path": self.readme_path}, error_msg)
     
     def generate_test_report(self, test_result: Dict[str, Any], issues: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -351,43 +466,49 @@ class TestAndIssueCollector:
         self.recorder.record_thought("生成测试报告")
         
         # 创建报告文件
-        timestamp = test_result.get("timestamp") or datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = os.path.join(self.output_dir, f"TEST_REPORT_{timestamp}.md")
+        now = datetime.now()
+        timestamp = test_result.get("timestamp") or now.strftime("%Y%m%d_%H%M%S")
+        report_path = os.path.join(self._ensure_dir(self.output_dir), f"TEST_REPORT_{timestamp}.md")
         
         try:
-            report_content = "# PowerAutomation 测试报告\n\n"
-            report_content += f"测试时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+            parts = ["# PowerAutomation 测试报告\n\n"]
+            parts.append(f"测试时间: {now.isoformat(sep=' ', timespec='seconds')}\n\n")
             
             # 测试结果摘要
-            report_content += "## 测试结果摘要\n\n"
-            report_content += f"- **测试状态**: {'成功' if test_result.get('success') else '失败'}\n"
-            report_content += f"- **发现问题数**: {len(issues)}\n"
-            report_content += f"- **返回代码**: {test_result.get('return_code')}\n\n"
+            parts.append("## 测试结果摘要\n\n")
+            parts.append(f"- **测试状态**: {'成功' if test_result.get('success') else '失败'}\n")
+            parts.append(f"- **发现问题数**: {len(issues)}\n")
+            parts.append(f"- **返回代码**: {test_result.get('return_code')}\n\n")
             
             # 问题详情
-            report_content += "## 问题详情\n\n"
+            parts.append("## 问题详情\n\n")
             
             if not issues:
-                report_content += "测试未发现任何问题，所有功能正常工作。\n"
+                parts.append("测试未发现任何问题，所有功能正常工作。\n")
             else:
-                for i, issue in enumerate(issues, 1):
-                    report_content += f"### 问题 {i}: {issue['type'].upper()} in {issue['file']}\n\n"
-                    report_content += f"```\n{issue['context']}\n```\n\n"
+                parts.extend(
+                    f"### 问题 {i}: {issue['type'].upper()} in {issue['file']}\n\n"
+                    f"```\n{issue['context']}\n```\n\n"
+                    for i, issue in enumerate(issues, 1)
+                )
             
             # 测试日志
-            report_content += "## 测试日志\n\n"
-            report_content += "### 标准输出\n\n"
-            report_content += f"```\n{test_result.get('stdout', '')}\n```\n\n"
+            parts.append("## 测试日志\n\n")
+            parts.append("### 标准输出\n\n")
+            parts.append(f"```\n{test_result.get('stdout', '')}\n```\n\n")
             
-            if test_result.get('stderr'):
-                report_content += "### 标准错误\n\n"
-                report_content += f"```\n{test_result.get('stderr', '')}\n```\n\n"
+            stderr = test_result.get('stderr')
+            if stderr:
+                parts.append("### 标准错误\n\n")
+                parts.append(f"```\n{stderr}\n```\n\n")
+            
+            report_content = "".join(parts)
             
             # 写入报告文件
             with open(report_path, "w", encoding="utf-8") as f:
                 f.write(report_content)
             
-            logger.info(f"Generated test report: {report_path}")
+            logger.info("Generated test report: %s", report_path)
             
             self.recorder.record_action(
                 "generate_test_report", 
@@ -399,15 +520,7 @@ class TestAndIssueCollector:
             
         except Exception as e:
             error_msg = f"Error generating test report: {str(e)}"
-            logger.error(error_msg)
-            
-            self.recorder.record_action(
-                "generate_test_report", 
-                {"report_path": report_path},
-                {"success": False, "error": error_msg}
-            )
-            
-            return {"success": False, "error": error_msg}
+            return self._record_failure("generate_test_report", {"report_path": report_path}, error_msg)
     
     def collect_test_artifacts(self) -> Dict[str, Any]:
         """
@@ -446,7 +559,10 @@ class TestAndIssueCollector:
             other_files.extend(glob.glob(os.path.join(self.output_dir, "*.txt")))
             artifacts["other_files"] = other_files
             
-            logger.info(f"Collected {len(log_files)} logs, {len(screenshot_files)} screenshots, {len(ppt_files)} PPT files, {len(other_files)} other files")
+            logger.info(
+                "Collected %d logs, %d screenshots, %d PPT files, %d other files",
+                len(log_files), len(screenshot_files), len(ppt_files), len(other_files)
+            )
             
             self.recorder.record_action(
                 "collect_test_artifacts", 
@@ -467,15 +583,7 @@ class TestAndIssueCollector:
             
         except Exception as e:
             error_msg = f"Error collecting test artifacts: {str(e)}"
-            logger.error(error_msg)
-            
-            self.recorder.record_action(
-                "collect_test_artifacts", 
-                {},
-                {"success": False, "error": error_msg}
-            )
-            
-            return {"success": False, "error": error_msg}
+            return self._record_failure("collect_test_artifacts", {}, error_msg)
     
     def archive_test_results(self, tag_name: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -490,7 +598,7 @@ class TestAndIssueCollector:
         self.recorder.record_thought("归档测试结果")
         
         # 创建归档目录
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         archive_dir_name = tag_name or f"test_{timestamp}"
         archive_dir = os.path.join(self.repo_path, "archives", archive_dir_name)
         
@@ -530,7 +638,7 @@ class TestAndIssueCollector:
             for other_file in artifacts["other_files"]:
                 shutil.copy2(other_file, archive_dir)
             
-            logger.info(f"Archived test results to {archive_dir}")
+            logger.info("Archived test results to %s", archive_dir)
             
             self.recorder.record_action(
                 "archive_test_results", 
@@ -545,20 +653,23 @@ class TestAndIssueCollector:
             
         except Exception as e:
             error_msg = f"Error archiving test results: {str(e)}"
-            logger.error(error_msg)
-            
-            self.recorder.record_action(
-                "archive_test_results", 
-                {"tag_name": tag_name},
-                {"success": False, "error": error_msg}
-            )
-            
-            return {"success": False, "error": error_msg}
+            return self._record_failure("archive_test_results", {"tag_name": tag_name}, error_msg)
     
     def run_full_test_cycle(self) -> Dict[str, Any]:
         """
         运行完整的测试周期，包括运行测试、收集问题、更新README和生成报告
         
+        Returns:
+            测试周期结果
+        """
+        # 周期内的思考和操作记录在结束时一次写入日志
+        with self.recorder.batch():
+            return self._run_full_test_cycle()
+    
+    def _run_full_test_cycle(self) -> Dict[str, Any]:
+        """
+        run_full_test_cycle的实际步骤
+        
         Returns:
             测试周期结果
         """
@@ -28,6 +28,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger("TestAndReadmeUpdater")
 
+# 测试用例元数据前缀与字段的对应表（Markdown转换为HTML后 **ID**: 的文本为 ID:）
+_CASE_METADATA_FIELDS = (
+    ("ID:", "id"),
+    ("类型:", "type"),
+    ("优先级:", "priority"),
+    ("描述:", "description"),
+)
+
+# 测试用例小节标题关键词与字段的对应表
+_CASE_SECTION_FIELDS = (
+    ("前置条件", "preconditions"),
+    ("测试步骤", "steps"),
+    ("预期结果", "expected_results"),
+    ("验证点", "verification_points"),
+)
+
 class TestAndReadmeUpdater:
     """
     自动化测试与README更新器，负责执行测试步骤，收集问题，
@@ -147,30 +163,20 @@ class TestAndReadmeUpdater:
             
             while element and element.name != "h3":
                 if element.name == "p":
-                    text = element.get_text().strip()
-                    
-                    # 检查是否包含元数据
-                    if "**ID**:" in text:
-                        case["id"] = text.split("**ID**:", 1)[1].strip()
-                    elif "**类型**:" in text:
-                        case["type"] = text.split("**类型**:", 1)[1].strip()
-                    elif "**优先级**:" in text:
-                        case["priority"] = text.split("**优先级**:", 1)[1].strip()
-                    elif "**描述**:" in text:
-                        case["description"] = text.split("**描述**:", 1)[1].strip()
+                    # 检查是否包含元数据，相邻的元数据行会合并在同一段落中，逐行解析
+                    for line in element.get_text().splitlines():
+                        line = line.strip()
+                        for marker, field in _CASE_METADATA_FIELDS:
+                            if line.startswith(marker):
+                                case[field] = line[len(marker):].strip()
+                                break
                 
                 elif element.name == "h4":
                     section_title = element.get_text().strip()
-                    if "前置条件" in section_title:
-                        current_section = "preconditions"
-                    elif "测试步骤" in section_title:
-                        current_section = "steps"
-                    elif "预期结果" in section_title:
-                        current_section = "expected_results"
-                    elif "验证点" in section_title:
-                        current_section = "verification_points"
-                    else:
-                        current_section = None
+                    current_section = next(
+                        (field for keyword, field in _CASE_SECTION_FIELDS if keyword in section_title),
+                        None
+                    )
                 
                 elif element.name == "ul" and current_section:
                     items = element.find_all("li")
@@ -645,7 +651,7 @@ class TestAndReadmeUpdater:
             # 更新或添加测试结果部分
             if test_results_section in content:
                 # 更新现有部分
-                pattern = re.compile(f"{test_results_section}.*?(?=^##|\Z)", re.DOTALL | re.MULTILINE)
+                pattern = re.compile(rf"{test_results_section}.*?(?=^##|\Z)", re.DOTALL | re.MULTILINE)
                 content = pattern.sub(f"{test_results_section}\n\n{test_results_content}\n\n", content)
             else:
                 # 添加新部分
@@ -654,7 +660,7 @@ class TestAndReadmeUpdater:
             # 更新或添加已知问题部分
             if test_issues_section in content:
                 # 更新现有部分
-                pattern = re.compile(f"{test_issues_section}.*?(?=^##|\Z)", re.DOTALL | re.MULTILINE)
+                pattern = re.compile(rf"{test_issues_section}.*?(?=^##|\Z)", re.DOTALL | re.MULTILINE)
                 content = pattern.sub(f"{test_issues_section}\n\n{test_issues_content}\n\n", content)
             else:
                 # 添加新部分
@@ -797,7 +803,8 @@ class TestAndReadmeUpdater:
                 f.write(f"- **测试用例总数**: {total}\n")
                 f.write(f"- **通过**: {passed}\n")
                 f.write(f"- **失败**: {failed}\n")
-                f.write(f"- **通过率**: {passed/total*100:.2f}% 如果total > 0 else 'N/A'}\n\n")
+                pass_rate = f"{passed/total*100:.2f}%" if total > 0 else "N/A"
+                f.write(f"- **通过率**: {pass_rate}\n\n")
                 
                 # 测试环境
                 f.write("## 测试环境\n\n")
@@ -19,8 +19,17 @@ import time
 import datetime
 import shutil
 import logging
+import threading
+from contextlib import contextmanager
 from typing import Dict, List, Any, Optional, Union
 
+# 可选：安装orjson后使用其进行JSON编解码（比标准库json快数倍）
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +37,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ThoughtActionRecorder")
 
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """
+    解析JSON，可用时使用orjson
+    
+    Args:
+        data: JSON文本
+        
+    Returns:
+        解析后的对象
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    将对象编码为UTF-8 JSON字节串（保留非ASCII字符），可用时使用orjson
+    
+    Args:
+        obj: 要编码的对象
+        indent: 是否缩进两格输出
+        
+    Returns:
+        bytes: 编码后的JSON
+    """
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
 class ThoughtActionRecorder:
     """
     思考与操作记录器类，用于记录Manus的思考过程和执行的操作
@@ -44,6 +85,8 @@ class ThoughtActionRecorder:
         self.current_session = None
         self.thought_log = None
         self.action_log = None
+        # 批量记录状态按线程保存，只暂存调用batch()的线程的日志行
+        self._batch = threading.local()
         self.setup_logging()
         logger.info(f"ThoughtActionRecorder initialized with log directory: {self.log_dir}")
     
@@ -128,25 +171,67 @@ class ThoughtActionRecorder:
         
         return entry
     
+    @contextmanager
+    def batch(self):
+        """
+        批量记录上下文，期间的思考和操作先暂存，退出时每个日志文件只写入一次
+        
+        批量期间get_session_logs等查询看不到尚未写入的条目，可以嵌套使用，
+        最外层退出时统一写入（包括发生异常时）。批量只作用于当前线程，
+        其他线程的记录照常立即写入。
+        """
+        depth = getattr(self._batch, "depth", 0)
+        if depth == 0:
+            self._batch.pending = {}
+        self._batch.depth = depth + 1
+        try:
+            yield self
+        finally:
+            self._batch.depth -= 1
+            if self._batch.depth == 0:
+                pending, self._batch.pending = self._batch.pending, {}
+                for log_file, lines in pending.items():
+                    self._write_to_log(log_file, b"".join(lines))
+    
     def _append_to_log(self, log_file: str, entry: Dict[str, Any]) -> None:
         """
-        将条目追加到日志文件
+        将条目追加到日志文件，批量记录期间先暂存
         
         Args:
             log_file: 日志文件路径
             entry: 要追加的条目
         """
         try:
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            line = _json_dumps(entry) + b"\n"
+        except Exception as e:
+            # 日志只是旁路记录，无法序列化的条目记录错误后跳过
+            logger.error(f"Error appending to log file {log_file}: {e}")
+            return
+        
+        if getattr(self._batch, "depth", 0):
+            self._batch.pending.setdefault(log_file, []).append(line)
+        else:
+            self._write_to_log(log_file, line)
+    
+    def _write_to_log(self, log_file: str, data: bytes) -> None:
+        """
+        将编码后的日志行写入日志文件
+        
+        Args:
+            log_file: 日志文件路径
+            data: 一行或多行JSON
+        """
+        try:
+            with open(log_file, "ab") as f:
+                f.write(data)
         except Exception as e:
             logger.error(f"Error appending to log file {log_file}: {e}")
             # 尝试创建目录
             os.makedirs(os.path.dirname(log_file), exist_ok=True)
             # 重试一次
             try:
-                with open(log_file, "a", encoding="utf-8") as f:
-                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                with open(log_file, "ab") as f:
+                    f.write(data)
             except Exception as e2:
                 logger.error(f"Second attempt failed: {e2}")
     
@@ -170,10 +255,10 @@ class ThoughtActionRecorder:
         thought_log = os.path.join(session_dir, "thoughts.jsonl")
         if os.path.exists(thought_log):
             try:
-                with open(thought_log, "r", encoding="utf-8") as f:
+                with open(thought_log, "rb") as f:
                     for line in f:
                         if line.strip():
-                            thoughts.append(json.loads(line))
+                            thoughts.append(_json_loads(line))
             except Exception as e:
                 logger.error(f"Error reading thought log {thought_log}: {e}")
         
@@ -181,10 +266,10 @@ class ThoughtActionRecorder:
         action_log = os.path.join(session_dir, "actions.jsonl")
         if os.path.exists(action_log):
             try:
-                with open(action_log, "r", encoding="utf-8") as f:
+                with open(action_log, "rb") as f:
                     for line in f:
                         if line.strip():
-                            actions.append(json.loads(line))
+                            actions.append(_json_loads(line))
             except Exception as e:
                 logger.error(f"Error reading action log {action_log}: {e}")
         
@@ -261,29 +346,24 @@ class ThoughtActionRecorder:
         matched_thoughts = []
         matched_actions = []
         
+        # 关键词只转换一次小写
+        keyword_lower = keyword.lower()
+        
         # 搜索思考记录
         for thought in logs.get("thoughts", []):
             content = thought.get("content", "").lower()
-            if keyword.lower() in content:
+            if keyword_lower in content:
                 matched_thoughts.append(thought)
         
-        # 搜索操作记录
+        # 搜索操作记录：操作类型、参数和结果拼接后只做一次小写转换和一次查找
+        # json.dumps的输出不含原始换行符，用换行分隔字段，关键词不会跨字段匹配
         for action in logs.get("actions", []):
-            # 搜索操作类型
-            action_type = action.get("action_type", "").lower()
-            if keyword.lower() in action_type:
-                matched_actions.append(action)
-                continue
-                
-            # 搜索操作参数
-            params_str = json.dumps(action.get("action_params", {}), ensure_ascii=False).lower()
-            if keyword.lower() in params_str:
-                matched_actions.append(action)
-                continue
-                
-            # 搜索操作结果
-            result_str = json.dumps(action.get("result", {}), ensure_ascii=False).lower()
-            if keyword.lower() in result_str:
+            haystack = "\n".join((
+                action.get("action_type", ""),
+                json.dumps(action.get("action_params", {}), ensure_ascii=False),
+                json.dumps(action.get("result", {}), ensure_ascii=False)
+            )).lower()
+            if keyword_lower in haystack:
                 matched_actions.append(action)
         
         logger.info(f"Search for '{keyword}' found {len(matched_thoughts)} thoughts and {len(matched_actions)} actions")
@@ -368,8 +448,8 @@ class ThoughtActionRecorder:
         if format.lower() == "json":
             export_file = os.path.join(export_dir, f"{session_id}_{timestamp}.json")
             try:
-                with open(export_file, "w", encoding="utf-8") as f:
-                    json.dump(logs, f, ensure_ascii=False, indent=2)
+                with open(export_file, "wb") as f:
+                    f.write(_json_dumps(logs, indent=True))
                 logger.info(f"Exported session {session_id} to {export_file}")
                 return {"success": True, "file": export_file}
             except Exception as e:
@@ -12,15 +12,32 @@ import os
 import sys
 import json
 import time
+import hashlib
 import logging
 import re
+import shutil
 import tempfile
 import subprocess
 import platform
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple, Union
+import numpy as np
+import PIL
 from PIL import Image, ImageDraw, ImageFont
 
+# 可选使用RE2正则引擎（基于DFA，无回溯），未安装时使用标准库re
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# 可选使用mss进程内截图（macOS下直接调用CoreGraphics），未安装时使用screencapture命令
+try:
+    import mss
+except ImportError:
+    mss = None
+
 # 根据平台导入特定模块
 PLATFORM = platform.system().lower()
 if PLATFORM == 'windows':
@@ -44,6 +61,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger("VisualCalibrator")
 
+# Mac下各浏览器获取当前URL的AppleScript，通过run script延迟编译，未安装的浏览器不会导致整个脚本编译失败
+MAC_BROWSER_URL_SCRIPTS = {
+    "Safari": 'tell application "Safari" to return URL of current tab of front window',
+    "Chrome": 'tell application "Google Chrome" to return URL of active tab of front window',
+    "Firefox": 'tell application "Firefox" to return URL of active tab of front window'
+}
+
+# 校准产物仅用于调试和可视化，使用最低压缩级别以加快PNG编码
+PNG_SAVE_OPTIONS = {"compress_level": 1, "optimize": False}
+
+# AppleScript返回字段的分隔符（ASCII单元分隔符，不会出现在应用名、路径和URL中）
+MAC_APPLESCRIPT_FIELD_SEPARATOR = "\x1f"
+
 class VisualCalibrator:
     """跨平台视觉校准器基类"""
     
@@ -62,20 +92,61 @@ class VisualCalibrator:
         self.simple_mode = simple_mode
         self.manual_regions = manual_regions
         self.config = self._load_config()
+        self._patterns = self._compile_patterns()
         self.temp_dir = tempfile.mkdtemp(prefix="visual_calibration_")
         
+        # 网格坐标标签图块缓存: (文本, 颜色) -> RGBA图块
+        self._label_tiles = {}
+        
+        # 预加载网格坐标(12)和区域标签(16)使用的字体
+        self._fonts = {size: self._load_font(size) for size in (12, 16)}
+        
+        # 图像编码线程池，区域图像的PNG编码可并行进行
+        self._io_executor = ThreadPoolExecutor(max_workers=2)
+        
+        # 上次写入自动监控配置的区域哈希，区域未变化时跳过写入
+        self._last_regions_hash = None
+        
+        # 最近一次截图的 (文件路径, 内存图像)，避免重新解码刚保存的截图
+        self._last_capture = None
+        
+        # 内容区域布局缓存: (URL, 浏览器窗口坐标, 区域)，URL和窗口不变时复用
+        self._layout_cache = None
+        
         # 如果指定了输出目录，覆盖配置中的日志目录
         if self.output_dir:
             self.config["log_dir"] = self.output_dir
         
-        # 创建日志目录
-        os.makedirs(self.config.get("log_dir", os.path.expanduser("~/mcp_logs")), exist_ok=True)
+        # 解析并创建日志目录（只解析一次）
+        self.log_dir = os.path.expanduser(self.config.get("log_dir", "~/mcp_logs"))
+        os.makedirs(self.log_dir, exist_ok=True)
         
         logger.info(f"{PLATFORM.capitalize()}视觉校准器初始化完成")
         logger.info(f"临时文件目录: {self.temp_dir}")
-        logger.info(f"日志目录: {self.config.get('log_dir', os.path.expanduser('~/mcp_logs'))}")
+        logger.info(f"日志目录: {self.log_dir}")
         logger.info(f"简化模式: {self.simple_mode}")
         logger.info(f"手动区域标定模式: {self.manual_regions}")
+        # Pillow-SIMD的版本号带有.postN后缀，便于确认是否启用了SIMD加速
+        logger.info(f"Pillow版本: {PIL.__version__}{' (SIMD)' if '.post' in PIL.__version__ else ''}")
+    
+    def close(self) -> None:
+        """
+        关闭图像编码线程池，校准器不再使用时调用
+        """
+        executor = getattr(self, "_io_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._io_executor = None
+    
+    def __enter__(self) -> "VisualCalibrator":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def __del__(self):
+        # 未显式关闭时随对象回收释放线程
+        self.close()
     
     def _load_config(self) -> Dict:
         """
@@ -96,20 +167,67 @@ class VisualCalibrator:
             "simple_mode": False,  # 是否使用简化模式
             "manual_regions": False,  # 是否使用手动区域标定模式
             "default_work_list_region": [0.05, 0.2, 0.45, 0.8],  # 默认工作列表区域 [左, 上, 右, 下] 相对比例
-            "default_action_list_region": [0.55, 0.2, 0.95, 0.8]  # 默认操作列表区域 [左, 上, 右, 下] 相对比例
+            "default_action_list_region": [0.55, 0.2, 0.95, 0.8],  # 默认操作列表区域 [左, 上, 右, 下] 相对比例
+            "browser_info_cache_ttl": 2.0,  # 浏览器信息缓存有效期（秒）
+            "capture_window_only": True,  # 已知浏览器窗口位置时只截取窗口区域
+            "use_mss": True,  # 已安装mss时使用进程内截图
+            "debug_save_intermediate": False  # 是否保存中间产物（自动标定时的校准网格图像）
         }
         
-        if self.config_file and os.path.exists(self.config_file):
+        if self.config_file:
+            # 直接打开文件，不存在时使用默认配置（避免先stat再open）
             try:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     config = json.load(f)
                 logger.info(f"已加载配置文件: {self.config_file}")
                 return {**default_config, **config}  # 合并默认配置和文件配置
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.error(f"加载配置文件失败: {e}")
         
         return default_config
     
+    @staticmethod
+    def _load_font(size: int):
+        """
+        加载字体，失败时使用默认字体
+        
+        Args:
+            size: 字体大小
+        
+        Returns:
+            字体对象
+        """
+        try:
+            return ImageFont.truetype("Arial.ttf", size)
+        except IOError:
+            return ImageFont.load_default()
+    
+    def _compile_patterns(self) -> Dict[str, Any]:
+        """
+        预编译配置中的正则表达式（忽略大小写），优先使用RE2
+        
+        Returns:
+            Dict[str, Any]: 编译后的正则表达式，键为 browser、work_list、action_list
+        """
+        patterns = {}
+        for name, key in (
+            ("browser", "browser_window_title_pattern"),
+            ("work_list", "work_list_pattern"),
+            ("action_list", "action_list_pattern")
+        ):
+            pattern = self.config[key]
+            compiled = None
+            if re2 is not None:
+                try:
+                    # RE2的第二个参数是Options而不是re标志，忽略大小写通过内联标志指定
+                    compiled = re2.compile("(?i)" + pattern)
+                except Exception as e:
+                    logger.warning(f"RE2无法编译正则表达式 {key}，使用标准库re: {e}")
+            patterns[name] = compiled or re.compile(pattern, re.IGNORECASE)
+        return patterns
+    
     def _save_config(self) -> bool:
         """
         保存配置
@@ -118,10 +236,7 @@ class VisualCalibrator:
             bool: 是否成功保存
         """
         if not self.config_file:
-            self.config_file = os.path.join(
-                self.config.get("log_dir", os.path.expanduser("~/mcp_logs")),
-                f"{PLATFORM}_visual_calibration.json"
-            )
+            self.config_file = os.path.join(self.log_dir, f"{PLATFORM}_visual_calibration.json")
         
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
@@ -141,6 +256,77 @@ class VisualCalibrator:
         """
         raise NotImplementedError("子类必须实现此方法")
     
+    def _load_screenshot(self, screenshot_path: str) -> Image.Image:
+        """
+        加载截图，如果截图刚在内存中生成则直接复用
+        
+        Args:
+            screenshot_path: 截图文件路径
+        
+        Returns:
+            Image.Image: 已解码的截图图像
+        """
+        if self._last_capture is not None and self._last_capture[0] == screenshot_path:
+            return self._last_capture[1]
+        
+        img = Image.open(screenshot_path)
+        img.load()
+        return img
+    
+    def capture_window(self, window: Tuple[int, int, int, int]) -> Optional[str]:
+        """
+        只捕获指定的屏幕区域（平台可选实现）
+        
+        Args:
+            window: 屏幕区域坐标 (x1, y1, x2, y2)
+        
+        Returns:
+            Optional[str]: 截图文件路径，不支持或失败时返回None
+        """
+        return None
+    
+    def get_known_browser_window(self, refresh: bool = True) -> Optional[Tuple[int, int, int, int]]:
+        """
+        在截图之前获取已知的浏览器窗口坐标，用于只截取窗口区域（平台可选实现）
+        
+        Args:
+            refresh: 为False时只返回上次查询到的窗口坐标，不发起新的查询
+        
+        Returns:
+            Optional[Tuple[int, int, int, int]]: 浏览器窗口坐标 (x1, y1, x2, y2)，未知时返回None
+        """
+        return None
+    
+    @staticmethod
+    def _to_image_box(box: Tuple[int, int, int, int], capture_window: Optional[Tuple[int, int, int, int]], image_size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """
+        将屏幕坐标转换为截图图像坐标
+        
+        窗口截图的原点是窗口左上角，且在Retina屏幕上像素尺寸是屏幕坐标的整数倍，
+        因此需要平移并缩放；全屏截图时坐标不变。
+        
+        Args:
+            box: 屏幕坐标 (x1, y1, x2, y2)
+            capture_window: 截图对应的屏幕区域，全屏截图时为None
+            image_size: 截图图像尺寸 (width, height)
+        
+        Returns:
+            Tuple[int, int, int, int]: 图像坐标 (x1, y1, x2, y2)
+        """
+        if not capture_window or box == (0, 0, 0, 0):
+            return box
+        
+        cx1, cy1, cx2, cy2 = capture_window
+        scale_x = image_size[0] / max(cx2 - cx1, 1)
+        scale_y = image_size[1] / max(cy2 - cy1, 1)
+        x1, y1, x2, y2 = box
+        return (
+            int((x1 - cx1) * scale_x),
+            int((y1 - cy1) * scale_y),
+            int((x2 - cx1) * scale_x),
+            int((y2 - cy1) * scale_y)
+        )
+    
     def get_active_browser_info(self) -> Dict[str, Any]:
         """
         获取活动浏览器信息（平台特定实现）
@@ -150,6 +336,14 @@ class VisualCalibrator:
         """
         raise NotImplementedError("子类必须实现此方法")
     
+    def _prefetch_browser_info(self) -> None:
+        """
+        预取浏览器信息，在截图的同时于后台线程执行（平台可选实现）
+        
+        子类可覆盖此方法预热浏览器信息缓存，使截图与浏览器查询并行进行。
+        """
+        pass
+    
     def get_browser_url(self) -> Optional[str]:
         """
         获取浏览器当前URL（平台特定实现）
@@ -159,76 +353,107 @@ class VisualCalibrator:
         """
         raise NotImplementedError("子类必须实现此方法")
     
-    def detect_browser_window(self, screenshot_path: str) -> Optional[Tuple[int, int, int, int]]:
+    def detect_browser_window(self, screenshot_path: str, browser_info: Optional[Dict[str, Any]] = None) -> Optional[Tuple[int, int, int, int]]:
         """
         检测浏览器窗口位置（平台特定实现）
         
         Args:
             screenshot_path: 截图文件路径
+            browser_info: 已获取的浏览器信息，为None时自行查询
         
         Returns:
             Optional[Tuple[int, int, int, int]]: 浏览器窗口坐标 (x1, y1, x2, y2)，如果检测失败则返回None
         """
         raise NotImplementedError("子类必须实现此方法")
     
-    def create_calibration_grid(self, screenshot_path: str, browser_window: Tuple[int, int, int, int]) -> str:
+    def _get_label_tile(self, text: str, fill: str, font) -> Image.Image:
+        """
+        获取预渲染的文字标签图块，相同文本只光栅化一次
+        
+        Args:
+            text: 标签文本
+            fill: 文字颜色
+            font: 字体
+        
+        Returns:
+            Image.Image: 透明背景的RGBA标签图块
+        """
+        key = (text, fill)
+        tile = self._label_tiles.get(key)
+        if tile is None:
+            _, _, right, bottom = font.getbbox(text)
+            tile = Image.new("RGBA", (max(right, 1), max(bottom, 1)), (0, 0, 0, 0))
+            ImageDraw.Draw(tile).text((0, 0), text, fill=fill, font=font)
+            self._label_tiles[key] = tile
+        return tile
+    
+    def create_calibration_grid(self, screenshot_path: str, browser_window: Tuple[int, int, int, int], img: Optional[Image.Image] = None) -> str:
         """
         创建校准网格
         
         Args:
             screenshot_path: 截图文件路径
             browser_window: 浏览器窗口坐标 (x1, y1, x2, y2)
+            img: 已解码的截图图像，可选，提供时不再重新读取截图文件
         
         Returns:
             str: 带网格的截图文件路径
         """
         try:
-            # 加载截图
-            img = Image.open(screenshot_path)
-            draw = ImageDraw.Draw(img)
+            # 加载截图（网格绘制在副本上，不修改原图）
+            if img is None:
+                img = Image.open(screenshot_path)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGB")
             
             # 获取浏览器窗口尺寸
             x1, y1, x2, y2 = browser_window
             width = x2 - x1
             height = y2 - y1
             
-            # 绘制边框
-            draw.rectangle(browser_window, outline="red", width=2)
-            
-            # 绘制网格
+            # 计算网格
             grid_size = self.config.get("calibration_grid_size", 10)
             cell_width = width // grid_size
             cell_height = height // grid_size
             
-            # 绘制水平线
-            for i in range(1, grid_size):
-                y = y1 + i * cell_height
-                draw.line([(x1, y), (x2, y)], fill="blue", width=1)
+            # 使用NumPy一次性绘制所有网格线
+            pixels = np.array(img)
+            img_height, img_width = pixels.shape[:2]
+            blue = (0, 0, 255, 255)[:pixels.shape[2]]
+            
+            line_x1, line_x2 = max(x1, 0), min(x2 + 1, img_width)
+            line_y1, line_y2 = max(y1, 0), min(y2 + 1, img_height)
+            
+            # 水平线
+            ys = y1 + np.arange(1, grid_size) * cell_height
+            ys = ys[(ys >= 0) & (ys < img_height)]
+            pixels[ys, line_x1:line_x2] = blue
+            
+            # 垂直线
+            xs = x1 + np.arange(1, grid_size) * cell_width
+            xs = xs[(xs >= 0) & (xs < img_width)]
+            pixels[line_y1:line_y2, xs] = blue
             
-            # 绘制垂直线
-            for i in range(1, grid_size):
-                x = x1 + i * cell_width
-                draw.line([(x, y1), (x, y2)], fill="blue", width=1)
+            img = Image.fromarray(pixels, img.mode)
+            draw = ImageDraw.Draw(img)
+            
+            # 绘制边框
+            draw.rectangle(browser_window, outline="red", width=2)
             
             # 标记坐标
-            try:
-                # 尝试加载字体
-                font = ImageFont.truetype("Arial.ttf", 12)
-            except IOError:
-                # 如果无法加载字体，使用默认字体
-                font = ImageFont.load_default()
+            font = self._fonts[12]
             
-            # 标记网格坐标
+            # 标记网格坐标，使用预渲染的标签图块
             for i in range(grid_size + 1):
                 for j in range(grid_size + 1):
                     x = x1 + j * cell_width
                     y = y1 + i * cell_height
-                    coord_text = f"({j},{i})"
-                    draw.text((x - 15, y - 15), coord_text, fill="red", font=font)
+                    tile = self._get_label_tile(f"({j},{i})", "red", font)
+                    img.paste(tile, (x - 15, y - 15), tile)
             
             # 保存带网格的截图
             grid_path = os.path.join(self.temp_dir, f"calibration_grid_{os.path.basename(screenshot_path)}")
-            img.save(grid_path)
+            img.save(grid_path, **PNG_SAVE_OPTIONS)
             
             logger.info(f"校准网格已创建: {grid_path}")
             return grid_path
@@ -237,13 +462,14 @@ class VisualCalibrator:
             logger.error(f"创建校准网格失败: {e}")
             return screenshot_path
     
-    def detect_content_regions(self, screenshot_path: str, browser_window: Tuple[int, int, int, int]) -> Dict[str, Tuple[int, int, int, int]]:
+    def detect_content_regions(self, screenshot_path: str, browser_window: Tuple[int, int, int, int], url: Optional[str] = None) -> Dict[str, Tuple[int, int, int, int]]:
         """
         检测内容区域
         
         Args:
             screenshot_path: 截图文件路径
             browser_window: 浏览器窗口坐标 (x1, y1, x2, y2)
+            url: 已获取的浏览器URL，为None时自行查询
         
         Returns:
             Dict[str, Tuple[int, int, int, int]]: 检测到的区域，格式为 {"work_list": (x1, y1, x2, y2), "action_list": (x1, y1, x2, y2)}
@@ -259,11 +485,19 @@ class VisualCalibrator:
                 logger.info("使用手动区域标定模式")
                 return self._manual_region_selection(screenshot_path, browser_window)
             
-            # 获取当前URL
-            url = self.get_browser_url() if not self.simple_mode else "https://manus.im/"
+            # 获取当前URL（调用方已获取时直接复用）
+            if url is None:
+                url = self.get_browser_url() if not self.simple_mode else "https://manus.im/"
+            
+            # URL未变化且浏览器窗口位置变化不超过2像素时，复用上次检测的区域
+            if self._layout_cache is not None:
+                cached_url, cached_window, cached_regions = self._layout_cache
+                if cached_url == url and all(abs(a - b) <= 2 for a, b in zip(cached_window, browser_window)):
+                    logger.info(f"URL和浏览器窗口未变化，复用已检测的内容区域: {cached_regions}")
+                    return dict(cached_regions)
             
             # 检查是否为目标网站
-            if url and "manus.im" in url:
+            if url and self._patterns["browser"].search(url):
                 logger.info(f"检测到目标网站: {url}")
                 
                 # 根据manus.im网站的布局估计区域位置
@@ -311,6 +545,8 @@ class VisualCalibrator:
                     "action_list": (int(action_list_x1), int(action_list_y1), int(action_list_x2), int(action_list_y2))
                 }
             
+            self._layout_cache = (url, tuple(browser_window), dict(regions))
+            
             logger.info(f"检测到内容区域: {regions}")
             return regions
         
@@ -334,21 +570,26 @@ class VisualCalibrator:
         """
         raise NotImplementedError("子类必须实现此方法")
     
-    def visualize_detected_regions(self, screenshot_path: str, regions: Dict[str, Tuple[int, int, int, int]]) -> str:
+    def visualize_detected_regions(self, screenshot_path: str, regions: Dict[str, Tuple[int, int, int, int]], img: Optional[Image.Image] = None) -> str:
         """
         可视化检测到的区域
         
         Args:
             screenshot_path: 截图文件路径
             regions: 检测到的区域
+            img: 已解码的截图图像，可选，提供时直接使用而不重新读取截图文件（不会被修改）
         
         Returns:
             str: 带标记的截图文件路径
         """
         try:
             # 加载截图
-            img = Image.open(screenshot_path)
-            draw = ImageDraw.Draw(img)
+            if img is None:
+                img = Image.open(screenshot_path)
+            
+            # 所有矩形和标签先绘制到透明图层，最后一次性合成，不修改源图像
+            overlay = Image.new("RGBA", img.size, (0, 0, 0, 0))
+            draw = ImageDraw.Draw(overlay)
             
             # 绘制区域
             colors = {
@@ -365,16 +606,13 @@ class VisualCalibrator:
                 draw.rectangle(region, outline=color, width=2)
                 
                 # 添加标签
-                try:
-                    font = ImageFont.truetype("Arial.ttf", 16)
-                except IOError:
-                    font = ImageFont.load_default()
-                
-                draw.text((x1 + 5, y1 + 5), name, fill=color, font=font)
+                draw.text((x1 + 5, y1 + 5), name, fill=color, font=self._fonts[16])
+            
+            marked = Image.alpha_composite(img.convert("RGBA"), overlay).convert("RGB")
             
             # 保存带标记的截图
             marked_path = os.path.join(self.temp_dir, f"detected_regions_{os.path.basename(screenshot_path)}")
-            img.save(marked_path)
+            marked.save(marked_path, **PNG_SAVE_OPTIONS)
             
             logger.info(f"已可视化检测区域: {marked_path}")
             return marked_path
@@ -383,41 +621,54 @@ class VisualCalibrator:
             logger.error(f"可视化检测区域失败: {e}")
             return screenshot_path
     
-    def extract_region_content(self, screenshot_path: str, regions: Dict[str, Tuple[int, int, int, int]]) -> Dict[str, str]:
+    def extract_region_content(self, screenshot_path: str, regions: Dict[str, Tuple[int, int, int, int]], img: Optional[Image.Image] = None) -> Dict[str, str]:
         """
         提取区域内容
         
         Args:
             screenshot_path: 截图文件路径
             regions: 检测到的区域
+            img: 已解码的截图图像，可选，提供时不再重新读取截图文件
         
         Returns:
             Dict[str, str]: 提取的区域内容图像路径
         """
         try:
             # 加载截图
-            img = Image.open(screenshot_path)
+            if img is None:
+                img = Image.open(screenshot_path)
+            img_width, img_height = img.size
             
             # 提取区域内容
             region_images = {}
+            save_futures = []
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
             for name, region in regions.items():
                 if region == (0, 0, 0, 0):
                     continue
                 
-                # 裁剪区域
+                # 跳过坐标反转或完全位于截图之外的区域，不影响其他区域
+                x1, y1, x2, y2 = region
+                if x2 <= x1 or y2 <= y1 or x2 <= 0 or y2 <= 0 or x1 >= img_width or y1 >= img_height:
+                    logger.warning(f"区域 {name} 超出截图范围或坐标无效，跳过: {region}")
+                    continue
+                
+                # 裁剪区域（部分超出截图的区域按PIL的方式补齐，尺寸与区域一致）
                 region_img = img.crop(region)
                 
-                # 保存区域图像
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                region_path = os.path.join(
-                    self.config.get("log_dir", os.path.expanduser("~/mcp_logs")),
-                    f"{name}_{timestamp}.png"
-                )
-                region_img.save(region_path)
+                # 保存区域图像，PNG编码交给线程池并行执行
+                region_path = os.path.join(self.log_dir, f"{name}_{timestamp}.png")
+                save_futures.append(self._io_executor.submit(
+                    region_img.save, region_path, **PNG_SAVE_OPTIONS
+                ))
                 
                 region_images[name] = region_path
             
+            # 等待所有区域图像保存完成
+            for future in save_futures:
+                future.result()
+            
             logger.info(f"已提取区域内容: {region_images}")
             return region_images
         
@@ -437,15 +688,21 @@ class VisualCalibrator:
         """
         try:
             # 加载自动监控配置
-            auto_monitor_config_path = os.path.join(
-                self.config.get("log_dir", os.path.expanduser("~/mcp_logs")),
-                "auto_web_monitor_config.json"
-            )
+            auto_monitor_config_path = os.path.join(self.log_dir, "auto_web_monitor_config.json")
+            
+            # 区域未变化时跳过配置读写
+            regions_hash = hashlib.blake2b(
+                json.dumps([auto_monitor_config_path, regions], sort_keys=True).encode("utf-8"),
+                digest_size=8
+            ).digest()
+            if regions_hash == self._last_regions_hash:
+                logger.info(f"监控区域未变化，跳过更新自动监控配置: {auto_monitor_config_path}")
+                return True
             
-            if os.path.exists(auto_monitor_config_path):
+            try:
                 with open(auto_monitor_config_path, 'r', encoding='utf-8') as f:
                     auto_monitor_config = json.load(f)
-            else:
+            except FileNotFoundError:
                 auto_monitor_config = {}
             
             # 更新监控区域
@@ -465,9 +722,12 @@ class VisualCalibrator:
             auto_monitor_config["platform"] = PLATFORM
             auto_monitor_config["last_updated"] = datetime.now().isoformat()
             
-            # 保存配置
-            with open(auto_monitor_config_path, 'w', encoding='utf-8') as f:
+            # 保存配置（先写临时文件再原子替换，避免读取到写了一半的文件）
+            tmp_path = auto_monitor_config_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(auto_monitor_config, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, auto_monitor_config_path)
+            self._last_regions_hash = regions_hash
             
             logger.info(f"已更新自动监控配置: {auto_monitor_config_path}")
             return True
@@ -484,61 +744,89 @@ class VisualCalibrator:
             Dict[str, Any]: 校准结果
         """
         try:
-            # 步骤1: 捕获全屏截图
-            logger.info("步骤1: 捕获全屏截图")
-            screenshot_path = self.capture_screenshot()
+            # 步骤1: 捕获截图
+            # 已知浏览器窗口位置时只截取窗口区域（手动标定模式需要全屏网格，不使用窗口截图）
+            screenshot_path = None
+            capture_window = None
+            if self.config.get("capture_window_only", True) and not self.manual_regions:
+                capture_window = self.get_known_browser_window(refresh=False)
+            if capture_window:
+                # 按上次查询到的窗口位置截图，同时在后台刷新浏览器信息
+                logger.info(f"步骤1: 捕获浏览器窗口截图: {capture_window}")
+                prefetch_future = self._io_executor.submit(self._prefetch_browser_info)
+                screenshot_path = self.capture_window(capture_window)
+                prefetch_future.result()
+                
+                # 窗口已移动或缩放时按最新位置重新截图
+                current_window = self.get_known_browser_window()
+                if current_window != capture_window:
+                    capture_window = current_window
+                    screenshot_path = None
+                    if capture_window:
+                        logger.info(f"步骤1: 浏览器窗口已变化，重新捕获窗口截图: {capture_window}")
+                        screenshot_path = self.capture_window(capture_window)
+            
+            if not screenshot_path:
+                # 捕获全屏截图（同时在后台预取浏览器信息）
+                capture_window = None
+                logger.info("步骤1: 捕获全屏截图")
+                prefetch_future = self._io_executor.submit(self._prefetch_browser_info)
+                screenshot_path = self.capture_screenshot()
+                prefetch_future.result()
             if not screenshot_path:
                 return {"success": False, "error": "捕获全屏截图失败"}
             
             # 步骤2: 检测浏览器窗口
+            # 浏览器信息（含URL）只查询一次，后续步骤共用
             logger.info("步骤2: 检测浏览器窗口")
-            browser_window = self.detect_browser_window(screenshot_path)
+            browser_info = self.get_active_browser_info()
+            browser_window = self.detect_browser_window(screenshot_path, browser_info)
             if not browser_window:
                 return {"success": False, "error": "检测浏览器窗口失败"}
             
-            # 步骤3: 创建校准网格
-            logger.info("步骤3: 创建校准网格")
-            grid_path = self.create_calibration_grid(screenshot_path, browser_window)
+            # 只解码一次截图，后续步骤共用
+            img = self._load_screenshot(screenshot_path)
+            
+            # 步骤3: 创建校准网格（绘制使用图像坐标）
+            # 自动标定不需要网格图像，仅在调试时生成，避免多一次PNG编码
+            grid_path = None
+            if self.config.get("debug_save_intermediate", False):
+                logger.info("步骤3: 创建校准网格")
+                image_browser_window = self._to_image_box(browser_window, capture_window, img.size)
+                grid_path = self.create_calibration_grid(screenshot_path, image_browser_window, img)
+            else:
+                logger.info("步骤3: 跳过创建校准网格（未启用debug_save_intermediate）")
             
-            # 步骤4: 检测内容区域
+            # 步骤4: 检测内容区域（区域使用屏幕坐标）
             logger.info("步骤4: 检测内容区域")
-            regions = self.detect_content_regions(screenshot_path, browser_window)
+            regions = self.detect_content_regions(screenshot_path, browser_window, browser_info.get("url"))
+            image_regions = {
+                name: self._to_image_box(region, capture_window, img.size)
+                for name, region in regions.items()
+            }
             
             # 步骤5: 可视化检测到的区域
             logger.info("步骤5: 可视化检测到的区域")
-            marked_path = self.visualize_detected_regions(screenshot_path, regions)
+            marked_path = self.visualize_detected_regions(screenshot_path, image_regions, img)
             
-            # 步骤6: 提取区域内容
+            # 步骤6和步骤7相互独立：更新自动监控配置在后台进行，同时提取区域内容
             logger.info("步骤6: 提取区域内容")
-            region_images = self.extract_region_content(screenshot_path, regions)
-            
-            # 步骤7: 更新自动监控配置
             logger.info("步骤7: 更新自动监控配置")
-            self.update_auto_monitor_config(regions)
+            config_future = self._io_executor.submit(self.update_auto_monitor_config, regions)
+            region_images = self.extract_region_content(screenshot_path, image_regions, img)
+            config_future.result()
             
             # 复制最终结果到输出目录
-            final_screenshot_path = os.path.join(
-                self.config.get("log_dir", os.path.expanduser("~/mcp_logs")),
-                f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            )
-            final_grid_path = os.path.join(
-                self.config.get("log_dir", os.path.expanduser("~/mcp_logs")),
-                f"grid_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            )
-            final_marked_path = os.path.join(
-                self.config.get("log_dir", os.path.expanduser("~/mcp_logs")),
-                f"marked_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            )
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            final_screenshot_path = os.path.join(self.log_dir, f"screenshot_{timestamp}.png")
+            final_grid_path = os.path.join(self.log_dir, f"grid_{timestamp}.png") if grid_path else None
+            final_marked_path = os.path.join(self.log_dir, f"marked_{timestamp}.png")
             
-            # 复制文件
-            img = Image.open(screenshot_path)
-            img.save(final_screenshot_path)
-            
-            img = Image.open(grid_path)
-            img.save(final_grid_path)
-            
-            img = Image.open(marked_path)
-            img.save(final_marked_path)
+            # 复制文件（均已是PNG，直接复制字节，无需重新解码编码）
+            shutil.copyfile(screenshot_path, final_screenshot_path)
+            if grid_path:
+                shutil.copyfile(grid_path, final_grid_path)
+            shutil.copyfile(marked_path, final_marked_path)
             
             # 返回结果
             result = {
@@ -605,10 +893,13 @@ class WindowsVisualCalibrator(VisualCalibrator):
             active_window = gw.getActiveWindow()
             
             if active_window:
+                # 从窗口标题中提取URL，供后续步骤复用
+                title = active_window.title
                 browser_info = {
-                    "name": active_window.title,
+                    "name": title,
                     "path": "",
                     "id": "",
+                    "url": "https://manus.im/" if "manus.im" in title.lower() else None,
                     "position": {
                         "x": active_window.left,
                         "y": active_window.top
@@ -674,12 +965,13 @@ class WindowsVisualCalibrator(VisualCalibrator):
             logger.error(f"获取浏览器URL失败: {e}")
             return None
     
-    def detect_browser_window(self, screenshot_path: str) -> Optional[Tuple[int, int, int, int]]:
+    def detect_browser_window(self, screenshot_path: str, browser_info: Optional[Dict[str, Any]] = None) -> Optional[Tuple[int, int, int, int]]:
         """
         检测浏览器窗口位置
         
         Args:
             screenshot_path: 截图文件路径
+            browser_info: 已获取的浏览器信息，为None时自行查询
         
         Returns:
             Optional[Tuple[int, int, int, int]]: 浏览器窗口坐标 (x1, y1, x2, y2)，如果检测失败则返回None
@@ -697,8 +989,9 @@ class WindowsVisualCalibrator(VisualCalibrator):
                 logger.info(f"简化模式，使用全屏作为浏览器窗口: {browser_window}")
                 return browser_window
             
-            # 获取浏览器信息
-            browser_info = self.get_active_browser_info()
+            # 获取浏览器信息（调用方已获取时直接复用）
+            if browser_info is None:
+                browser_info = self.get_active_browser_info()
             
             # 提取窗口位置和大小
             x = browser_info["position"]["x"]
@@ -748,12 +1041,8 @@ class WindowsVisualCalibrator(VisualCalibrator):
             grid_path = self.create_calibration_grid(screenshot_path, browser_window)
             
             # 复制到输出目录
-            output_grid_path = os.path.join(
-                self.config.get("log_dir", os.path.expanduser("~/mcp_logs")),
-                f"grid_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            )
-            img = Image.open(grid_path)
-            img.save(output_grid_path)
+            output_grid_path = os.path.join(self.log_dir, f"grid_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
+            shutil.copyfile(grid_path, output_grid_path)
             
             # 提示用户查看网格图像
             print("\n" + "="*80)
@@ -853,6 +1142,45 @@ class WindowsVisualCalibrator(VisualCalibrator):
 class MacVisualCalibrator(VisualCalibrator):
     """Mac专用视觉校准器类"""
     
+    def __init__(self, config_file=None, output_dir=None, simple_mode=False, manual_regions=False):
+        """
+        初始化Mac视觉校准器
+        
+        Args:
+            config_file: 配置文件路径，可选
+            output_dir: 输出目录路径，可选，优先级高于配置文件
+            simple_mode: 是否使用简化模式，可选
+            manual_regions: 是否使用手动区域标定模式，可选
+        """
+        super().__init__(config_file, output_dir, simple_mode, manual_regions)
+        
+        # 前台浏览器信息缓存: (时间戳, pid, 浏览器信息)
+        self._browser_cache = None
+        
+        # 预编译的前台信息AppleScript路径，空字符串表示编译失败
+        self._frontmost_script_path = None
+        
+        # mss截图对象只创建一次，复用系统资源
+        self._sct = None
+        if mss is not None and self.config.get("use_mss", True):
+            try:
+                self._sct = mss.mss()
+            except Exception as e:
+                logger.warning(f"初始化mss失败，将使用screencapture命令: {e}")
+    
+    def close(self) -> None:
+        """
+        关闭线程池并释放mss截图对象
+        """
+        sct = getattr(self, "_sct", None)
+        if sct is not None:
+            try:
+                sct.close()
+            except Exception as e:
+                logger.debug(f"关闭mss失败: {e}")
+            self._sct = None
+        super().close()
+    
     def capture_screenshot(self) -> Optional[str]:
         """
         使用Mac原生screencapture命令捕获屏幕
@@ -864,9 +1192,17 @@ class MacVisualCalibrator(VisualCalibrator):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             screenshot_path = os.path.join(self.temp_dir, f"calibration_screenshot_{timestamp}.png")
             
+            if self._sct is not None:
+                # 使用mss在进程内截图，保存的同时保留内存图像供后续步骤复用
+                img = self._grab_with_mss()
+                img.save(screenshot_path, **PNG_SAVE_OPTIONS)
+                self._last_capture = (screenshot_path, img)
+                
+                logger.info(f"全屏截图已保存: {screenshot_path}")
+                return screenshot_path
+            
             # 使用Mac原生screencapture命令
-            cmd = f"""screencapture -x "{screenshot_path}" """
-            subprocess.run(cmd, shell=True, check=True)
+            subprocess.run(["screencapture", "-x", "-t", "png", screenshot_path], check=True)
             
             logger.info(f"全屏截图已保存: {screenshot_path}")
             return screenshot_path
@@ -875,6 +1211,219 @@ class MacVisualCalibrator(VisualCalibrator):
             logger.error(f"捕获全屏截图失败: {e}")
             return None
     
+    def _grab_with_mss(self) -> Image.Image:
+        """
+        使用mss抓取整个虚拟屏幕
+        
+        Returns:
+            Image.Image: RGB截图图像
+        """
+        raw = self._sct.grab(self._sct.monitors[0])
+        # 直接以BGRX原始模式解码BGRA缓冲区，避免逐像素转换
+        return Image.frombytes("RGB", raw.size, raw.bgra, "raw", "BGRX")
+    
+    def capture_window(self, window: Tuple[int, int, int, int]) -> Optional[str]:
+        """
+        使用screencapture -R只捕获浏览器窗口区域
+        
+        Args:
+            window: 屏幕区域坐标 (x1, y1, x2, y2)
+        
+        Returns:
+            Optional[str]: 截图文件路径，如果失败则返回None
+        """
+        try:
+            x1, y1, x2, y2 = window
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            screenshot_path = os.path.join(self.temp_dir, f"calibration_window_{timestamp}.png")
+            
+            subprocess.run(
+                ["screencapture", "-x", "-R", f"{x1},{y1},{x2 - x1},{y2 - y1}", "-t", "png", screenshot_path],
+                check=True
+            )
+            
+            logger.info(f"窗口截图已保存: {screenshot_path}")
+            return screenshot_path
+        
+        except Exception as e:
+            logger.error(f"捕获窗口截图失败: {e}")
+            return None
+    
+    def get_known_browser_window(self, refresh: bool = True) -> Optional[Tuple[int, int, int, int]]:
+        """
+        通过AppleScript查询（结果缓存，后续步骤复用）获取前台浏览器窗口坐标
+        
+        Args:
+            refresh: 为False时只使用上次查询的结果（即使已过期），不执行AppleScript
+        
+        Returns:
+            Optional[Tuple[int, int, int, int]]: 浏览器窗口坐标 (x1, y1, x2, y2)，未知时返回None
+        """
+        if self.simple_mode:
+            return None
+        
+        if not refresh:
+            if self._browser_cache is None:
+                return None
+            browser_info = self._browser_cache[2]
+        else:
+            try:
+                browser_info = self._query_frontmost()
+            except Exception as e:
+                logger.debug(f"查询浏览器窗口失败: {e}")
+                return None
+        
+        width = browser_info["size"]["width"]
+        height = browser_info["size"]["height"]
+        if width <= 0 or height <= 0:
+            return None
+        
+        x = browser_info["position"]["x"]
+        y = browser_info["position"]["y"]
+        return (x, y, x + width, y + height)
+    
+    def _build_frontmost_script(self) -> str:
+        """
+        构建一次性获取前台应用信息、窗口位置大小及浏览器URL的AppleScript
+        
+        Returns:
+            str: AppleScript脚本
+        """
+        url_branches = []
+        for keyword, url_script in MAC_BROWSER_URL_SCRIPTS.items():
+            escaped = url_script.replace('"', '\\"')
+            url_branches.append(
+                f'if frontApp contains "{keyword}" then set theURL to run script "{escaped}"'
+            )
+        url_lookup = "\n                ".join(url_branches)
+        
+        return f"""
+            tell application "System Events"
+                set frontProcess to first application process whose frontmost is true
+                set frontApp to name of frontProcess
+                set frontPid to unix id of frontProcess
+                
+                set frontAppPath to ""
+                set frontAppId to ""
+                try
+                    set frontAppPath to (path of frontProcess) as text
+                    set frontAppId to (bundle identifier of frontProcess) as text
+                end try
+                
+                set windowX to ""
+                set windowY to ""
+                set windowWidth to ""
+                set windowHeight to ""
+                
+                try
+                    tell frontProcess
+                        set appWindow to first window
+                        set {{windowX, windowY}} to position of appWindow
+                        set {{windowWidth, windowHeight}} to size of appWindow
+                    end tell
+                end try
+            end tell
+            
+            set theURL to ""
+            try
+                {url_lookup}
+            end try
+            
+            set sep to character id 31
+            return frontApp & sep & frontAppPath & sep & frontAppId & sep & frontPid & sep & theURL & sep & windowX & sep & windowY & sep & windowWidth & sep & windowHeight
+            """
+    
+    def _get_frontmost_script_path(self) -> Optional[str]:
+        """
+        获取预编译的前台信息AppleScript(.scpt)路径，避免osascript每次调用都重新编译源码
+        
+        编译结果按脚本内容哈希缓存在系统临时目录中，可跨进程复用。
+        
+        Returns:
+            Optional[str]: 编译后的脚本路径，如果编译失败则返回None
+        """
+        if self._frontmost_script_path is None:
+            source = self._build_frontmost_script()
+            digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+            script_path = os.path.join(tempfile.gettempdir(), f"mcp_frontmost_{digest}.scpt")
+            
+            if not os.path.exists(script_path):
+                tmp_path = os.path.join(tempfile.gettempdir(), f"mcp_frontmost_{digest}.{os.getpid()}.scpt")
+                try:
+                    subprocess.run(["osacompile", "-o", tmp_path, "-e", source], capture_output=True, check=True)
+                    os.replace(tmp_path, script_path)
+                    logger.info(f"已编译前台信息AppleScript: {script_path}")
+                except Exception as e:
+                    logger.warning(f"编译AppleScript失败，将使用源码执行: {e}")
+                    script_path = ""
+            
+            self._frontmost_script_path = script_path
+        
+        return self._frontmost_script_path or None
+    
+    def _query_frontmost(self) -> Dict[str, Any]:
+        """
+        通过单次AppleScript调用获取前台浏览器信息（包括URL），结果在短时间内缓存
+        
+        Returns:
+            Dict[str, Any]: 浏览器信息，包括名称、窗口位置、pid和URL等
+        """
+        ttl = self.config.get("browser_info_cache_ttl", 2.0)
+        if self._browser_cache is not None:
+            cached_at, _pid, cached_info = self._browser_cache
+            if time.monotonic() - cached_at <= ttl:
+                return cached_info
+        
+        # 执行AppleScript，优先使用预编译脚本；编译失败时通过标准输入传递源码
+        script_path = self._get_frontmost_script_path()
+        if script_path:
+            result = subprocess.run(["osascript", script_path], capture_output=True, text=True, check=True)
+        else:
+            result = subprocess.run(["osascript", "-"], input=self._build_frontmost_script(),
+                                    capture_output=True, text=True, check=True)
+        
+        # 解析结果（按固定分隔符拆分，字段位置固定；不能用strip，分隔符属于空白字符）
+        output = result.stdout.rstrip("\r\n")
+        parts = output.split(MAC_APPLESCRIPT_FIELD_SEPARATOR)
+        parts += [""] * (9 - len(parts))
+        
+        def to_int(value: str) -> int:
+            # 多显示器下窗口坐标可能为负数
+            return int(value) if value.lstrip("-").isdigit() else 0
+        
+        # 提取浏览器信息
+        browser_info = {
+            "name": parts[0] or "Unknown",
+            "path": parts[1],
+            "id": parts[2],
+            "pid": to_int(parts[3]),
+            "url": parts[4],
+            "position": {
+                "x": to_int(parts[5]),
+                "y": to_int(parts[6])
+            },
+            "size": {
+                "width": to_int(parts[7]),
+                "height": to_int(parts[8])
+            }
+        }
+        
+        self._browser_cache = (time.monotonic(), browser_info["pid"], browser_info)
+        return browser_info
+    
+    def _prefetch_browser_info(self) -> None:
+        """
+        在截图的同时执行AppleScript查询，预热浏览器信息缓存
+        """
+        if self.simple_mode:
+            return
+        
+        try:
+            self._query_frontmost()
+        except Exception as e:
+            # 失败时由后续的get_active_browser_info重新查询并记录错误
+            logger.debug(f"预取浏览器信息失败: {e}")
+    
     def get_active_browser_info(self) -> Dict[str, Any]:
         """
         获取活动浏览器信息
@@ -894,50 +1443,7 @@ class MacVisualCalibrator(VisualCalibrator):
             }
         
         try:
-            # 使用AppleScript获取前台应用信息
-            script = """
-            tell application "System Events"
-                set frontApp to name of first application process whose frontmost is true
-                set frontAppPath to path of first application process whose frontmost is true
-                set frontAppId to bundle identifier of first application process whose frontmost is true
-                
-                set windowPosition to {}
-                set windowSize to {}
-                
-                try
-                    tell process frontApp
-                        set appWindow to first window
-                        set windowPosition to position of appWindow
-                        set windowSize to size of appWindow
-                    end tell
-                end try
-                
-                return {frontApp, frontAppPath, frontAppId, windowPosition, windowSize}
-            end tell
-            """
-            
-            # 执行AppleScript
-            cmd = ["osascript", "-e", script]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            # 解析结果
-            output = result.stdout.strip()
-            parts = output.split(", ")
-            
-            # 提取浏览器信息
-            browser_info = {
-                "name": parts[0] if len(parts) > 0 else "Unknown",
-                "path": parts[1] if len(parts) > 1 else "",
-                "id": parts[2] if len(parts) > 2 else "",
-                "position": {
-                    "x": int(parts[3]) if len(parts) > 3 and parts[3].isdigit() else 0,
-                    "y": int(parts[4]) if len(parts) > 4 and parts[4].isdigit() else 0
-                },
-                "size": {
-                    "width": int(parts[5]) if len(parts) > 5 and parts[5].isdigit() else 0,
-                    "height": int(parts[6]) if len(parts) > 6 and parts[6].isdigit() else 0
-                }
-            }
+            browser_info = self._query_frontmost()
             
             logger.info(f"获取到活动浏览器信息: {browser_info}")
             return browser_info
@@ -965,55 +1471,33 @@ class MacVisualCalibrator(VisualCalibrator):
             return "https://manus.im/"
         
         try:
-            # 获取浏览器信息
-            browser_info = self.get_active_browser_info()
+            # 获取浏览器信息（与窗口信息共用一次AppleScript调用）
+            browser_info = self._query_frontmost()
             browser_name = browser_info["name"].lower()
             
-            # 根据不同浏览器使用不同的AppleScript
-            if "safari" in browser_name:
-                script = """
-                tell application "Safari"
-                    return URL of current tab of front window
-                end tell
-                """
-            elif "chrome" in browser_name:
-                script = """
-                tell application "Google Chrome"
-                    return URL of active tab of front window
-                end tell
-                """
-            elif "firefox" in browser_name:
-                script = """
-                tell application "Firefox"
-                    return URL of active tab of front window
-                end tell
-                """
-            else:
+            if not any(keyword.lower() in browser_name for keyword in MAC_BROWSER_URL_SCRIPTS):
                 logger.warning(f"不支持的浏览器: {browser_name}")
                 return None
             
-            # 执行AppleScript
-            cmd = ["osascript", "-e", script]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                url = result.stdout.strip()
+            url = browser_info.get("url")
+            if url:
                 logger.info(f"获取到浏览器URL: {url}")
                 return url
             else:
-                logger.error(f"获取浏览器URL失败: {result.stderr}")
+                logger.error("获取浏览器URL失败: AppleScript未返回URL")
                 return None
         
         except Exception as e:
             logger.error(f"获取浏览器URL失败: {e}")
             return None
     
-    def detect_browser_window(self, screenshot_path: str) -> Optional[Tuple[int, int, int, int]]:
+    def detect_browser_window(self, screenshot_path: str, browser_info: Optional[Dict[str, Any]] = None) -> Optional[Tuple[int, int, int, int]]:
         """
         检测浏览器窗口位置
         
         Args:
             screenshot_path: 截图文件路径
+            browser_info: 已获取的浏览器信息，为None时自行查询
         
         Returns:
             Optional[Tuple[int, int, int, int]]: 浏览器窗口坐标 (x1, y1, x2, y2)，如果检测失败则返回None
@@ -1031,8 +1515,9 @@ class MacVisualCalibrator(VisualCalibrator):
                 logger.info(f"简化模式，使用全屏作为浏览器窗口: {browser_window}")
                 return browser_window
             
-            # 获取浏览器信息
-            browser_info = self.get_active_browser_info()
+            # 获取浏览器信息（调用方已获取时直接复用）
+            if browser_info is None:
+                browser_info = self.get_active_browser_info()
             
             # 提取窗口位置和大小
             x = browser_info["position"]["x"]
@@ -1082,12 +1567,8 @@ class MacVisualCalibrator(VisualCalibrator):
             grid_path = self.create_calibration_grid(screenshot_path, browser_window)
             
             # 复制到输出目录
-            output_grid_path = os.path.join(
-                self.config.get("log_dir", os.path.expanduser("~/mcp_logs")),
-                f"grid_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            )
-            img = Image.open(grid_path)
-            img.save(output_grid_path)
+            output_grid_path = os.path.join(self.log_dir, f"grid_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
+            shutil.copyfile(grid_path, output_grid_path)
             
             # 提示用户查看网格图像
             print("\n" + "="*80)
@@ -1217,16 +1698,15 @@ def main():
     parser.add_argument('--manual_regions', action='store_true', help='使用手动区域标定模式')
     args = parser.parse_args()
     
-    # 创建校准器
-    calibrator = get_calibrator(args.config, args.output_dir, args.simple_mode, args.manual_regions)
-    
-    # 运行校准
-    result = calibrator.run_calibration()
+    # 创建校准器并运行校准
+    with get_calibrator(args.config, args.output_dir, args.simple_mode, args.manual_regions) as calibrator:
+        result = calibrator.run_calibration()
     
     # 输出结果
     if result["success"]:
         print("\n校准成功!")
-        print(f"校准网格: {result['grid_path']}")
+        if result["grid_path"]:
+            print(f"校准网格: {result['grid_path']}")
         print(f"检测区域: {result['marked_path']}")
         print("区域图像:")
         for name, path in result["region_images"].items():
@@ -15,11 +15,16 @@ import os
 import sys
 import time
 import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
 
 # 添加父目录到系统路径，以便导入mcp_tool包
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from mcp_tool.thought_action_recorder import ThoughtActionRecorder
+from mcp_tool import test_issue_collector
 from mcp_tool.test_issue_collector import TestAndIssueCollector
 
 def test_collector():
@@ -129,5 +134,175 @@ Instructions for usage...
     print("\n测试完成!")
     return collector
 
+class TestCollectIssues(unittest.TestCase):
+    """测试问题收集与README更新"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.repo_dir = tempfile.mkdtemp()
+        self.collector = TestAndIssueCollector(repo_path=self.repo_dir)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.repo_dir, ignore_errors=True)
+
+    def _write_log(self, name, content):
+        """在日志目录中写入测试日志"""
+        os.makedirs(self.collector.logs_dir, exist_ok=True)
+        with open(os.path.join(self.collector.logs_dir, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_construction_is_lazy(self):
+        """测试初始化时不创建记录器和输出目录，生成报告时才创建输出目录"""
+        self.assertEqual(os.listdir(self.repo_dir), [])
+
+        recorder = MagicMock()
+        collector = TestAndIssueCollector(repo_path=self.repo_dir, recorder=recorder)
+        result = collector.generate_test_report({"success": True, "stdout": "ok"}, [])
+
+        self.assertTrue(result["success"])
+        self.assertEqual(os.listdir(self.repo_dir), ["output"])
+        self.assertIs(collector.recorder, recorder)
+
+    def test_run_tests_writes_log_once(self):
+        """测试运行测试脚本时标准输出和标准错误都写入同一个测试日志"""
+        with open(os.path.join(self.repo_dir, "start_and_test.sh"), "w") as f:
+            f.write("#!/bin/bash\necho one\necho two\necho oops >&2\n")
+
+        result = self.collector.run_tests()
+
+        self.assertTrue(result["success"])
+        self.assertTrue(os.path.isdir(self.collector.screenshots_dir))
+        with open(result["log_file"], encoding="utf-8") as f:
+            self.assertEqual(f.read(), "[OUT] one\n[OUT] two\n[ERR] oops\n")
+
+    def test_update_readme_keeps_following_sections(self):
+        """测试替换中间的问题部分时保留后续章节，上下文中的反斜杠原样写入"""
+        with open(self.collector.readme_path, "w", encoding="utf-8") as f:
+            f.write("# Demo\n\n## 测试发现的问题\n\n旧问题\n\n## 使用\n\nrun\n")
+        issue = {"type": "error", "file": "run.log", "context": "C:\\tmp\\d.log"}
+
+        self.assertTrue(self.collector.update_readme([issue])["success"])
+
+        with open(self.collector.readme_path, encoding="utf-8") as f:
+            content = f.read()
+        self.assertNotIn("旧问题", content)
+        self.assertIn("C:\\tmp\\d.log", content)
+        self.assertTrue(content.startswith("# Demo\n\n## 测试发现的问题\n\n测试发现以下问题"))
+        self.assertTrue(content.endswith("*\n## 使用\n\nrun\n"))
+        self.assertFalse(os.path.exists(self.collector.readme_path + ".tmp"))
+
+    def test_update_readme_interrupted_write_keeps_readme(self):
+        """测试写入README中途失败时原README保持不变"""
+        original = "# Demo\n\n## 测试发现的问题\n\n旧问题\n"
+        with open(self.collector.readme_path, "w", encoding="utf-8") as f:
+            f.write(original)
+
+        with patch("mcp_tool.test_issue_collector.os.fsync", side_effect=OSError("disk full")):
+            result = self.collector.update_readme([])
+
+        self.assertFalse(result["success"])
+        with open(self.collector.readme_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), original)
+        self.assertFalse(os.path.exists(self.collector.readme_path + ".tmp"))
+
+    def test_update_readme_without_issues_leaves_readme_untouched(self):
+        """测试没有问题且README没有问题部分时不写README"""
+        with open(self.collector.readme_path, "w", encoding="utf-8") as f:
+            f.write("# Demo\n")
+
+        with patch.object(self.collector, "_write_readme") as mock_write:
+            result = self.collector.update_readme([])
+
+        self.assertTrue(result["success"])
+        self.assertTrue(result["skipped"])
+        mock_write.assert_not_called()
+        with open(self.collector.readme_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "# Demo\n")
+
+    def test_update_readme_unchanged_skips_write(self):
+        """测试问题部分只有测试时间不同时不重写文件"""
+        original = "# Demo\n\n## 测试发现的问题\n\n测试未发现任何问题，所有功能正常工作。\n\n*测试时间: 2000-01-01 00:00:00*\n"
+        with open(self.collector.readme_path, "w", encoding="utf-8") as f:
+            f.write(original)
+
+        with patch.object(self.collector, "_write_readme") as mock_write:
+            self.assertTrue(self.collector.update_readme([])["success"])
+
+        mock_write.assert_not_called()
+        with open(self.collector.readme_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), original)
+
+        # 问题有变化时仍然重写文件
+        self.assertTrue(self.collector.update_readme([{"type": "error", "file": "a.log", "context": "boom"}])["success"])
+        with open(self.collector.readme_path, encoding="utf-8") as f:
+            updated = f.read()
+        self.assertIn("**ERROR**: a.log", updated)
+        self.assertNotIn("2000-01-01", updated)
+
+    def test_collect_issues_single_pass(self):
+        """测试一次扫描即可按错误在前、警告在后的顺序收集问题"""
+        content = "WARNING: disk low\n" + "x" * 300 + "\nERROR: boom\nTraceback here\n"
+        self._write_log("run.log", content)
+
+        issues = self.collector.collect_issues()
+        log_issues = [issue for issue in issues if issue["file"] == "run.log"]
+
+        self.assertEqual([issue["type"] for issue in log_issues], ["error", "error", "warning"])
+        self.assertLess(log_issues[0]["position"], log_issues[1]["position"])
+        self.assertEqual(log_issues[2]["position"], 0)
+        self.assertEqual(log_issues[2]["context"], content[:len("WARNING") + 150])
+        self.assertEqual(issues[-1]["file"], "PPT Generation")
+
+    def test_collect_issues_mapped_logs(self):
+        """测试空日志被跳过，非ASCII上下文和位置按字符计算"""
+        self._write_log("empty.log", "")
+        content = "测" * 300 + "ERROR: 生成失败" + "败" * 300 + "\nwarning 结束\n"
+        self._write_log("zh.log", content)
+
+        issues = self.collector.collect_issues()
+        files = [issue["file"] for issue in issues]
+
+        self.assertNotIn("empty.log", files)
+        zh_issues = [issue for issue in issues if issue["file"] == "zh.log"]
+        self.assertEqual([issue["type"] for issue in zh_issues], ["error", "warning"])
+
+        # 与按字符切片的结果一致
+        error_pos = content.index("ERROR")
+        self.assertEqual(zh_issues[0]["position"], error_pos)
+        self.assertEqual(zh_issues[0]["context"], content[error_pos - 200:error_pos + len("ERROR") + 200])
+
+        warning_pos = content.index("warning")
+        self.assertEqual(zh_issues[1]["position"], warning_pos)
+        self.assertEqual(zh_issues[1]["context"], content[warning_pos - 150:])
+
+    def test_collect_issues_parallel_matches_serial(self):
+        """测试多进程并行扫描与串行扫描结果一致且保持文件顺序"""
+        for i in range(3):
+            self._write_log(f"run_{i}.log", f"WARNING: slow {i}\nERROR: failed {i}\n")
+
+        serial = self.collector.collect_issues()
+        with patch.object(test_issue_collector, "PARALLEL_SCAN_MIN_BYTES", 0):
+            parallel = self.collector.collect_issues()
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(len(serial), 3 * 3 + 1)
+
+    def test_update_readme_replaces_section(self):
+        """测试再次更新README时替换已有的问题部分而不是重复追加"""
+        with open(self.collector.readme_path, "w", encoding="utf-8") as f:
+            f.write("# Demo\n\n## 安装\n\npip install demo\n")
+        issue = {"type": "error", "file": "run.log", "context": "ERROR: boom"}
+
+        self.assertTrue(self.collector.update_readme([issue])["success"])
+        self.assertTrue(self.collector.update_readme([issue, dict(issue, type="warning")])["success"])
+
+        with open(self.collector.readme_path, encoding="utf-8") as f:
+            content = f.read()
+        self.assertEqual(content.count("## 测试发现的问题"), 1)
+        self.assertIn("1. **ERROR**: run.log\n", content)
+        self.assertIn("2. **WARNING**: run.log\n", content)
+        self.assertTrue(content.startswith("# Demo\n\n## 安装\n\npip install demo\n"))
+
 if __name__ == "__main__":
     collector = test_collector()
@@ -0,0 +1,138 @@
+"""
+Mac视觉校准工具测试模块
+
+该模块用于测试Mac视觉校准工具的网格坐标解析、校准缓存和配置保存功能。
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import unittest
+import tempfile
+from unittest.mock import patch, MagicMock
+from PIL import Image
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# 导入被测试模块
+from mcp_tool.mac_visual_calibrator import (
+    MacVisualCalibrator,
+    MAX_CALIBRATION_CACHE_ENTRIES,
+    grid_coords
+)
+
+
+class TestGridCoords(unittest.TestCase):
+    """测试网格坐标参数解析"""
+
+    def test_valid_coords(self):
+        """测试合法的网格坐标"""
+        self.assertEqual(grid_coords("0,1,5,10"), (0, 1, 5, 10))
+
+    def test_invalid_coords(self):
+        """测试非法的网格坐标"""
+        for value in ("a,b,c,d", "1,2,3", "1,2,3,4,5", "0,0,11,5", "5,0,5,5", "0,6,5,2", "-1,0,5,5"):
+            with self.subTest(value=value):
+                with self.assertRaises(argparse.ArgumentTypeError):
+                    grid_coords(value)
+
+
+class TestMacVisualCalibrator(unittest.TestCase):
+    """测试Mac视觉校准器"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp(prefix="test_mac_visual_calibration_")
+        self.screenshot_path = os.path.join(self.temp_dir, "screenshot.png")
+        Image.new("RGB", (200, 100)).save(self.screenshot_path)
+
+        self.config_manager = MagicMock()
+        self.config_manager.get_all.return_value = {
+            "log_dir": os.path.join(self.temp_dir, "logs"),
+            "calibration_grid_size": 10
+        }
+        self.config_manager.save.return_value = True
+
+        with patch("mcp_tool.mac_visual_calibrator.get_config", return_value=self.config_manager):
+            self.calibrator = MacVisualCalibrator()
+
+    def tearDown(self):
+        """测试后清理"""
+        self.calibrator.close()
+        shutil.rmtree(self.calibrator.temp_dir, ignore_errors=True)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _select_regions(self, url):
+        """通过模拟的用户输入执行一次手动区域选择"""
+        with patch.object(self.calibrator, "create_calibration_grid", return_value="grid.png"), \
+             patch("builtins.input", side_effect=["0", "0", "5", "10", "5", "0", "10", "10"]) as mock_input, \
+             patch("builtins.print"):
+            regions = self.calibrator._manual_region_selection(self.screenshot_path, (0, 0, 100, 50), url)
+        return regions, mock_input
+
+    def test_manual_region_selection_cache(self):
+        """测试校准缓存未命中时提示输入，命中时直接复用"""
+        regions, mock_input = self._select_regions("https://manus.im/app/1?tab=a")
+        self.assertEqual(mock_input.call_count, 8)
+        self.assertEqual(regions, {"work_list": (0, 0, 50, 50), "action_list": (50, 0, 100, 50)})
+        self.assertEqual(len(self.calibrator.config["calibration_cache"]), 1)
+
+        # 同一站点的其他页面命中缓存
+        cached, mock_input = self._select_regions("https://manus.im/app/2")
+        mock_input.assert_not_called()
+        self.assertEqual(cached, regions)
+
+        # 不同站点未命中缓存
+        _, mock_input = self._select_regions("https://example.com/app/1")
+        self.assertEqual(mock_input.call_count, 8)
+        self.assertEqual(len(self.calibrator.config["calibration_cache"]), 2)
+
+    def test_manual_region_selection_cache_limit(self):
+        """测试校准缓存超出上限时淘汰最早的条目"""
+        for i in range(MAX_CALIBRATION_CACHE_ENTRIES + 1):
+            self._select_regions(f"https://site{i}.example.com/")
+
+        cache = self.calibrator.config["calibration_cache"]
+        self.assertEqual(len(cache), MAX_CALIBRATION_CACHE_ENTRIES)
+
+        screen_size = (200, 100)
+        oldest_key = self.calibrator._calibration_cache_key((0, 0, 100, 50), screen_size, "https://site0.example.com/")
+        newest_key = self.calibrator._calibration_cache_key(
+            (0, 0, 100, 50), screen_size, f"https://site{MAX_CALIBRATION_CACHE_ENTRIES}.example.com/"
+        )
+        self.assertNotIn(oldest_key, cache)
+        self.assertIn(newest_key, cache)
+
+    def test_manual_region_selection_grid_regions(self):
+        """测试提供网格坐标时不提示输入"""
+        self.calibrator.grid_regions = {"work_list": (0, 0, 5, 10), "action_list": (5, 0, 10, 10)}
+        with patch.object(self.calibrator, "create_calibration_grid") as mock_grid, \
+             patch("builtins.input") as mock_input:
+            regions = self.calibrator._manual_region_selection(self.screenshot_path, (0, 0, 100, 50))
+
+        mock_grid.assert_not_called()
+        mock_input.assert_not_called()
+        self.assertEqual(regions["action_list"], (50, 0, 100, 50))
+
+    def test_save_config_with_updates(self):
+        """测试保存配置前合并更新项"""
+        self.assertTrue(self.calibrator._save_config({"calibration_grid_size": 8}))
+        self.config_manager.update.assert_called_once_with({"calibration_grid_size": 8})
+        self.config_manager.save.assert_called_once()
+
+    def test_save_config_without_updates(self):
+        """测试无更新项时只保存配置"""
+        self.assertTrue(self.calibrator._save_config())
+        self.config_manager.update.assert_not_called()
+        self.config_manager.save.assert_called_once()
+
+    def test_save_config_failure(self):
+        """测试保存配置失败时返回False"""
+        self.config_manager.save.side_effect = IOError("disk full")
+        self.assertFalse(self.calibrator._save_config({"calibration_grid_size": 8}))
+
+
+if __name__ == '__main__':
+    unittest.main()
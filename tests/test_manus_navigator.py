@@ -0,0 +1,264 @@
+"""
+Manus导航器测试
+
+该测试文件用于测试ManusNavigator模块的功能，
+包括页面状态检查和视觉特征识别等功能。
+
+作者: Manus AI
+日期: 2025-05-28
+"""
+
+import os
+import sys
+import unittest
+import tempfile
+import shutil
+import time
+import asyncio
+import concurrent.futures
+from unittest.mock import AsyncMock, MagicMock, patch
+from PIL import Image, ImageDraw
+
+# 导入被测模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mcp_tool.manus_navigator import ManusNavigator
+
+class TestManusNavigator(unittest.TestCase):
+    """测试ManusNavigator类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.test_dir = tempfile.mkdtemp()
+
+        # 创建参考图像：左暗右亮的渐变加一个方块
+        self.reference = Image.new("RGB", (320, 240), "white")
+        draw = ImageDraw.Draw(self.reference)
+        for x in range(320):
+            draw.line([(x, 0), (x, 239)], fill=(x * 255 // 319,) * 3)
+        draw.rectangle([40, 60, 120, 180], fill="black")
+        self.reference_path = os.path.join(self.test_dir, "reference.png")
+        self.reference.save(self.reference_path)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_dhash_resize_invariant(self):
+        """测试dHash对缩放不敏感，对不同图像区分明显"""
+        ref_hash = ManusNavigator._dhash(self.reference)
+        resized_hash = ManusNavigator._dhash(self.reference.resize((640, 480)))
+        flipped_hash = ManusNavigator._dhash(self.reference.transpose(Image.FLIP_LEFT_RIGHT))
+
+        self.assertLessEqual(bin(ref_hash ^ resized_hash).count("1"), 6)
+        self.assertGreater(bin(ref_hash ^ flipped_hash).count("1"), 6)
+
+    def test_hamming_distances(self):
+        """测试汉明距离计算（含旧版NumPy回退路径）"""
+        import numpy as np
+        from mcp_tool import manus_navigator
+
+        refs = np.array([0, 0xFFFFFFFFFFFFFFFF, 0x0F0F0000000000F0], dtype=np.uint64)
+        h = 0x0F00000000000001
+        expected = [bin(int(ref) ^ h).count("1") for ref in refs]
+
+        self.assertEqual(list(ManusNavigator._hamming_distances(refs, h)), expected)
+        with patch.object(manus_navigator, "HAS_BITWISE_COUNT", False):
+            self.assertEqual(list(ManusNavigator._hamming_distances(refs, h)), expected)
+
+    def test_check_visual_features(self):
+        """测试通过参考图像指纹识别Manus界面"""
+        navigator = ManusNavigator(auto_navigate=False, reference_image=self.reference_path)
+        self.assertIsNotNone(navigator.manus_features["logo_dhash"])
+
+        async def screenshot_same():
+            return self.reference.resize((800, 600))
+
+        async def screenshot_other():
+            return self.reference.transpose(Image.FLIP_LEFT_RIGHT)
+
+        try:
+            with patch.object(navigator, "_take_screenshot", side_effect=screenshot_same):
+                self.assertTrue(navigator._run(navigator._check_visual_features()))
+            with patch.object(navigator, "_take_screenshot", side_effect=screenshot_other):
+                self.assertFalse(navigator._run(navigator._check_visual_features()))
+        finally:
+            navigator.close()
+
+    def test_check_visual_features_multiple_references(self):
+        """测试多张参考图像时任意一张匹配即可"""
+        other_path = os.path.join(self.test_dir, "other.png")
+        self.reference.transpose(Image.FLIP_TOP_BOTTOM).rotate(90).save(other_path)
+        navigator = ManusNavigator(auto_navigate=False, reference_image=[other_path, self.reference_path])
+        self.assertEqual(len(navigator.manus_features["logo_dhash"]), 2)
+
+        async def screenshot_same():
+            return self.reference
+
+        try:
+            with patch.object(navigator, "_take_screenshot", side_effect=screenshot_same):
+                self.assertTrue(navigator._run(navigator._check_visual_features()))
+        finally:
+            navigator.close()
+
+    def test_interface_check_without_page_skips_visual(self):
+        """测试没有Playwright页面时不做视觉识别"""
+        navigator = ManusNavigator(auto_navigate=False, reference_image=self.reference_path)
+
+        try:
+            with patch.object(navigator, "_check_visual_features") as mock_visual:
+                self.assertFalse(navigator.is_manus_interface_open())
+            mock_visual.assert_not_called()
+        finally:
+            navigator.close()
+
+    def test_interface_check_short_circuits_on_title(self):
+        """测试标题命中时不再截图"""
+        navigator = ManusNavigator(auto_navigate=False, reference_image=self.reference_path)
+        navigator.page = AsyncMock()
+        navigator.page.is_closed = MagicMock(return_value=False)
+        navigator.page.evaluate.return_value = {"title": "Manus", "url": "about:blank"}
+
+        try:
+            self.assertTrue(navigator.is_manus_interface_open())
+            navigator.page.evaluate.assert_awaited_once()
+            navigator.page.screenshot.assert_not_called()
+        finally:
+            navigator.page = None
+            navigator.close()
+
+    def test_check_login_required_single_query(self):
+        """测试登录检测只发起一次选择器查询"""
+        from mcp_tool.manus_navigator import LOGIN_SELECTOR
+
+        navigator = ManusNavigator(auto_navigate=False)
+        navigator.page = MagicMock()
+        navigator.page.locator.return_value.count = AsyncMock(return_value=2)
+
+        try:
+            self.assertTrue(navigator._run(navigator._check_login_required()))
+            navigator.page.locator.assert_called_once_with(LOGIN_SELECTOR)
+
+            # 与原逻辑一致：只要存在登录元素（不论是否可见）即需要登录
+            navigator.page.locator.return_value.count = AsyncMock(return_value=0)
+            self.assertFalse(navigator._run(navigator._check_login_required()))
+        finally:
+            navigator.page = None
+            navigator.close()
+
+    def test_navigate_reuses_connected_browser(self):
+        """测试浏览器仍连接时导航复用已有页面而不重新启动浏览器"""
+        navigator = ManusNavigator(auto_navigate=False)
+        navigator._playwright = MagicMock()
+        navigator._playwright.chromium.launch = AsyncMock()
+        navigator.browser = MagicMock()
+        navigator.browser.is_connected.return_value = True
+        navigator.page = AsyncMock()
+        navigator.page.is_closed = MagicMock(return_value=False)
+
+        try:
+            with patch.object(navigator, "_check_login_required", AsyncMock(return_value=False)):
+                self.assertTrue(navigator.navigate_to_manus())
+            navigator.page.goto.assert_awaited_once_with(navigator.manus_url)
+            navigator._playwright.chromium.launch.assert_not_called()
+        finally:
+            navigator.browser = None
+            navigator._playwright = None
+            navigator.close()
+
+    def test_saved_screenshots_are_capped(self):
+        """测试调试截图只保留最近的若干张，关闭时删除临时目录"""
+        navigator = ManusNavigator(auto_navigate=False, save_screenshots=True, max_saved_screenshots=3)
+        screenshot_dir = navigator.screenshot_dir
+
+        for _ in range(5):
+            navigator._save_screenshot(b"jpeg")
+            time.sleep(0.002)
+
+        self.assertEqual(len(os.listdir(screenshot_dir)), 3)
+
+        navigator.close()
+        self.assertFalse(os.path.exists(screenshot_dir))
+
+    def test_close_with_stuck_loop_thread(self):
+        """测试事件循环线程未能停止时关闭不抛异常，仍删除临时目录"""
+        navigator = ManusNavigator(auto_navigate=False, save_screenshots=True)
+        screenshot_dir = navigator.screenshot_dir
+        loop = MagicMock()
+        loop.is_closed.return_value = False
+        navigator._loop = loop
+        navigator._loop_thread = MagicMock()
+        navigator._loop_thread.is_alive.return_value = True
+
+        with patch.object(navigator, "_run", side_effect=lambda coro: coro.close()):
+            navigator.close()
+
+        loop.close.assert_not_called()
+        self.assertIsNone(navigator._loop)
+        self.assertFalse(os.path.exists(screenshot_dir))
+
+    def test_monitor_backoff(self):
+        """测试导航失败时指数退避，成功后重置"""
+        navigator = ManusNavigator(check_interval=10.0)
+        results = [False, False, False, True]
+        delays = []
+
+        async def navigate():
+            return results.pop(0)
+
+        async def interface_closed():
+            return False
+
+        async def sleep(delay):
+            delays.append(delay)
+            if not results:
+                raise asyncio.CancelledError()
+
+        try:
+            with patch.object(navigator, "_is_manus_interface_open_async", side_effect=interface_closed), \
+                    patch.object(navigator, "_navigate_to_manus_async", side_effect=navigate), \
+                    patch("mcp_tool.manus_navigator.asyncio.sleep", side_effect=sleep):
+                with self.assertRaises(concurrent.futures.CancelledError):
+                    navigator._run(navigator._monitor_loop_async())
+        finally:
+            navigator.close()
+
+        self.assertTrue(10.0 <= delays[0] <= 12.5)
+        self.assertTrue(20.0 <= delays[1] <= 25.0)
+        self.assertTrue(40.0 <= delays[2] <= 50.0)
+        self.assertEqual(delays[3], 10.0)
+        self.assertEqual(navigator._backoff, 10.0)
+
+    def test_stop_monitoring_cancels_immediately(self):
+        """测试停止监控时无需等待完整的检查间隔"""
+        navigator = ManusNavigator(check_interval=30.0, auto_navigate=False)
+
+        async def interface_open():
+            return True
+
+        try:
+            with patch.object(navigator, "_is_manus_interface_open_async", side_effect=interface_open):
+                navigator.start_monitoring()
+                time.sleep(0.2)
+
+                self.assertTrue(navigator.is_monitoring())
+
+                start = time.monotonic()
+                navigator.stop_monitoring()
+                self.assertLess(time.monotonic() - start, 1.0)
+                self.assertFalse(navigator.is_monitoring())
+        finally:
+            navigator.close()
+
+    def test_check_visual_features_without_reference(self):
+        """测试未配置参考图像时不截图"""
+        navigator = ManusNavigator(auto_navigate=False)
+
+        try:
+            with patch.object(navigator, "_take_screenshot") as mock_screenshot:
+                self.assertFalse(navigator._run(navigator._check_visual_features()))
+            mock_screenshot.assert_not_called()
+        finally:
+            navigator.close()
+
+if __name__ == '__main__':
+    unittest.main()
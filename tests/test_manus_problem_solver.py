@@ -16,6 +16,11 @@ import os
 import sys
 import time
 import json
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
 
 # 添加父目录到系统路径，以便导入mcp_tool包
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -147,5 +152,300 @@ Instructions for usage...
     print("\n测试完成!")
     return solver
 
+class TestSavePoints(unittest.TestCase):
+    """测试保存点的创建与回滚"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.repo_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.repo_dir, "pkg"))
+        self._write("main.py", "print('v1')\n")
+        self._write("pkg/util.py", "VALUE = 1\n")
+        self._write("notes.txt", "not copied\n")
+        self.solver = ManusProblemSolver(repo_path=self.repo_dir, enhanced_recorder=MagicMock())
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.repo_dir, ignore_errors=True)
+
+    def _write(self, rel_path, content):
+        with open(os.path.join(self.repo_dir, rel_path), "w") as f:
+            f.write(content)
+
+    def _read(self, rel_path):
+        with open(os.path.join(self.repo_dir, rel_path)) as f:
+            return f.read()
+
+    def test_rollback_restores_python_files(self):
+        """测试回滚恢复保存点时的Python文件内容"""
+        save_point = self.solver.create_save_point("v1")
+
+        self._write("main.py", "print('v2')\n")
+        self._write("pkg/util.py", "VALUE = 2\n")
+
+        result = self.solver.rollback_to_save_point(save_point["id"])
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(self._read("main.py"), "print('v1')\n")
+        self.assertEqual(self._read("pkg/util.py"), "VALUE = 1\n")
+        self.assertNotEqual(result["backup"]["id"], save_point["id"])
+
+    def test_unchanged_files_share_objects(self):
+        """测试内容相同的文件在多个保存点间只存储一份"""
+        os.makedirs(os.path.join(self.repo_dir, "pkg", "__pycache__"))
+        self._write("pkg/__pycache__/skipped.py", "")
+        first = self.solver.create_save_point("first")
+        self._write("main.py", "print('v2')\n")
+        second = self.solver.create_save_point("second")
+
+        with open(first["manifest"]) as f:
+            first_manifest = json.load(f)
+        with open(second["manifest"]) as f:
+            second_manifest = json.load(f)
+
+        self.assertEqual(set(first_manifest), {"main.py", os.path.join("pkg", "util.py")})
+        self.assertEqual(first_manifest[os.path.join("pkg", "util.py")], second_manifest[os.path.join("pkg", "util.py")])
+        self.assertNotEqual(first_manifest["main.py"], second_manifest["main.py"])
+
+        objects = [name for _, _, files in os.walk(self.solver.objects_dir) for name in files]
+        self.assertEqual(len(objects), 3)
+
+    def test_interrupted_save_point_not_indexed(self):
+        """测试生成保存点中断时不会留下保存点目录或索引记录"""
+        with patch.object(self.solver, "_walk_snapshot", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.solver.create_save_point("broken")
+
+        self.assertEqual(self.solver.list_save_points(), [])
+        self.assertEqual([name for name in os.listdir(self.solver.save_points_dir) if name.isdigit()], [])
+
+        save_point = self.solver.create_save_point("ok")
+        self.assertTrue(os.path.isfile(save_point["manifest"]))
+
+    def test_find_and_rollback_to_previous(self):
+        """测试按ID和名称查找保存点，并回滚到前一个保存点"""
+        first = self.solver.create_save_point("first")
+        self._write("main.py", "print('v2')\n")
+        second = self.solver.create_save_point("second")
+
+        self.assertIs(self.solver._find_save_point(first["id"]), first)
+        self.assertIs(self.solver._find_save_point(str(second["id"])), second)
+        self.assertIs(self.solver._find_save_point("second"), second)
+        self.assertIsNone(self.solver._find_save_point("missing"))
+
+        result = self.solver.rollback_to_previous_save_point()
+        self.assertEqual(result["save_point"]["id"], first["id"])
+        self.assertEqual(self._read("main.py"), "print('v1')\n")
+
+    def test_state_written_through(self):
+        """测试内存中的索引和错误计数写回磁盘，新实例可以读取"""
+        save_point = self.solver.create_save_point("persisted")
+        self.solver.record_test_error()
+        self.solver.record_test_error()
+
+        solver = ManusProblemSolver(repo_path=self.repo_dir, enhanced_recorder=MagicMock())
+        self.assertEqual(solver._get_error_count(), 2)
+        self.assertEqual(solver.list_save_points(), [save_point])
+        self.assertFalse(os.path.exists(solver.error_counter_file + ".tmp"))
+
+    @unittest.skipUnless(shutil.which("git"), "需要git")
+    def test_git_snapshot_stores_only_changes(self):
+        """测试git仓库只存储相对HEAD有变化的文件，回滚时从git恢复其余文件"""
+        def git(*args):
+            subprocess.run(["git", "-C", self.repo_dir, "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                           check=True, capture_output=True)
+
+        git("init")
+        self._write(".gitignore", "ignored.py\n")
+        git("add", "main.py", "pkg/util.py")
+        git("commit", "-m", "init")
+        self._write("main.py", "print('v2')\n")
+        self._write("extra.py", "EXTRA = True\n")
+        self._write("ignored.py", "IGNORED = True\n")
+
+        save_point = self.solver.create_save_point("git")
+        with open(save_point["manifest"]) as f:
+            manifest = json.load(f)
+
+        self.assertEqual(len(save_point["base_commit"]), 40)
+        self.assertTrue(manifest[os.path.join("pkg", "util.py")].startswith("git:"))
+        self.assertFalse(manifest["main.py"].startswith("git:"))
+        self.assertIn("extra.py", manifest)
+        self.assertIn("ignored.py", manifest)
+
+        # 基准提交通过引用固定，不会被gc清理
+        ref = subprocess.run(["git", "-C", self.repo_dir, "rev-parse", f"refs/save_points/{save_point['id']}"],
+                             capture_output=True, text=True)
+        self.assertEqual(ref.stdout.strip(), save_point["base_commit"])
+
+        self._write("main.py", "print('v3')\n")
+        self._write("pkg/util.py", "VALUE = 3\n")
+        self.solver.rollback_to_save_point(save_point["id"])
+
+        self.assertEqual(self._read("main.py"), "print('v2')\n")
+        self.assertEqual(self._read("pkg/util.py"), "VALUE = 1\n")
+
+    @unittest.skipUnless(shutil.which("git"), "需要git")
+    def test_missing_git_object_fails_rollback(self):
+        """测试清单引用的git对象不存在时回滚返回错误并列出未恢复的文件"""
+        subprocess.run(["git", "-C", self.repo_dir, "init"], check=True, capture_output=True)
+        save_point = self.solver.create_save_point("git")
+        util_path = os.path.join("pkg", "util.py")
+        with open(save_point["manifest"]) as f:
+            manifest = json.load(f)
+        manifest[util_path] = "git:" + "0" * 40
+        with open(save_point["manifest"], "w") as f:
+            json.dump(manifest, f)
+
+        result = self.solver.rollback_to_save_point(save_point["id"])
+
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["unrestored_files"], [os.path.join(self.repo_dir, util_path)])
+
+class TestIssueSubmission(unittest.TestCase):
+    """测试问题提取与提交"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.repo_dir = tempfile.mkdtemp()
+        self.solver = ManusProblemSolver(repo_path=self.repo_dir, enhanced_recorder=MagicMock())
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.repo_dir, ignore_errors=True)
+
+    def test_construction_is_lazy(self):
+        """测试构造时不创建记录器、目录和状态文件"""
+        repo_dir = os.path.join(self.repo_dir, "lazy")
+        with patch("mcp_tool.manus_problem_solver.ThoughtActionRecorder") as mock_recorder:
+            solver = ManusProblemSolver(repo_path=repo_dir)
+
+            self.assertEqual(solver.list_save_points(), [])
+            self.assertEqual(os.listdir(repo_dir), [])
+            mock_recorder.assert_not_called()
+
+            self.assertIs(solver.recorder, mock_recorder.return_value)
+            self.assertIs(solver.recorder, mock_recorder.return_value)
+            mock_recorder.assert_called_once_with()
+
+    def test_import_does_not_load_requests(self):
+        """测试导入模块时不加载requests，只在HTTP提交时加载"""
+        code = "import sys, mcp_tool.manus_problem_solver; print('requests' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(output.stdout.strip(), "False")
+
+    def test_fallback_submit_uses_summary(self):
+        """测试备用提交方法直接使用传入的问题摘要"""
+        with patch("mcp_tool.manus_problem_solver.webbrowser.open") as mock_open:
+            result = self.solver._fallback_submit_to_manus_im("  问题摘要\n")
+
+        mock_open.assert_called_once_with(self.solver.manus_im_url)
+        self.assertEqual(result["status"], "partial_success")
+        with open(result["issues_summary_path"]) as f:
+            self.assertEqual(f.read(), "问题摘要")
+
+    def test_submit_runs_script_in_background(self):
+        """测试提交立即返回，脚本结束后由监控线程更新提交历史"""
+        script_path = os.path.join(self.repo_dir, "submit.py")
+        with open(script_path, "w") as f:
+            f.write("import json, time\n"
+                    "time.sleep(0.2)\n"
+                    f"json.dump({{'status': 'success'}}, open({script_path.replace('.py', '_result.json')!r}, 'w'))\n")
+
+        issues = [{"source": "readme", "description": "无法连接数据库", "status": "open"}]
+        with patch.object(self.solver, "_ensure_dependencies"), \
+                patch.object(self.solver, "_generate_automation_script", return_value=script_path):
+            result = self.solver.submit_issues_to_manus_im(issues)
+
+            self.assertEqual(result["status"], "submitted")
+            self.solver.wait_for_submissions()
+
+        history = self.solver._materialize_submission_history()
+        self.assertEqual(len(history["submissions"]), 1)
+        self.assertEqual(history["submissions"][0]["result"], {"status": "success"})
+        self.assertEqual(history["submissions"][0]["issues_count"], 1)
+
+        # 结果记录不重复写入问题摘要
+        records = self.solver._read_jsonl(self.solver.submission_log_file)
+        self.assertEqual(len(records), 2)
+        self.assertEqual(sorted(records[-1]), ["id", "result"])
+
+    def test_submit_via_http_endpoint(self):
+        """测试配置HTTP接口时直接POST问题摘要，失败时回退到自动化脚本"""
+        solver = ManusProblemSolver(repo_path=self.repo_dir, enhanced_recorder=MagicMock(),
+                                    manus_im_api_endpoint="https://example.com/api/messages")
+        issues = [{"source": "readme", "description": "无法连接数据库", "status": "open"}]
+
+        with patch.object(solver._session, "post") as mock_post, \
+                patch.object(solver, "_generate_automation_script") as mock_generate:
+            mock_post.return_value.ok = True
+            mock_post.return_value.status_code = 200
+            result = solver.submit_issues_to_manus_im(issues)
+
+        self.assertEqual(result["status"], "success")
+        self.assertIn("无法连接数据库", mock_post.call_args.kwargs["json"]["text"])
+        mock_generate.assert_not_called()
+
+        with patch.object(solver._session, "post") as mock_post, \
+                patch.object(solver, "_generate_automation_script") as mock_generate, \
+                patch.object(solver, "_execute_automation_script", return_value={"status": "submitted"}):
+            mock_post.return_value.ok = False
+            mock_post.return_value.status_code = 404
+            result = solver.submit_issues_to_manus_im(issues)
+
+        self.assertEqual(result["status"], "submitted")
+        mock_generate.assert_called_once()
+
+    def test_generate_automation_script_cached(self):
+        """测试相同摘要复用已生成的脚本，摘要中的特殊字符不会破坏脚本语法"""
+        import ast
+
+        summary = '问题 """ \\ 摘要\n第二行'
+        script_path = self.solver._generate_automation_script(summary)
+
+        with open(script_path) as f:
+            tree = ast.parse(f.read())
+        assigned = {node.targets[0].id: node.value.orelse.value for node in tree.body
+                    if isinstance(node, ast.Assign) and isinstance(node.value, ast.IfExp)}
+        self.assertEqual(assigned["ISSUES_SUMMARY"], summary)
+
+        with patch("mcp_tool.manus_problem_solver.open", side_effect=AssertionError("不应重新写入")):
+            self.assertEqual(self.solver._generate_automation_script(summary), script_path)
+        self.assertNotEqual(self.solver._generate_automation_script(summary + "!"), script_path)
+
+    def test_generate_automation_script_ignores_timestamp(self):
+        """测试只有时间戳不同的问题摘要复用同一个脚本"""
+        issues = [{"description": "无法连接数据库", "status": "open"}]
+        with patch("mcp_tool.manus_problem_solver.datetime") as mock_datetime:
+            mock_datetime.now.return_value.isoformat.return_value = "2025-05-28T10:00:00"
+            first = self.solver._prepare_issues_summary(issues)
+            mock_datetime.now.return_value.isoformat.return_value = "2025-05-28T11:00:00"
+            second = self.solver._prepare_issues_summary(issues)
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.solver._generate_automation_script(first),
+                         self.solver._generate_automation_script(second))
+
+    def test_extract_issues_dedupes_log_errors(self):
+        """测试从README和日志中提取未解决的问题，重复的错误只保留一次"""
+        with open(os.path.join(self.repo_dir, "README.md"), "w") as f:
+            f.write("# Test\n\n## 问题列表\n\n- [ ] 无法连接数据库\n- [x] 已修复的问题\n\n## 其他\n")
+        os.makedirs(os.path.join(self.repo_dir, "logs"))
+        for name in ("test_1.log", "test_2.log"):
+            with open(os.path.join(self.repo_dir, "logs", name), "w") as f:
+                f.write("2025-05-30 10:00:00 ERROR test: 无法连接数据库\n"
+                        "2025-05-30 10:00:01 CRITICAL test_login: 登录超时\n"
+                        "2025-05-30 10:00:02 ERROR worker: 任务失败\n"
+                        "  File \"worker.py\", line 3\n")
+        # 空日志文件无法内存映射，应被跳过
+        open(os.path.join(self.repo_dir, "logs", "test_3.log"), "w").close()
+
+        issues = self.solver._extract_issues_from_readme_and_logs()
+
+        self.assertEqual([issue["description"] for issue in issues],
+                         ["无法连接数据库", "CRITICAL: 登录超时",
+                          "ERROR: 任务失败\n  File \"worker.py\", line 3"])
+        self.assertEqual(issues[1]["source"], "log_test_2.log")
+
 if __name__ == "__main__":
     solver = test_problem_solver()
@@ -0,0 +1,119 @@
+"""
+自动化测试与README更新器测试模块
+
+该模块用于测试自动化测试与README更新器的测试计划解析和测试报告生成功能。
+"""
+
+import os
+import sys
+import shutil
+import unittest
+import tempfile
+import importlib.util
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+HAS_PARSER_DEPS = all(importlib.util.find_spec(name) for name in ("markdown", "bs4"))
+
+if HAS_PARSER_DEPS:
+    # 导入被测试模块（以模块形式导入，避免pytest把TestAndReadmeUpdater当作测试类收集）
+    from mcp_tool import test_readme_updater as readme_updater
+
+
+TEST_PLAN = """# 测试计划
+
+### 用例1: 登录测试
+
+**ID**: TC001
+**类型**: 冒烟测试
+
+**优先级**: 高
+
+**描述**: 验证用户可以登录
+
+#### 前置条件
+
+- 已安装浏览器
+
+#### 测试步骤
+
+1. 打开页面
+2. 点击登录
+
+#### 预期结果
+
+- 登录成功
+
+#### 备注
+
+- 不属于任何字段
+
+### 用例2: 退出测试
+
+#### 验证点
+
+- 回到首页
+"""
+
+
+@unittest.skipUnless(HAS_PARSER_DEPS, "需要markdown和beautifulsoup4")
+class TestTestAndReadmeUpdater(unittest.TestCase):
+    """测试自动化测试与README更新器"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.temp_dir = tempfile.mkdtemp(prefix="test_readme_updater_")
+        self.updater = readme_updater.TestAndReadmeUpdater(self.temp_dir)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_parse_test_plan_markdown(self):
+        """测试按元数据和小节对应表解析测试用例"""
+        cases = self.updater._parse_test_plan_markdown(TEST_PLAN)
+
+        self.assertEqual(len(cases), 2)
+        login, logout = cases
+
+        self.assertEqual(login["title"], "登录测试")
+        self.assertEqual(login["id"], "TC001")
+        self.assertEqual(login["type"], "冒烟测试")
+        self.assertEqual(login["priority"], "高")
+        self.assertEqual(login["description"], "验证用户可以登录")
+        self.assertEqual(login["preconditions"], ["已安装浏览器"])
+        self.assertEqual(login["steps"], ["打开页面", "点击登录"])
+        # 未知小节的列表不归入上一个小节
+        self.assertEqual(login["expected_results"], ["登录成功"])
+        self.assertEqual(login["verification_points"], [])
+
+        # 未提供元数据时使用默认值
+        self.assertEqual(logout["id"], "test_2")
+        self.assertEqual(logout["type"], "功能测试")
+        self.assertEqual(logout["priority"], "中")
+        self.assertEqual(logout["verification_points"], ["回到首页"])
+
+    def test_load_test_plan(self):
+        """测试从文件加载测试计划"""
+        with open(self.updater.test_plan_path, "w", encoding="utf-8") as f:
+            f.write(TEST_PLAN)
+
+        self.assertEqual([case["id"] for case in self.updater.load_test_plan()], ["TC001", "test_2"])
+
+    def test_generate_test_report_pass_rate(self):
+        """测试报告中的通过率，无测试结果时为N/A"""
+        report_path = os.path.join(self.temp_dir, "report.md")
+
+        self.updater.generate_test_report(report_path)
+        with open(report_path, encoding="utf-8") as f:
+            self.assertIn("- **通过率**: N/A", f.read())
+
+        self.updater.test_results = [{"passed": True}, {"passed": False}]
+        self.updater.generate_test_report(report_path)
+        with open(report_path, encoding="utf-8") as f:
+            self.assertIn("- **通过率**: 50.00%", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
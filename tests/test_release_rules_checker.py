@@ -0,0 +1,58 @@
+"""
+Release守则检查器测试
+
+该测试文件用于测试ReleaseRulesChecker模块的规则检查功能。
+
+作者: Manus AI
+日期: 2025-05-28
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# 导入被测模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mcp_tool.release_rules_checker import ReleaseRulesChecker
+
+class TestReleaseRulesChecks(unittest.TestCase):
+    """测试基于会话记录的规则检查"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.log_dir = tempfile.mkdtemp()
+        self.checker = ReleaseRulesChecker(log_dir=self.log_dir)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def test_keyword_checks_ignore_case(self):
+        """测试截图、日志和测试名称的关键词检查不区分大小写"""
+        self.assertFalse(self.checker._check_mindmap_rendering())
+        self.assertFalse(self.checker._check_sandbox_startup())
+
+        self.checker.add_screenshot("/tmp/MindMap_view.png")
+        self.checker.add_console_log("App started in SANDBOX mode")
+        self.checker.add_test_result("Real_Env navigation", True)
+
+        self.assertTrue(self.checker._check_mindmap_rendering())
+        self.assertTrue(self.checker._check_sandbox_startup())
+        self.assertTrue(self.checker._check_real_environment_verification())
+
+    def test_lowered_text_follows_new_records(self):
+        """测试追加记录或重置会话后重新生成小写文本"""
+        for name in ("Navigation", "recording"):
+            self.checker.add_test_result(name, True)
+        self.assertFalse(self.checker._check_complete_testing())
+
+        self.checker.add_test_result("Analysis", False)
+        self.assertTrue(self.checker._check_complete_testing())
+
+        self.checker.current_session["test_results"] = []
+        self.assertEqual(self.checker._lowered_text("test_results"), "")
+
+if __name__ == '__main__':
+    unittest.main()
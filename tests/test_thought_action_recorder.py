@@ -15,10 +15,16 @@ import os
 import sys
 import time
 import json
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
 
 # 添加父目录到系统路径，以便导入mcp_tool包
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from mcp_tool import thought_action_recorder
 from mcp_tool.thought_action_recorder import ThoughtActionRecorder
 
 def test_recorder():
@@ -86,6 +92,137 @@ def test_recorder():
     print("\n测试完成!")
     return recorder
 
+class TestRecorderJson(unittest.TestCase):
+    """测试日志条目与导出文件的JSON编解码"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.log_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def _check_round_trip(self):
+        """记录、读取并导出会话，检查内容一致且非ASCII字符原样保留"""
+        recorder = ThoughtActionRecorder(log_dir=self.log_dir)
+        recorder.record_thought("分析问题", {"step": 1})
+        recorder.record_action("update", {1: "键为整数"}, {"success": True})
+
+        logs = recorder.get_session_logs()
+        self.assertEqual(logs["thoughts"][0]["content"], "分析问题")
+        self.assertEqual(logs["actions"][0]["action_params"], {"1": "键为整数"})
+
+        with open(recorder.thought_log, encoding="utf-8") as f:
+            self.assertIn("分析问题", f.read())
+
+        export_result = recorder.export_session(format="json")
+        self.assertTrue(export_result["success"])
+        with open(export_result["file"], encoding="utf-8") as f:
+            self.assertEqual(json.load(f), logs)
+
+    def test_round_trip(self):
+        """测试默认编解码路径"""
+        self._check_round_trip()
+
+    def test_round_trip_without_orjson(self):
+        """测试未安装orjson时回退到标准库json"""
+        with patch.object(thought_action_recorder, "HAS_ORJSON", False):
+            self._check_round_trip()
+
+class TestRecorderSearch(unittest.TestCase):
+    """测试日志搜索"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.log_dir = tempfile.mkdtemp()
+        self.recorder = ThoughtActionRecorder(log_dir=self.log_dir)
+        self.recorder.record_thought("检查README")
+        self.recorder.record_action("Open_Page", {"url": "http://demo"}, None)
+        self.recorder.record_action("click", {"target": "Submit"}, {"success": True})
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def _matched_types(self, keyword):
+        """返回匹配关键词的操作类型"""
+        return [action["action_type"] for action in self.recorder.search_logs(keyword)["actions"]]
+
+    def test_search_each_field_case_insensitive(self):
+        """测试在操作类型、参数和结果中不区分大小写地搜索"""
+        self.assertEqual(len(self.recorder.search_logs("readme")["thoughts"]), 1)
+        self.assertEqual(self._matched_types("open_page"), ["Open_Page"])
+        self.assertEqual(self._matched_types("SUBMIT"), ["click"])
+        self.assertEqual(self._matched_types("null"), ["Open_Page"])
+        self.assertEqual(self._matched_types('"success": true'), ["click"])
+
+    def test_search_does_not_span_fields(self):
+        """测试关键词不会跨越操作类型和参数的边界匹配"""
+        self.assertEqual(self._matched_types("click{"), [])
+        self.assertEqual(self._matched_types("}{"), [])
+
+class TestRecorderBatch(unittest.TestCase):
+    """测试批量记录"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.log_dir = tempfile.mkdtemp()
+        self.recorder = ThoughtActionRecorder(log_dir=self.log_dir)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+    def test_batch_writes_once_on_exit(self):
+        """测试批量期间不写文件，最外层退出时每个日志文件写入一次"""
+        with patch.object(self.recorder, "_write_to_log", wraps=self.recorder._write_to_log) as mock_write:
+            with self.recorder.batch():
+                self.recorder.record_thought("第一步")
+                with self.recorder.batch():
+                    self.recorder.record_action("run", {}, {"success": True})
+                self.recorder.record_thought("第二步")
+                mock_write.assert_not_called()
+            self.assertEqual(mock_write.call_count, 2)
+
+        logs = self.recorder.get_session_logs()
+        self.assertEqual([t["content"] for t in logs["thoughts"]], ["第一步", "第二步"])
+        self.assertEqual(logs["actions"][0]["action_type"], "run")
+
+    def test_unserializable_entry_is_logged_not_raised(self):
+        """测试无法序列化的条目只记录错误，不影响调用方"""
+        with self.recorder.batch():
+            self.recorder.record_action("bad", {"obj": object()}, None)
+            self.recorder.record_action("good", {}, None)
+        self.recorder.record_action("bad", {"obj": object()}, None)
+
+        actions = self.recorder.get_session_logs()["actions"]
+        self.assertEqual([a["action_type"] for a in actions], ["good"])
+
+    def test_batch_is_per_thread(self):
+        """测试一个线程的批量不会暂存其他线程的记录"""
+        with self.recorder.batch():
+            worker = threading.Thread(target=self.recorder.record_thought, args=("其他线程",))
+            worker.start()
+            worker.join()
+            self.assertEqual(
+                [t["content"] for t in self.recorder.get_session_logs()["thoughts"]], ["其他线程"]
+            )
+            self.recorder.record_thought("批量中")
+
+        self.assertEqual(
+            [t["content"] for t in self.recorder.get_session_logs()["thoughts"]], ["其他线程", "批量中"]
+        )
+
+    def test_batch_flushes_on_error(self):
+        """测试批量期间发生异常时已记录的条目仍写入日志"""
+        with self.assertRaises(RuntimeError):
+            with self.recorder.batch():
+                self.recorder.record_thought("出错前")
+                raise RuntimeError("boom")
+
+        self.assertEqual(self.recorder.get_session_logs()["thoughts"][0]["content"], "出错前")
+
 if __name__ == "__main__":
     recorder = test_recorder()
     
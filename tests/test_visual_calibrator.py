@@ -8,6 +8,7 @@
 """
 
 import os
+import re
 import sys
 import unittest
 import tempfile
@@ -98,7 +99,19 @@ class TestVisualCalibratorBase(unittest.TestCase):
         self.assertTrue(os.path.exists(marked_path))
         marked_img = Image.open(marked_path)
         self.assertEqual(marked_img.size, (800, 600))
-    
+
+    def test_visualize_detected_regions_keeps_source(self):
+        """测试可视化检测区域不修改传入的图像"""
+        img = Image.new('RGB', (800, 600), color='white')
+        calibrator = VisualCalibrator(output_dir=self.output_dir)
+        regions = {"work_list": (100, 100, 400, 500)}
+        marked_path = calibrator.visualize_detected_regions("test_img.png", regions, img)
+
+        marked_img = Image.open(marked_path)
+        self.assertEqual(marked_img.mode, "RGB")
+        self.assertEqual(marked_img.getpixel((100, 300)), (0, 128, 0))
+        self.assertEqual(img.getpixel((100, 300)), (255, 255, 255))
+
     def test_extract_region_content(self):
         """测试提取区域内容"""
         # 创建测试图像
@@ -118,6 +131,85 @@ class TestVisualCalibratorBase(unittest.TestCase):
             self.assertTrue(os.path.exists(path))
             self.assertIn(name, path)
     
+    def test_extract_region_content_out_of_bounds(self):
+        """测试部分越界的区域按区域尺寸补齐，无效区域单独跳过"""
+        img = Image.new('RGB', (800, 600), color='white')
+        calibrator = VisualCalibrator(output_dir=self.output_dir)
+        regions = {
+            "partial": (700, 500, 900, 700),
+            "offscreen": (900, 700, 1000, 800),
+            "inverted": (400, 400, 300, 300),
+            "work_list": (100, 100, 400, 500)
+        }
+        region_images = calibrator.extract_region_content("test_img.png", regions, img)
+
+        self.assertEqual(set(region_images), {"partial", "work_list"})
+        self.assertEqual(Image.open(region_images["partial"]).size, (200, 200))
+        self.assertEqual(Image.open(region_images["work_list"]).size, (300, 400))
+
+    def test_close_shuts_down_executor(self):
+        """测试关闭校准器时释放线程池，Mac校准器同时关闭mss"""
+        with VisualCalibrator(output_dir=self.output_dir) as calibrator:
+            executor = calibrator._io_executor
+        self.assertIsNone(calibrator._io_executor)
+        self.assertTrue(executor._shutdown)
+
+        mac_calibrator = MacVisualCalibrator(output_dir=self.output_dir)
+        sct = mac_calibrator._sct = MagicMock()
+        mac_calibrator.close()
+        sct.close.assert_called_once()
+        self.assertIsNone(mac_calibrator._io_executor)
+
+    def test_compile_patterns_with_re2(self):
+        """测试使用RE2时通过内联标志忽略大小写，而不是传入re标志"""
+        fake_re2 = MagicMock()
+        fake_re2.compile.side_effect = lambda pattern, *args: re.compile(pattern, *args)
+        with patch("mcp_tool.visual_calibrator.re2", fake_re2):
+            calibrator = VisualCalibrator(output_dir=self.output_dir)
+
+        for args, _ in fake_re2.compile.call_args_list:
+            self.assertEqual(len(args), 1)
+            self.assertTrue(args[0].startswith("(?i)"))
+        self.assertTrue(calibrator._patterns["browser"].search("https://MANUS.IM/app"))
+
+    def test_detect_content_regions_layout_cache(self):
+        """测试URL和窗口未变化时复用内容区域"""
+        calibrator = VisualCalibrator(output_dir=self.output_dir, simple_mode=True)
+        regions = calibrator.detect_content_regions("", (0, 0, 800, 600))
+
+        # 窗口变化不超过2像素时复用缓存
+        self.assertEqual(calibrator.detect_content_regions("", (1, 0, 801, 600)), regions)
+
+        # 窗口变化较大时重新计算
+        moved = calibrator.detect_content_regions("", (100, 0, 900, 600))
+        self.assertNotEqual(moved, regions)
+        self.assertEqual(moved["work_list"][0], regions["work_list"][0] + 100)
+
+    def test_run_calibration_skips_grid_by_default(self):
+        """测试默认不生成中间校准网格图像"""
+        test_img_path = os.path.join(self.temp_dir, "test_img.png")
+        Image.new('RGB', (800, 600), color='white').save(test_img_path)
+
+        calibrator = WindowsVisualCalibrator(output_dir=self.output_dir, simple_mode=True)
+        with patch.object(calibrator, "capture_screenshot", return_value=test_img_path), \
+                patch.object(calibrator, "create_calibration_grid") as mock_grid:
+            result = calibrator.run_calibration()
+
+        self.assertTrue(result["success"])
+        self.assertIsNone(result["grid_path"])
+        self.assertTrue(os.path.exists(result["marked_path"]))
+        mock_grid.assert_not_called()
+
+    def test_to_image_box_window_capture(self):
+        """测试窗口截图时屏幕坐标到图像坐标的转换"""
+        window = (100, 50, 500, 350)
+        # 全屏截图坐标不变
+        self.assertEqual(VisualCalibrator._to_image_box((120, 110, 280, 290), None, (800, 600)), (120, 110, 280, 290))
+        # 窗口截图平移到窗口原点，Retina下按2倍缩放
+        self.assertEqual(VisualCalibrator._to_image_box((120, 110, 280, 290), window, (800, 600)), (40, 120, 360, 480))
+        # 空区域保持不变
+        self.assertEqual(VisualCalibrator._to_image_box((0, 0, 0, 0), window, (800, 600)), (0, 0, 0, 0))
+
     def test_update_auto_monitor_config(self):
         """测试更新自动监控配置"""
         calibrator = VisualCalibrator(output_dir=self.output_dir)
@@ -139,6 +231,24 @@ class TestVisualCalibratorBase(unittest.TestCase):
         self.assertEqual(len(config["monitor_regions"]), 2)
         self.assertEqual(config["platform"], platform.system().lower())
 
+    def test_update_auto_monitor_config_unchanged(self):
+        """测试区域未变化时跳过自动监控配置写入"""
+        calibrator = VisualCalibrator(output_dir=self.output_dir)
+        regions = {
+            "work_list": (100, 100, 400, 500),
+            "action_list": (500, 100, 700, 500)
+        }
+        self.assertTrue(calibrator.update_auto_monitor_config(regions))
+
+        config_path = os.path.join(self.output_dir, "auto_web_monitor_config.json")
+        os.remove(config_path)
+        self.assertTrue(calibrator.update_auto_monitor_config(regions))
+        self.assertFalse(os.path.exists(config_path))
+
+        regions["work_list"] = (120, 100, 400, 500)
+        self.assertTrue(calibrator.update_auto_monitor_config(regions))
+        self.assertTrue(os.path.exists(config_path))
+
 
 class TestWindowsVisualCalibrator(unittest.TestCase):
     """测试Windows视觉校准器"""
@@ -199,11 +309,132 @@ class TestMacVisualCalibrator(unittest.TestCase):
         mock_subprocess_run.return_value = MagicMock(returncode=0)
         
         calibrator = MacVisualCalibrator()
+        calibrator._sct = None  # 使用screencapture命令
         screenshot_path = calibrator.capture_screenshot()
         
         self.assertIsNotNone(screenshot_path)
         mock_subprocess_run.assert_called_once()
 
+    @patch('mcp_tool.visual_calibrator.subprocess.run')
+    def test_capture_screenshot_with_mss(self, mock_subprocess_run):
+        """测试使用mss在进程内捕获屏幕截图"""
+        raw = MagicMock(size=(4, 2), bgra=bytes([255, 0, 0, 255]) * 8)
+        calibrator = MacVisualCalibrator()
+        calibrator._sct = MagicMock(monitors=[{}])
+        calibrator._sct.grab.return_value = raw
+
+        screenshot_path = calibrator.capture_screenshot()
+
+        self.assertTrue(os.path.exists(screenshot_path))
+        mock_subprocess_run.assert_not_called()
+        img = calibrator._load_screenshot(screenshot_path)
+        self.assertEqual(img.size, (4, 2))
+        self.assertEqual(img.getpixel((0, 0)), (0, 0, 255))
+
+    @patch('mcp_tool.visual_calibrator.subprocess.run')
+    def test_browser_info_and_url_share_one_query(self, mock_subprocess_run):
+        """测试浏览器信息和URL共用一次AppleScript调用"""
+        mock_subprocess_run.return_value = MagicMock(
+            returncode=0,
+            stdout="\x1f".join([
+                "Safari", "Macintosh HD:Applications:Safari.app:", "com.apple.Safari",
+                "123", "https://manus.im/app?a=1, 2", "-1440", "20", "800", "600"
+            ]) + "\n"
+        )
+
+        calibrator = MacVisualCalibrator()
+        browser_info = calibrator.get_active_browser_info()
+        url = calibrator.get_browser_url()
+
+        self.assertEqual(browser_info["name"], "Safari")
+        self.assertEqual(browser_info["position"], {"x": -1440, "y": 20})
+        self.assertEqual(browser_info["size"], {"width": 800, "height": 600})
+        self.assertEqual(url, "https://manus.im/app?a=1, 2")
+        osascript_calls = [c for c in mock_subprocess_run.call_args_list if c.args[0][0] == "osascript"]
+        self.assertEqual(len(osascript_calls), 1)
+
+    @patch('mcp_tool.visual_calibrator.subprocess.run')
+    def test_query_frontmost_script_via_stdin(self, mock_subprocess_run):
+        """测试未能预编译时通过标准输入传递AppleScript源码"""
+        mock_subprocess_run.return_value = MagicMock(returncode=0, stdout="Safari\n")
+
+        calibrator = MacVisualCalibrator()
+        calibrator._frontmost_script_path = ""  # 模拟编译失败
+        calibrator._query_frontmost()
+
+        args, kwargs = mock_subprocess_run.call_args
+        self.assertEqual(args[0], ["osascript", "-"])
+        self.assertEqual(kwargs["input"], calibrator._build_frontmost_script())
+
+    @patch('mcp_tool.visual_calibrator.subprocess.run')
+    def test_detect_browser_window_reuses_browser_info(self, mock_subprocess_run):
+        """测试传入浏览器信息时不再查询AppleScript"""
+        browser_info = {
+            "name": "Safari",
+            "url": "https://manus.im/",
+            "position": {"x": 10, "y": 20},
+            "size": {"width": 800, "height": 600}
+        }
+
+        calibrator = MacVisualCalibrator()
+        browser_window = calibrator.detect_browser_window("", browser_info)
+
+        self.assertEqual(browser_window, (10, 20, 810, 620))
+        mock_subprocess_run.assert_not_called()
+
+    def _run_window_calibration(self, cached_position, current_position):
+        """按缓存的窗口位置运行校准，返回窗口截图调用和查询是否与截图并行"""
+        import shutil
+        import threading
+        import time
+
+        output_dir = tempfile.mkdtemp(prefix="test_visual_calibration_")
+        self.addCleanup(shutil.rmtree, output_dir, True)
+        img_path = os.path.join(output_dir, "window.png")
+        Image.new('RGB', (800, 600), color='white').save(img_path)
+
+        def browser_info(position):
+            return {"name": "Safari", "url": "https://manus.im/", "pid": 1,
+                    "position": position, "size": {"width": 800, "height": 600}}
+
+        calibrator = MacVisualCalibrator(output_dir=output_dir)
+        calibrator._browser_cache = (time.monotonic() - 60, 1, browser_info(cached_position))
+        captured = threading.Event()
+        overlapped = []
+        capture_calls = []
+
+        def query():
+            if calibrator._browser_cache[2]["position"] != current_position:
+                overlapped.append(captured.wait(1))
+                calibrator._browser_cache = (time.monotonic(), 1, browser_info(current_position))
+            return calibrator._browser_cache[2]
+
+        def capture_window(window):
+            capture_calls.append(window)
+            captured.set()
+            return img_path
+
+        with patch.object(calibrator, "_query_frontmost", side_effect=query), \
+                patch.object(calibrator, "capture_window", side_effect=capture_window), \
+                patch.object(calibrator, "capture_screenshot") as mock_full:
+            result = calibrator.run_calibration()
+
+        self.assertTrue(result["success"])
+        mock_full.assert_not_called()
+        return capture_calls, overlapped
+
+    def test_window_capture_overlaps_browser_query(self):
+        """测试按已知窗口位置截图时AppleScript查询与截图并行"""
+        capture_calls, overlapped = self._run_window_calibration({"x": 10, "y": 20}, {"x": 10, "y": 21})
+        self.assertEqual(overlapped, [True])
+        # 窗口位置变化时按最新位置重新截图
+        self.assertEqual(capture_calls, [(10, 20, 810, 620), (10, 21, 810, 621)])
+
+    def test_window_capture_unchanged_window_captures_once(self):
+        """测试窗口位置未变化时只截图一次"""
+        capture_calls, _ = self._run_window_calibration({"x": 10, "y": 20}, {"x": 10, "y": 20})
+        self.assertEqual(capture_calls, [(10, 20, 810, 620)])
+
 
 class TestFactoryFunction(unittest.TestCase):
     """测试工厂函数"""